@@ -122,3 +122,39 @@ CREATE TABLE IF NOT EXISTS source_configs (
 );
 CREATE INDEX IF NOT EXISTS idx_source_configs_type ON source_configs(source_type);
 CREATE INDEX IF NOT EXISTS idx_source_configs_collection ON source_configs(collection_id);
+
+-- Embedding cache keyed by (model, sha256 of text); dense vectors as float16
+CREATE TABLE IF NOT EXISTS embedding_cache (
+    model TEXT NOT NULL,
+    text_hash TEXT NOT NULL,
+    dense BYTEA NOT NULL,
+    sparse_indices BYTEA NOT NULL,
+    sparse_values BYTEA NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (model, text_hash)
+);
+
+-- Chunk texts when QDRANT_PAYLOAD_CONTENT=false; content is zlib-compressed UTF-8
+CREATE TABLE IF NOT EXISTS chunk_contents (
+    chunk_id TEXT PRIMARY KEY,
+    document_id TEXT NOT NULL,
+    content BYTEA NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_chunk_contents_document ON chunk_contents(document_id);
+
+-- Blue/green rebuilds of the Qdrant collection behind the QDRANT_COLLECTION alias
+CREATE TABLE IF NOT EXISTS reindex_jobs (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    alias TEXT NOT NULL,
+    source_collection TEXT NOT NULL,
+    target_collection TEXT NOT NULL UNIQUE,
+    mode TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'building',
+    last_document_id TEXT,
+    documents_done INT DEFAULT 0,
+    chunks_done INT DEFAULT 0,
+    error TEXT,
+    started_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    swapped_at TIMESTAMPTZ
+);
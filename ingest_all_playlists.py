@@ -12,8 +12,8 @@ from google.oauth2.credentials import Credentials
 from google.auth.transport.requests import Request
 
 from rag.ingestion.youtube import YouTubeIngestor
-from rag.processing.embedding import Embedder
-from rag.processing.ner import EntityExtractor
+from rag.processing.registry import get_embedder, get_entity_extractor
+from rag.pipeline.indexing import embed_and_store, extract_entities
 from rag.processing.graph_builder import GraphBuilder
 from rag.storage.qdrant import QdrantStore
 from rag.storage.postgres import PostgresStore
@@ -82,26 +82,16 @@ def ingest_video(url, title, ingestor, embedder, qdrant, postgres):
     doc, chunks = ingestor.ingest(url)
 
     # Embed + store vectors
-    for chunk in chunks:
-        emb = embedder.embed(chunk.content)
-        qdrant.upsert(
-            chunk=chunk,
-            dense_vector=emb.dense,
-            sparse_indices=emb.sparse_indices,
-            sparse_values=emb.sparse_values,
-        )
+    embed_and_store(doc, chunks, embedder, qdrant)
 
     # PostgreSQL
     postgres.save_document(doc)
     postgres.update_document_counts(doc.id, len(chunks), 0)
 
     # NER + Knowledge Graph
-    ner = EntityExtractor()
+    ner = get_entity_extractor()
     graph = GraphBuilder()
-    all_entities = []
-    for chunk in chunks:
-        entities = ner.extract(chunk.content, document_id=doc.id, chunk_id=chunk.id)
-        all_entities.extend(entities)
+    all_entities = extract_entities(doc, chunks, ner)
     graph.process_document(doc, all_entities)
     graph.close()
     postgres.update_document_counts(doc.id, len(chunks), len(all_entities))
@@ -113,7 +103,7 @@ def ingest_video(url, title, ingestor, embedder, qdrant, postgres):
 def main():
     # Initialize shared resources
     ingestor = YouTubeIngestor()
-    embedder = Embedder()
+    embedder = get_embedder()
     qdrant = QdrantStore()
     qdrant.ensure_collection()
     postgres = PostgresStore()
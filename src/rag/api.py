@@ -1,3 +1,5 @@
+import asyncio
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI, HTTPException, Query, Request
@@ -6,10 +8,27 @@ from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel
 
 from rag.api_routes import documents, search, chat, collections, tags, ratings, graph, pipeline, sources
+from rag.config import settings
 
 BASE_DIR = Path(__file__).resolve().parent
 
-app = FastAPI(title="RAG Wissensdatenbank", version="0.2.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    from rag.storage.postgres import close_pools, open_async_pool
+    from rag.storage.qdrant import close_async_client
+
+    # Load shared models once per worker, before the first request arrives
+    if settings.model_warmup:
+        from rag.processing.registry import warm_up
+        await asyncio.to_thread(warm_up, settings.model_warmup)
+    await open_async_pool()
+    yield
+    await close_pools()
+    await close_async_client()
+
+
+app = FastAPI(title="RAG Wissensdatenbank", version="0.2.0", lifespan=lifespan)
 
 # Mount static files
 app.mount("/static", StaticFiles(directory=str(BASE_DIR / "frontend")), name="static")
@@ -39,6 +58,7 @@ class IngestRequest(BaseModel):
 class AskRequest(BaseModel):
     question: str
     platform: str | None = None
+    collection_id: str | None = None
     limit: int = 10
 
 
@@ -109,7 +129,15 @@ def settings_page(request: Request):
 
 @app.get("/health")
 def health():
-    return {"status": "ok"}
+    from rag.processing.registry import loaded_models
+    from rag.retrieval.query_cache import get_query_cache
+    from rag.storage.postgres import pool_stats
+    return {
+        "status": "ok",
+        "models": loaded_models(),
+        "postgres_pool": pool_stats(),
+        "query_cache": get_query_cache().stats(),
+    }
 
 
 @app.post("/ingest")
@@ -117,11 +145,12 @@ def ingest(req: IngestRequest):
     from rag.ingestion.pdf import PDFIngestor
     from rag.ingestion.youtube import YouTubeIngestor
     from rag.ingestion.web import WebIngestor
-    from rag.processing.embedding import Embedder
-    from rag.processing.ner import EntityExtractor
+    from rag.processing.registry import get_embedder, get_entity_extractor
+    from rag.pipeline.indexing import embed_and_store, extract_entities
     from rag.processing.graph_builder import GraphBuilder
     from rag.storage.qdrant import QdrantStore
     from rag.storage.postgres import PostgresStore
+    from rag.pipeline.payload_sync import sync_quietly
 
     source_type = req.type
     if source_type == "auto":
@@ -146,28 +175,19 @@ def ingest(req: IngestRequest):
     ingestor = ingestors[source_type]()
     doc, chunks = ingestor.ingest(req.source)
 
-    embedder = Embedder()
+    embedder = get_embedder()
     qdrant = QdrantStore()
     qdrant.ensure_collection()
     postgres = PostgresStore()
 
-    for chunk in chunks:
-        emb = embedder.embed(chunk.content)
-        qdrant.upsert(
-            chunk=chunk,
-            dense_vector=emb.dense,
-            sparse_indices=emb.sparse_indices,
-            sparse_values=emb.sparse_values,
-        )
+    embed_and_store(doc, chunks, embedder, qdrant)
 
     postgres.save_document(doc)
+    sync_quietly(doc.id)
 
-    ner = EntityExtractor()
+    ner = get_entity_extractor()
     graph_builder = GraphBuilder()
-    all_entities = []
-    for chunk in chunks:
-        entities = ner.extract(chunk.content, document_id=doc.id, chunk_id=chunk.id)
-        all_entities.extend(entities)
+    all_entities = extract_entities(doc, chunks, ner)
     graph_builder.process_document(doc, all_entities)
     graph_builder.close()
 
@@ -187,9 +207,13 @@ def ask_question(req: AskRequest):
     from rag.retrieval.hybrid import HybridRetriever
     from rag.generation.router import QueryRouter
     from rag.generation.citation import CitationGenerator
+    from rag.storage.qdrant import SearchFilters
 
     retriever = HybridRetriever()
-    results = retriever.retrieve(req.question, limit=req.limit, filter_platform=req.platform)
+    results = retriever.retrieve(
+        req.question, limit=req.limit, filter_platform=req.platform,
+        filters=SearchFilters(collection_id=req.collection_id) if req.collection_id else None,
+    )
 
     if not results:
         return AskResponse(answer="No relevant documents found.", sources=[], citation_count=0)
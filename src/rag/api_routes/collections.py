@@ -74,24 +74,31 @@ def update_collection(collection_id: str, body: UpdateCollection):
 @router.delete("/{collection_id}")
 def delete_collection(collection_id: str):
     from rag.storage.postgres import PostgresStore
+    from rag.pipeline.payload_sync import sync_quietly
     pg = PostgresStore()
+    members = pg.list_collection_document_ids(collection_id)
     deleted = pg.delete_collection(collection_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="Collection not found")
+    sync_quietly(*members)
     return {"deleted": True}
 
 
 @router.post("/{collection_id}/documents")
 def add_document_to_collection(collection_id: str, body: AddDocument):
     from rag.storage.postgres import PostgresStore
+    from rag.pipeline.payload_sync import sync_quietly
     pg = PostgresStore()
     pg.add_document_to_collection(body.document_id, collection_id)
+    sync_quietly(body.document_id)
     return {"ok": True}
 
 
 @router.delete("/{collection_id}/documents/{document_id}")
 def remove_document_from_collection(collection_id: str, document_id: str):
     from rag.storage.postgres import PostgresStore
+    from rag.pipeline.payload_sync import sync_quietly
     pg = PostgresStore()
     pg.remove_document_from_collection(document_id, collection_id)
+    sync_quietly(document_id)
     return {"ok": True}
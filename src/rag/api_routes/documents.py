@@ -127,8 +127,8 @@ def re_ingest_document(doc_id: str):
     from rag.ingestion.web import WebIngestor
     from rag.ingestion.youtube import YouTubeIngestor
     from rag.ingestion.pdf import PDFIngestor
-    from rag.processing.embedding import Embedder
-    from rag.processing.ner import EntityExtractor
+    from rag.processing.registry import get_embedder, get_entity_extractor
+    from rag.pipeline.indexing import embed_and_store, extract_entities
     from rag.processing.graph_builder import GraphBuilder
 
     source = doc.source_url
@@ -140,21 +140,18 @@ def re_ingest_document(doc_id: str):
         ingestor = WebIngestor()
 
     new_doc, chunks = ingestor.ingest(source)
-    embedder = Embedder()
+    embedder = get_embedder()
     qdrant.ensure_collection()
-    for chunk in chunks:
-        emb = embedder.embed(chunk.content)
-        qdrant.upsert(chunk=chunk, dense_vector=emb.dense, sparse_indices=emb.sparse_indices, sparse_values=emb.sparse_values)
+    embed_and_store(new_doc, chunks, embedder, qdrant)
 
     pg.save_document(new_doc)
     pg.update_document_counts(new_doc.id, len(chunks), 0)
+    from rag.pipeline.payload_sync import sync_quietly
+    sync_quietly(new_doc.id)
 
-    ner = EntityExtractor()
+    ner = get_entity_extractor()
     graph = GraphBuilder()
-    all_entities = []
-    for chunk in chunks:
-        entities = ner.extract(chunk.content, document_id=new_doc.id, chunk_id=chunk.id)
-        all_entities.extend(entities)
+    all_entities = extract_entities(new_doc, chunks, ner)
     graph.process_document(new_doc, all_entities)
     graph.close()
     pg.update_document_counts(new_doc.id, len(chunks), len(all_entities))
@@ -163,11 +160,21 @@ def re_ingest_document(doc_id: str):
 
 
 @router.get("/{doc_id}/chunks")
-def get_document_chunks(doc_id: str):
+def get_document_chunks(
+    doc_id: str,
+    cursor: int | None = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(200, ge=1, le=1000),
+    level: str = Query("leaf", description="leaf, parent, grandparent or all"),
+):
+    """Chunks of one level in document order, one page at a time."""
+    if level not in ("leaf", "parent", "grandparent", "all"):
+        raise HTTPException(status_code=400, detail="level must be leaf, parent, grandparent or all")
     from rag.storage.qdrant import QdrantStore
     qdrant = QdrantStore()
-    chunks = qdrant.get_chunks_for_document(doc_id)
-    return {"chunks": chunks, "count": len(chunks)}
+    chunks, next_cursor = qdrant.get_chunk_page(
+        doc_id, limit=limit, after=cursor, level=None if level == "all" else level
+    )
+    return {"chunks": chunks, "count": len(chunks), "next_cursor": next_cursor}
 
 
 @router.get("/{doc_id}/entities")
@@ -184,24 +191,30 @@ def update_quality(doc_id: str, body: QualityUpdate):
     if not 1 <= body.quality_score <= 5:
         raise HTTPException(status_code=400, detail="Quality score must be 1-5")
     from rag.storage.postgres import PostgresStore
+    from rag.pipeline.payload_sync import sync_quietly
     pg = PostgresStore()
     pg.update_document_quality(doc_id, body.quality_score)
+    sync_quietly(doc_id)
     return {"ok": True}
 
 
 @router.post("/{doc_id}/flag")
 def flag_document(doc_id: str, body: FlagUpdate):
     from rag.storage.postgres import PostgresStore
+    from rag.pipeline.payload_sync import sync_quietly
     pg = PostgresStore()
     pg.flag_document(doc_id, body.flagged, body.reason)
+    sync_quietly(doc_id)
     return {"ok": True}
 
 
 @router.put("/{doc_id}/tags")
 def update_document_tags(doc_id: str, tag_ids: list[str]):
     from rag.storage.postgres import PostgresStore
+    from rag.pipeline.payload_sync import sync_quietly
     pg = PostgresStore()
     pg.set_document_tags(doc_id, tag_ids)
+    sync_quietly(doc_id)
     return {"ok": True}
 
 
@@ -244,7 +257,9 @@ def upload_document(
 
         # Assign to collection
         if collection_id and result:
+            from rag.pipeline.payload_sync import sync_quietly
             pg.add_document_to_collection(result["doc_id"], collection_id)
+            sync_quietly(result["doc_id"])
 
         return {
             "uploaded": True,
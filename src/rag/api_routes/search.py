@@ -1,5 +1,6 @@
 import json
 import asyncio
+from datetime import datetime
 from fastapi import APIRouter, Query, Request
 from fastapi.responses import StreamingResponse
 
@@ -12,12 +13,28 @@ def search(
     platform: str | None = Query(None),
     author: str | None = Query(None),
     collection_id: str | None = Query(None),
+    tag_id: str | None = Query(None),
+    created_after: datetime | None = Query(None),
+    created_before: datetime | None = Query(None),
+    min_quality: int | None = Query(None, ge=1, le=5),
+    exclude_flagged: bool = Query(False),
     limit: int = Query(10, le=100),
 ):
     from rag.retrieval.hybrid import HybridRetriever
+    from rag.storage.qdrant import SearchFilters
 
     retriever = HybridRetriever()
-    results = retriever.retrieve(q, limit=limit, filter_platform=platform, filter_author=author)
+    filters = SearchFilters(
+        collection_id=collection_id,
+        tag_id=tag_id,
+        created_after=created_after,
+        created_before=created_before,
+        min_quality=min_quality,
+        exclude_flagged=exclude_flagged,
+    )
+    results = retriever.retrieve(
+        q, limit=limit, filter_platform=platform, filter_author=author, filters=filters,
+    )
 
     return {
         "query": q,
@@ -43,6 +60,7 @@ async def ask_stream(request: Request):
     platform = body.get("platform")
     limit = body.get("limit", 10)
     session_id = body.get("session_id")
+    collection_id = body.get("collection_id")
 
     if not question:
         async def error_stream():
@@ -54,9 +72,21 @@ async def ask_stream(request: Request):
         from rag.generation.citation import CitationGenerator
         from rag.generation.llm import LLMClient
         from rag.storage.postgres import PostgresStore
-
-        retriever = HybridRetriever()
-        results = retriever.retrieve(question, limit=limit, filter_platform=platform)
+        from rag.storage.qdrant import SearchFilters
+
+        # A chat session scoped to a collection searches only that collection
+        scope = collection_id
+        if scope is None and session_id:
+            session = await PostgresStore().get_chat_session_async(session_id)
+            if session and session["collection_id"]:
+                scope = str(session["collection_id"])
+
+        # The first retriever of a worker loads the embedder: not on the event loop
+        retriever = await asyncio.to_thread(HybridRetriever)
+        results = await retriever.retrieve_async(
+            question, limit=limit, filter_platform=platform,
+            filters=SearchFilters(collection_id=scope) if scope else None,
+        )
 
         if not results:
             yield f"data: {json.dumps({'type': 'content', 'content': 'No relevant documents found.'})}\n\n"
@@ -94,15 +124,17 @@ async def ask_stream(request: Request):
             # Fallback to non-streaming
             from rag.generation.router import QueryRouter
             router = QueryRouter()
-            full_answer = router.generate(question, context=prompt, system=citation_gen.SYSTEM_PROMPT)
+            full_answer = await asyncio.to_thread(
+                router.generate, question, context=prompt, system=citation_gen.SYSTEM_PROMPT,
+            )
             yield f"data: {json.dumps({'type': 'content', 'content': full_answer})}\n\n"
 
         # Save to chat session if session_id provided
         if session_id:
             try:
                 pg = PostgresStore()
-                pg.save_chat_message(session_id, "user", question)
-                pg.save_chat_message(session_id, "assistant", full_answer, sources)
+                await pg.save_chat_message_async(session_id, "user", question)
+                await pg.save_chat_message_async(session_id, "assistant", full_answer, sources)
             except Exception:
                 pass
 
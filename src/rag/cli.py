@@ -15,8 +15,8 @@ def ingest(
     from rag.ingestion.pdf import PDFIngestor
     from rag.ingestion.youtube import YouTubeIngestor
     from rag.ingestion.web import WebIngestor
-    from rag.processing.embedding import Embedder
-    from rag.processing.ner import EntityExtractor
+    from rag.processing.registry import get_embedder, get_entity_extractor
+    from rag.pipeline.indexing import embed_and_store, extract_entities
     from rag.processing.graph_builder import GraphBuilder
     from rag.storage.qdrant import QdrantStore
     from rag.storage.postgres import PostgresStore
@@ -51,29 +51,19 @@ def ingest(
     console.print(f"  Extracted [green]{len(chunks)}[/green] chunks")
 
     # Embed and store
-    embedder = Embedder()
+    embedder = get_embedder()
     qdrant = QdrantStore()
     qdrant.ensure_collection()
     postgres = PostgresStore()
 
-    for chunk in chunks:
-        emb = embedder.embed(chunk.content)
-        qdrant.upsert(
-            chunk=chunk,
-            dense_vector=emb.dense,
-            sparse_indices=emb.sparse_indices,
-            sparse_values=emb.sparse_values,
-        )
+    embed_and_store(doc, chunks, embedder, qdrant)
 
     postgres.save_document(doc)
 
     # NER + Graph
-    ner = EntityExtractor()
+    ner = get_entity_extractor()
     graph = GraphBuilder()
-    all_entities = []
-    for chunk in chunks:
-        entities = ner.extract(chunk.content, document_id=doc.id, chunk_id=chunk.id)
-        all_entities.extend(entities)
+    all_entities = extract_entities(doc, chunks, ner)
 
     graph.process_document(doc, all_entities)
     graph.close()
@@ -167,5 +157,128 @@ def stats():
         console.print(f"  {p}: {count}")
 
 
+@app.command()
+def migrate_entities():
+    """Merge duplicate knowledge-graph entities into canonical (name, type) nodes."""
+    from rag.storage.neo4j_store import Neo4jStore
+
+    neo4j = Neo4jStore()
+    result = neo4j.migrate_entity_keys()
+    neo4j.close()
+    console.print(
+        f"[bold green]Done![/bold green] {result['groups']} entities, "
+        f"{result['deleted']} duplicate nodes removed"
+    )
+
+
+@app.command()
+def migrate_collection():
+    """Apply the QDRANT_* quantization, on-disk, HNSW and payload settings to the existing collection."""
+    from rag.config import settings
+    from rag.storage.qdrant import QdrantStore
+
+    qdrant = QdrantStore()
+    qdrant.apply_collection_settings()
+    if not settings.qdrant_payload_content:
+        moved = qdrant.offload_contents()
+        console.print(f"Moved {moved} chunk texts to the content store")
+    info = qdrant.get_collection_info()
+    console.print(
+        f"[bold green]Done![/bold green] '{qdrant.collection_name}' updated "
+        f"(status: {info.status}); indexes are rebuilt in the background"
+    )
+
+
+@app.command()
+def sync_payloads():
+    """Copy document collections, tags, dates, quality and flags into the Qdrant payloads."""
+    from rag.pipeline.payload_sync import sync_document_payloads
+
+    count = sync_document_payloads()
+    console.print(f"[bold green]Done![/bold green] Synced {count} documents")
+
+
+@app.command()
+def reindex(
+    mode: str = typer.Option("embed", help="vectors | embed | rechunk"),
+    resume: str | None = typer.Option(None, help="Continue this job id instead of starting one"),
+    swap: bool = typer.Option(False, help="Swap the alias to the new collection when built"),
+):
+    """Rebuild the Qdrant collection next to the live one (blue/green)."""
+    from rag.pipeline import reindex as reindexing
+
+    job = {"id": resume} if resume else reindexing.start_reindex(mode)
+    console.print(f"Reindex job [bold]{job['id']}[/bold]")
+    job = reindexing.run_reindex(str(job["id"]))
+    console.print(
+        f"[bold green]Built[/bold green] '{job['target_collection']}': "
+        f"{job['documents_done']} documents, {job['chunks_done']} chunks"
+    )
+    if swap:
+        reindex_swap(str(job["id"]), replace_collection=False)
+
+
+@app.command()
+def reindex_swap(
+    job_id: str,
+    replace_collection: bool = typer.Option(
+        False, help="Delete a real collection that has the alias name (first swap only)"
+    ),
+):
+    """Catch up on new documents, then atomically point the alias at a built reindex."""
+    from rag.pipeline import reindex as reindexing
+
+    reindexing.run_reindex(job_id)
+    job = reindexing.swap(job_id, replace_collection=replace_collection)
+    console.print(f"[bold green]Done![/bold green] '{job['alias']}' -> '{job['target_collection']}'")
+
+
+@app.command()
+def reindex_rollback():
+    """Point the alias back at the collection the last swap replaced."""
+    from rag.pipeline import reindex as reindexing
+
+    job = reindexing.rollback()
+    console.print(f"[bold green]Done![/bold green] '{job['alias']}' -> '{job['source_collection']}'")
+
+
+@app.command()
+def reindex_drop(job_id: str):
+    """Delete the collection of a reindex job that is not live."""
+    from rag.pipeline import reindex as reindexing
+
+    job = reindexing.drop(job_id)
+    console.print(f"[bold green]Done![/bold green] '{job['target_collection']}' deleted")
+
+
+@app.command()
+def reindex_status():
+    """List reindex jobs."""
+    from rag.storage.postgres import PostgresStore
+
+    table = Table(title="Reindex jobs")
+    for column in ("Job", "Mode", "Status", "Collection", "Documents", "Chunks", "Updated"):
+        table.add_column(column)
+    for job in PostgresStore().list_reindex_jobs():
+        table.add_row(
+            str(job["id"]), job["mode"], job["status"], job["target_collection"],
+            str(job["documents_done"]), str(job["chunks_done"]),
+            f"{job['updated_at']:%Y-%m-%d %H:%M}",
+        )
+    console.print(table)
+
+
+@app.command()
+def export_onnx(
+    output_dir: str | None = typer.Option(None, help="Defaults to EMBEDDING_ONNX_DIR"),
+    quantize: bool = typer.Option(True, help="Also write an int8 model"),
+):
+    """Export BGE-M3 to ONNX for EMBEDDING_BACKEND=onnx."""
+    from rag.processing.onnx_embedding import export_onnx as export
+
+    out = export(output_dir, quantize=quantize)
+    console.print(f"[bold green]Done![/bold green] ONNX model written to {out}")
+
+
 if __name__ == "__main__":
     app()
@@ -5,12 +5,31 @@ class Settings(BaseSettings):
     # Qdrant
     qdrant_host: str = "localhost"
     qdrant_port: int = 6333
-    qdrant_collection: str = "documents"
+    qdrant_collection: str = "documents"  # collection, or alias after `rag reindex-swap`
+    qdrant_upsert_batch_size: int = 256
+    qdrant_upsert_parallel: int = 1
+    # False: chunk text lives in Postgres (chunk_contents), not in the point
+    # payload, and is fetched only for the results a search returns
+    qdrant_payload_content: bool = True
+    # Collection layout; `rag migrate-collection` applies changes to an existing one
+    qdrant_quantization: str = ""  # "" | scalar (int8) | binary
+    qdrant_quantization_always_ram: bool = True  # keep quantized vectors in RAM
+    qdrant_on_disk: bool = False  # original dense vectors on disk (mmap)
+    qdrant_sparse_on_disk: bool = False
+    qdrant_hnsw_m: int = 16
+    qdrant_hnsw_ef_construct: int = 100
+    # Per-query search params, 0 = Qdrant default
+    qdrant_hnsw_ef: int = 0
+    qdrant_oversampling: float = 0.0  # with quantization: fetch more, rescore with originals
+    # `rag reindex`: documents per checkpoint, pause (s) after each to leave CPU for queries
+    reindex_batch_documents: int = 50
+    reindex_pause: float = 0.0
 
     # Neo4j
     neo4j_uri: str = "bolt://localhost:7687"
     neo4j_user: str = "neo4j"
     neo4j_password: str = "changeme"
+    neo4j_write_batch_size: int = 1000
 
     # PostgreSQL
     postgres_host: str = "localhost"
@@ -18,6 +37,10 @@ class Settings(BaseSettings):
     postgres_db: str = "rag"
     postgres_user: str = "rag"
     postgres_password: str = "changeme"
+    postgres_pool_min_size: int = 1
+    postgres_pool_max_size: int = 10
+    postgres_pool_timeout: float = 30.0
+    postgres_pool_max_idle: float = 300.0
 
     # LLM (OpenAI-compatible API on Mac Studio Ultra)
     llm_base_url: str = "http://192.168.178.8:54321/v1"
@@ -29,13 +52,71 @@ class Settings(BaseSettings):
 
     # Embedding
     embedding_model: str = "BAAI/bge-m3"
-    embedding_device: str = "cpu"
+    embedding_device: str = "cpu"  # cpu | cuda | cuda:0 ... (torch backend)
+    embedding_backend: str = "torch"  # torch | onnx | remote (embedding service)
+    embedding_onnx_dir: str = "data/onnx/bge-m3"  # written by `rag export-onnx`
+    embedding_onnx_quantized: bool = True  # int8 model
+    embedding_threads: int = 0  # CPU threads for inference, 0 = library default
+    embedding_max_length: int = 8192
 
-    # Chunking
+    # Embedding service (python -m rag.embedding_server)
+    embedding_service_url: str = "http://localhost:8766"
+    embedding_service_port: int = 8766
+    embedding_service_timeout: float = 120.0
+    embedding_service_window: float = 0.01  # seconds to collect concurrent requests
+    embedding_service_max_batch: int = 64  # texts per coalesced batch
+    embedding_batch_size: int = 32
+    embedding_max_batch_tokens: int = 16384
+    embedding_cache: bool = True  # reuse embeddings of unchanged texts (Postgres)
+
+    # Ingestion: PDFs from this size on are extracted page by page (PyMuPDF4LLM)
+    # instead of as one Docling conversion, and chunked as a stream
+    ingest_stream_min_bytes: int = 50_000_000
+    # Chunks embedded, stored and tagged per step when indexing a stream
+    ingest_stream_batch_size: int = 256
+
+    # Models preloaded when the API starts (embedder | ner | reranker)
+    model_warmup: list[str] = ["embedder"]
+
+    # NER
+    ner_batch_size: int = 8
+
+    # Chunking (sizes in chunk_unit: words | tokens of the embedding tokenizer)
+    chunk_unit: str = "words"
     chunk_size_leaf: int = 512
     chunk_size_parent: int = 1024
     chunk_size_grandparent: int = 2048
     chunk_overlap: int = 50
+    # Per-platform overrides of which chunk levels are embedded / run NER,
+    # e.g. {"web": {"embed": ["leaf", "parent"], "ner": ["leaf"]}}
+    chunk_policies: dict[str, dict[str, list[str]]] = {}
+
+    # Retrieval
+    retrieval_fusion: str = "rrf"  # rrf | dbsf | weighted | "" (dense only)
+    retrieval_prefetch_limit: int = 50
+    retrieval_dense_weight: float = 0.7
+    retrieval_sparse_weight: float = 0.3
+    retrieval_executor_workers: int = 2
+    # Small-to-big: search leaves, return their "parent" or "grandparent" text
+    retrieval_expand: str = ""
+
+    # Query embedding cache
+    query_cache_size: int = 1024  # entries, 0 = disabled
+    query_cache_ttl: float = 3600.0  # seconds, 0 = no expiry
+    query_cache_shared: bool = False  # also use the Postgres embedding_cache table
+    query_cache_shared_size: int = 100_000  # rows kept in Postgres, 0 = unbounded
+
+    # Reranking
+    reranker_type: str = "llm"  # llm | cross-encoder
+    cross_encoder_model: str = "BAAI/bge-reranker-v2-m3"
+    cross_encoder_backend: str = "torch"  # torch | onnx | openvino
+    cross_encoder_max_length: int = 512
+    cross_encoder_batch_size: int = 16
+    cross_encoder_cache_size: int = 10000
+    reranker_mode: str = "pointwise"  # pointwise | listwise
+    reranker_concurrency: int = 4
+    reranker_time_budget: float = 20.0  # seconds per query, 0 = unlimited
+    reranker_max_chars: int = 1500
 
     # YouTube
     youtube_api_key: str = ""
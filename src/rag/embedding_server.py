@@ -0,0 +1,136 @@
+"""Embedding server: one BGE-M3 instance shared by all RAG processes.
+
+Each API worker, Prefect task and CLI run that loads BGE-M3 itself costs
+~2 GB RAM. With EMBEDDING_BACKEND=remote they call this server instead.
+Concurrent requests arriving within EMBEDDING_SERVICE_WINDOW seconds are
+coalesced into one length-sorted batch, which keeps the CPU busy with
+fewer, fuller forward passes.
+
+The server embeds with the torch or onnx backend (EMBEDDING_BACKEND=remote
+falls back to torch here) and uses the Postgres embedding cache.
+
+Run:
+    python -m rag.embedding_server
+
+Listens on EMBEDDING_SERVICE_PORT (8766). Test:
+    curl -X POST http://localhost:8766/embed \
+         -H 'Content-Type: application/json' -d '{"texts": ["Hallo Welt"]}'
+"""
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import asdict
+
+from fastapi import FastAPI
+from pydantic import BaseModel
+
+from rag.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class EmbedRequest(BaseModel):
+    texts: list[str]
+
+
+class Coalescer:
+    """Collects concurrent requests into batches for a blocking embed function."""
+
+    def __init__(self, embed_fn, window: float, max_batch: int):
+        self.embed_fn = embed_fn
+        self.window = window
+        self.max_batch = max_batch
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.batches = 0
+        self.texts = 0
+
+    async def submit(self, texts: list[str]) -> list:
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((texts, future))
+        return await future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self.queue.get()]
+            count = len(pending[0][0])
+            deadline = loop.time() + self.window
+            while count < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except TimeoutError:
+                    break
+                pending.append(item)
+                count += len(item[0])
+            await self._process(pending)
+
+    async def _process(self, pending: list):
+        texts = [text for request_texts, _ in pending for text in request_texts]
+        try:
+            results = await asyncio.to_thread(self.embed_fn, texts)
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.texts += len(texts)
+        offset = 0
+        for request_texts, future in pending:
+            if not future.done():
+                future.set_result(results[offset:offset + len(request_texts)])
+            offset += len(request_texts)
+
+
+coalescer: Coalescer | None = None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global coalescer
+    from rag.processing.embedding import Embedder
+
+    backend = settings.embedding_backend
+    embedder = Embedder(backend="torch" if backend == "remote" else backend)
+    embedder.embed("warm-up")
+    logger.info(f"Embedding server ready ({embedder.name})")
+
+    coalescer = Coalescer(
+        embedder.embed_many,
+        window=settings.embedding_service_window,
+        max_batch=settings.embedding_service_max_batch,
+    )
+    app.state.model = embedder.name
+    task = asyncio.create_task(coalescer.run())
+    yield
+    task.cancel()
+
+
+app = FastAPI(title="Embedding Server", lifespan=lifespan)
+
+
+@app.post("/embed")
+async def embed(req: EmbedRequest):
+    results = await coalescer.submit(req.texts)
+    return {"model": app.state.model, "data": [asdict(r) for r in results]}
+
+
+@app.get("/health")
+def health():
+    return {
+        "status": "ok",
+        "model": app.state.model,
+        "queued": coalescer.queue.qsize(),
+        "batches": coalescer.batches,
+        "texts": coalescer.texts,
+    }
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host="0.0.0.0", port=settings.embedding_service_port)
@@ -1,8 +1,10 @@
 """Unified document ingestor for local files (PDF, EPUB, DOCX, PPTX, TXT, etc.)."""
 
 import logging
+from collections.abc import Iterator
 from pathlib import Path
 
+from rag.config import settings
 from rag.ingestion.base import BaseIngestor
 from rag.models import Chunk, Document, Platform
 from rag.processing.chunking import HierarchicalChunker
@@ -23,10 +25,42 @@ class DocumentIngestor(BaseIngestor):
     """Unified ingestor for all local file types."""
 
     def __init__(self):
-        self.chunker = HierarchicalChunker()
+        self.chunker = HierarchicalChunker.from_settings()
         self._docling_converter = None
 
     def ingest(self, source: str) -> tuple[Document, list[Chunk]]:
+        path = self._check_path(source)
+
+        text = self._extract_text(path)
+        if not text or not text.strip():
+            raise ValueError(f"No text extracted from {path}")
+
+        doc = self._document(path)
+        chunks = self.chunker.chunk(
+            text=text,
+            document_id=doc.id,
+            metadata={"platform": doc.platform.value, "source": str(path)},
+        )
+        return doc, chunks
+
+    def ingest_stream(self, source: str) -> tuple[Document, Iterator[Chunk]]:
+        """Like ingest, but chunks are generated lazily from text blocks.
+
+        Pages, EPUB sections and plain-text paragraphs are extracted and
+        chunked one block at a time, so very large files never exist as one
+        string. Errors (including "no text extracted") surface while the
+        chunks are consumed.
+        """
+        path = self._check_path(source)
+        doc = self._document(path)
+        chunks = self.chunker.chunk_stream(
+            self._iter_text_blocks(path),
+            document_id=doc.id,
+            metadata={"platform": doc.platform.value, "source": str(path)},
+        )
+        return doc, chunks
+
+    def _check_path(self, source: str) -> Path:
         path = Path(source).resolve()
         if not path.exists():
             raise FileNotFoundError(f"File not found: {path}")
@@ -34,15 +68,15 @@ class DocumentIngestor(BaseIngestor):
         ext = path.suffix.lower()
         if ext not in SUPPORTED_EXTENSIONS:
             raise ValueError(f"Unsupported file type: {ext}")
+        return path
 
-        text = self._extract_text(path)
-        if not text or not text.strip():
-            raise ValueError(f"No text extracted from {path}")
-
+    @staticmethod
+    def _document(path: Path) -> Document:
+        ext = path.suffix.lower()
         # Use Platform.PDF for .pdf files (backward compat), DOCUMENT for everything else
         platform = Platform.PDF if ext == ".pdf" else Platform.DOCUMENT
 
-        doc = Document(
+        return Document(
             title=path.stem,
             source_url=str(path),
             platform=platform,
@@ -53,12 +87,28 @@ class DocumentIngestor(BaseIngestor):
             },
         )
 
-        chunks = self.chunker.chunk(
-            text=text,
-            document_id=doc.id,
-            metadata={"platform": platform.value, "source": str(path)},
-        )
-        return doc, chunks
+    def _iter_text_blocks(self, path: Path) -> Iterator[str]:
+        """Yield the file's text in blocks; raises if there is none."""
+        found = False
+        for block in self._extract_blocks(path):
+            if block and block.strip():
+                found = True
+                yield block
+        if not found:
+            raise ValueError(f"No text extracted from {path}")
+
+    def _extract_blocks(self, path: Path) -> Iterator[str]:
+        ext = path.suffix.lower()
+
+        if ext == ".pdf" and path.stat().st_size >= settings.ingest_stream_min_bytes:
+            # Docling converts the whole file at once; large PDFs go page by page
+            yield from self._extract_pdf_pages(path)
+        elif ext == ".epub":
+            yield from self._extract_epub_sections(path)
+        elif ext in PLAINTEXT_EXTENSIONS:
+            yield from self._extract_plaintext_blocks(path)
+        else:
+            yield self._extract_text(path)
 
     def _extract_text(self, path: Path) -> str:
         """Dispatch text extraction based on file extension."""
@@ -102,6 +152,28 @@ class DocumentIngestor(BaseIngestor):
         except Exception as e:
             raise RuntimeError(f"Failed to extract text from {path}: {e}")
 
+    @staticmethod
+    def _extract_pdf_pages(path: Path) -> Iterator[str]:
+        """PDF pages as markdown (PyMuPDF4LLM), falling back to plain PyMuPDF text."""
+        import pymupdf
+
+        doc = pymupdf.open(str(path))
+        try:
+            try:
+                import pymupdf4llm
+            except ImportError:
+                pymupdf4llm = None
+            for page in doc:
+                if pymupdf4llm is not None:
+                    try:
+                        yield pymupdf4llm.to_markdown(doc, pages=[page.number], show_progress=False)
+                        continue
+                    except Exception as e:
+                        logger.debug(f"PyMuPDF4LLM failed for page {page.number} of {path}: {e}")
+                yield page.get_text()
+        finally:
+            doc.close()
+
     def _extract_with_docling(self, path: Path) -> str:
         """Extract text using Docling (supports PDF, DOCX, PPTX, HTML, XLSX, MD, AsciiDoc)."""
         if self._docling_converter is None:
@@ -113,20 +185,37 @@ class DocumentIngestor(BaseIngestor):
 
     def _extract_epub(self, path: Path) -> str:
         """Extract text from EPUB using ebooklib + BeautifulSoup."""
+        return "\n\n".join(self._extract_epub_sections(path))
+
+    @staticmethod
+    def _extract_epub_sections(path: Path) -> Iterator[str]:
+        """Text of each EPUB document item (chapter/section)."""
         import ebooklib
         from ebooklib import epub
         from bs4 import BeautifulSoup
 
         book = epub.read_epub(str(path), options={"ignore_ncx": True})
-        texts = []
         for item in book.get_items_of_type(ebooklib.ITEM_DOCUMENT):
             soup = BeautifulSoup(item.get_content(), "html.parser")
             text = soup.get_text(separator="\n", strip=True)
             if text:
-                texts.append(text)
-
-        return "\n\n".join(texts)
+                yield text
 
     def _extract_plaintext(self, path: Path) -> str:
         """Read plain text files (UTF-8)."""
         return path.read_text(encoding="utf-8")
+
+    @staticmethod
+    def _extract_plaintext_blocks(path: Path, block_chars: int = 1 << 20) -> Iterator[str]:
+        """Plain text in blocks of about ``block_chars``, split at line ends."""
+        lines: list[str] = []
+        size = 0
+        with path.open(encoding="utf-8") as f:
+            for line in f:
+                lines.append(line)
+                size += len(line)
+                if size >= block_chars:
+                    yield "".join(lines).strip("\n")
+                    lines, size = [], 0
+        if lines:
+            yield "".join(lines).strip("\n")
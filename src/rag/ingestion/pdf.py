@@ -1,5 +1,7 @@
 """PDF Ingestor — backward-compatible shim delegating to DocumentIngestor."""
 
+from collections.abc import Iterator
+
 from rag.ingestion.base import BaseIngestor
 from rag.models import Chunk, Document, Platform
 
@@ -11,3 +13,9 @@ class PDFIngestor(BaseIngestor):
         doc, chunks = doc_ingestor.ingest(source)
         doc.platform = Platform.PDF
         return doc, chunks
+
+    def ingest_stream(self, source: str) -> tuple[Document, Iterator[Chunk]]:
+        from rag.ingestion.document import DocumentIngestor
+        doc, chunks = DocumentIngestor().ingest_stream(source)
+        doc.platform = Platform.PDF
+        return doc, chunks
@@ -9,7 +9,7 @@ from rag.processing.chunking import HierarchicalChunker
 
 class WebIngestor(BaseIngestor):
     def __init__(self):
-        self.chunker = HierarchicalChunker()
+        self.chunker = HierarchicalChunker.from_settings()
 
     def ingest(self, source: str) -> tuple[Document, list[Chunk]]:
         downloaded = trafilatura.fetch_url(source)
@@ -1,8 +1,32 @@
+import hashlib
+import re
+import unicodedata
 from datetime import datetime
 from enum import Enum
-from uuid import uuid4
+from uuid import UUID, uuid4, uuid5
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr, computed_field, model_validator
+
+# Namespace for canonical entity ids. Never change it: existing graph nodes
+# are keyed by ids derived from it.
+ENTITY_ID_NAMESPACE = UUID("3c9a7f52-81d4-4e0b-b6a3-5f2e9d1c8a47")
+# Namespaces for document and chunk ids derived from their source. Never
+# change them: Qdrant point ids are derived from the chunk ids.
+DOCUMENT_ID_NAMESPACE = UUID("9e4b2d71-5c3a-4f8e-a1d6-7b0c3e5f2a98")
+CHUNK_ID_NAMESPACE = UUID("d2f6a8c4-1e7b-4a3d-9c5f-8b2e0a4d6c13")
+
+
+def entity_key(name: str, entity_type: str) -> str:
+    """Normalised identity of an entity: "TYPE:name" with case, Unicode form,
+    whitespace and surrounding punctuation folded away."""
+    name = unicodedata.normalize("NFKC", name).casefold()
+    name = re.sub(r"\s+", " ", name).strip(" \t\n\"'`.,;:!?()[]{}")
+    return f"{entity_type.strip().upper()}:{name}"
+
+
+def entity_id_for(name: str, entity_type: str) -> str:
+    """Canonical entity id: the same for every mention of the same entity."""
+    return str(uuid5(ENTITY_ID_NAMESPACE, entity_key(name, entity_type)))
 
 
 class Platform(str, Enum):
@@ -25,16 +49,80 @@ class Document(BaseModel):
     ingested_at: datetime = Field(default_factory=datetime.now)
     metadata: dict = Field(default_factory=dict)
 
+    @model_validator(mode="before")
+    @classmethod
+    def _default_source_id(cls, data):
+        # Without an explicit id, every ingest of the same source gets the same
+        # id, so a retried or concurrent ingest overwrites instead of duplicating
+        if isinstance(data, dict) and not data.get("id") and data.get("source_url"):
+            data = {**data, "id": str(uuid5(DOCUMENT_ID_NAMESPACE, data["source_url"]))}
+        return data
+
 
 class Chunk(BaseModel):
+    """A piece of a document.
+
+    Either ``content`` is given, or the chunk is a view
+    ``source[start_offset:end_offset]`` into the shared document text and
+    ``content`` is sliced only when read. Chunkers use views so parents,
+    leaves and their overlaps do not each hold a copy of the text.
+    ``source`` may hold only the part of the text from ``source_start`` on
+    (streamed documents); offsets are always relative to the whole text.
+
+    Without an explicit id, the id is derived from the document id, the
+    chunk's level (or type), ``chunk_index`` and its offsets (or, without
+    offsets, a hash of its text), so chunking the same document again
+    gives the same ids and distinct chunks never share one.
+    """
+
     id: str = Field(default_factory=lambda: str(uuid4()))
     document_id: str
-    content: str
     chunk_index: int
     token_count: int
     parent_chunk_id: str | None = None
+    start_offset: int | None = None
+    end_offset: int | None = None
     metadata: dict = Field(default_factory=dict)
 
+    _content: str | None = PrivateAttr(default=None)
+    _source: str | None = PrivateAttr(default=None)
+    _source_start: int = PrivateAttr(default=0)
+
+    def __init__(
+        self,
+        content: str | None = None,
+        source: str | None = None,
+        source_start: int = 0,
+        **data,
+    ):
+        if content is None and source is None:
+            raise ValueError("Chunk needs content or source")
+        if not data.get("id") and "document_id" in data and "chunk_index" in data:
+            data["id"] = _chunk_id(data, content)
+        super().__init__(**data)
+        self._content = content
+        self._source = source
+        self._source_start = source_start
+
+    @computed_field
+    @property
+    def content(self) -> str:
+        if self._content is not None:
+            return self._content
+        base = self._source_start
+        return self._source[self.start_offset - base:self.end_offset - base]
+
+
+def _chunk_id(fields: dict, content: str | None) -> str:
+    metadata = fields.get("metadata") or {}
+    kind = metadata.get("level") or metadata.get("type") or ""
+    if fields.get("start_offset") is not None:
+        span = f"{fields['start_offset']}-{fields.get('end_offset')}"
+    else:
+        span = hashlib.sha256((content or "").encode()).hexdigest()
+    key = f"{fields['document_id']}:{kind}:{fields['chunk_index']}:{span}"
+    return str(uuid5(CHUNK_ID_NAMESPACE, key))
+
 
 class Entity(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid4()))
@@ -45,6 +133,18 @@ class Entity(BaseModel):
     confidence: float = 1.0
     metadata: dict = Field(default_factory=dict)
 
+    @model_validator(mode="before")
+    @classmethod
+    def _default_canonical_id(cls, data):
+        # Without an explicit id, mentions of the same entity share one id
+        if isinstance(data, dict) and not data.get("id") and "name" in data and "entity_type" in data:
+            data = {**data, "id": entity_id_for(data["name"], data["entity_type"])}
+        return data
+
+    @property
+    def key(self) -> str:
+        return entity_key(self.name, self.entity_type)
+
 
 class Topic(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid4()))
@@ -1,20 +1,12 @@
 """URL-based deduplication via PostgreSQL."""
 
-import psycopg
-from rag.config import settings
+from rag.storage.postgres import get_pool
 
 
 def is_already_ingested(source_url: str) -> bool:
     """Check if a URL has already been ingested."""
-    conninfo = (
-        f"host={settings.postgres_host} "
-        f"port={settings.postgres_port} "
-        f"dbname={settings.postgres_db} "
-        f"user={settings.postgres_user} "
-        f"password={settings.postgres_password}"
-    )
     try:
-        with psycopg.connect(conninfo) as conn:
+        with get_pool().connection() as conn:
             with conn.cursor() as cur:
                 cur.execute(
                     "SELECT 1 FROM documents WHERE source_url = %s LIMIT 1",
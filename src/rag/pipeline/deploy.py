@@ -1,18 +1,23 @@
-"""Deploy the daily ingestion flow to Prefect."""
+"""Deploy the daily ingestion and payload sync flows to Prefect."""
 
 from prefect import serve
 
-from rag.pipeline.flows import daily_ingestion
+from rag.pipeline.flows import daily_ingestion, sync_payloads
 
 
 def main():
-    """Start the Prefect worker serving the daily ingestion flow."""
+    """Start the Prefect worker serving the daily ingestion and payload sync flows."""
     deployment = daily_ingestion.to_deployment(
         name="daily-ingestion",
         cron="0 6 * * *",
         tags=["rag", "ingestion"],
     )
-    serve(deployment)
+    sync_deployment = sync_payloads.to_deployment(
+        name="payload-sync",
+        cron="*/15 * * * *",
+        tags=["rag", "sync"],
+    )
+    serve(deployment, sync_deployment)
 
 
 if __name__ == "__main__":
@@ -264,3 +264,14 @@ def daily_ingestion_v2():
     print(f"  Errors:   {results['errors']}")
 
     return results
+
+
+@flow(name="payload-sync", log_prints=True)
+def sync_payloads():
+    """Copy collection/tag membership, dates, quality and flags of all
+    documents into the Qdrant payloads (see rag.pipeline.payload_sync)."""
+    from rag.pipeline.payload_sync import sync_document_payloads
+
+    count = sync_document_payloads()
+    print(f"Synced payloads of {count} documents")
+    return count
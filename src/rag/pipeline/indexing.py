@@ -0,0 +1,89 @@
+"""Embedding, vector storage and NER for a document's chunks.
+
+Shared by the Prefect tasks, the API and the CLI so that every ingestion
+path applies the same chunk policy and batching.
+"""
+
+import logging
+from collections.abc import Iterable
+from itertools import batched
+
+from rag.config import settings
+from rag.models import Chunk, Document, Entity
+from rag.processing.chunk_policy import get_policy
+
+logger = logging.getLogger(__name__)
+
+
+def embed_and_store(doc: Document, chunks: list[Chunk], embedder, qdrant) -> None:
+    """Embed the chunks the policy selects and upsert all chunks to Qdrant.
+
+    Chunks that are not embedded are stored payload-only.
+    """
+    policy = get_policy(doc.platform.value)
+    to_embed = [chunk for chunk in chunks if policy.embeds(chunk)]
+    embeddings = iter(embedder.embed_many([chunk.content for chunk in to_embed]))
+    qdrant.upsert_many(
+        chunks,
+        (next(embeddings) if policy.embeds(chunk) else None for chunk in chunks),
+    )
+
+
+def extract_entities(doc: Document, chunks: list[Chunk], ner) -> list[Entity]:
+    """Run NER on the chunk levels the policy selects.
+
+    Graph mentions are per document, so skipping parents that repeat their
+    leaves' text loses no entities.
+    """
+    policy = get_policy(doc.platform.value)
+    return ner.extract_chunks(
+        [chunk for chunk in chunks if policy.runs_ner(chunk)],
+        document_id=doc.id,
+    )
+
+
+def index_stream(
+    doc: Document,
+    chunks: Iterable[Chunk],
+    embedder,
+    qdrant,
+    ner,
+    batch_size: int | None = None,
+) -> tuple[int, list[Entity]]:
+    """Embed, store and run NER on chunks in fixed-size batches.
+
+    ``chunks`` may be a generator (``DocumentIngestor.ingest_stream``); only
+    one batch is held at a time. Returns the chunk count and the document's
+    entities, one per entity id with its highest confidence.
+
+    Batches are stored while ``chunks`` is still being extracted. If that
+    (or anything else) fails for a document that had no points before, the
+    points stored so far are deleted again, so no vectors remain for a
+    document that is never saved. Points of an already indexed document
+    (document ids derive from the source) are kept: its PostgreSQL and
+    Neo4j records still refer to them.
+    """
+    count = 0
+    entities: dict[str, Entity] = {}
+    existed = qdrant.count_by_document_id(doc.id) > 0
+    try:
+        for batch in batched(chunks, batch_size or settings.ingest_stream_batch_size):
+            batch = list(batch)
+            embed_and_store(doc, batch, embedder, qdrant)
+            for entity in extract_entities(doc, batch, ner):
+                known = entities.get(entity.id)
+                if known is None or entity.confidence > known.confidence:
+                    entities[entity.id] = entity
+            count += len(batch)
+    except Exception:
+        if existed:
+            logger.warning(f"Re-indexing {doc.id} failed after {count} chunks; keeping its points")
+            raise
+        if count:
+            logger.warning(f"Indexing {doc.id} failed after {count} chunks; deleting its points")
+        try:
+            qdrant.delete_by_document_id(doc.id)
+        except Exception as e:
+            logger.error(f"Could not delete the points of {doc.id}: {e}")
+        raise
+    return count, list(entities.values())
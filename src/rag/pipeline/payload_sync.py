@@ -0,0 +1,40 @@
+"""Keep document attributes in the Qdrant point payloads current.
+
+Collection and tag membership, ``created_at``, ``quality_score`` and
+``flagged`` live in PostgreSQL but are copied onto every point of a document
+(``collection_ids``, ``tag_ids``, ...) so search can filter on them in one
+indexed Qdrant query. API routes sync the documents they change right away;
+the scheduled ``payload-sync`` flow re-syncs everything, which picks up
+changes made elsewhere (scripts, topic tagging, direct SQL).
+"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def sync_document_payloads(
+    document_ids: list[str] | None = None, pg=None, qdrant=None
+) -> int:
+    """Copy the attributes of the given (default: all) documents to Qdrant.
+
+    Returns the number of documents synced.
+    """
+    from rag.storage.postgres import PostgresStore
+    from rag.storage.qdrant import QdrantStore
+
+    pg = pg or PostgresStore()
+    qdrant = qdrant or QdrantStore()
+    payloads = pg.get_document_payloads(document_ids)
+    for document_id, payload in payloads.items():
+        qdrant.set_document_payload(document_id, payload)
+    return len(payloads)
+
+
+def sync_quietly(*document_ids: str) -> None:
+    """sync_document_payloads for request handlers: a failure is only logged,
+    the next scheduled sync catches up."""
+    try:
+        sync_document_payloads(list(document_ids))
+    except Exception as e:
+        logger.warning(f"Payload sync failed for {len(document_ids)} documents: {e}")
@@ -0,0 +1,324 @@
+"""Blue/green rebuilds of the chunk collection behind a Qdrant alias.
+
+Search and ingestion use ``settings.qdrant_collection``, which is an alias
+once a reindex has been swapped in. A reindex builds a new versioned
+collection (``documents_20261017120000``) next to the live one while
+everything keeps using the alias, then points the alias at it in one atomic
+request. The previous collection is kept, so ``rollback`` is another alias
+swap.
+
+Modes:
+
+- ``vectors``: copy the points with their vectors, for collection layout
+  changes (quantization, HNSW, on-disk storage).
+- ``embed``: same chunks, new embeddings, for a new embedding model or
+  backend.
+- ``rechunk``: chunk the document text again and embed it, for chunker
+  changes. The text is reassembled from the stored hierarchical chunks and
+  their offsets; documents chunked otherwise (YouTube, Reddit, Twitter) are
+  re-embedded as they are.
+
+Documents are processed in id order, ``settings.reindex_batch_documents``
+at a time. After each batch the position is checkpointed in the
+``reindex_jobs`` table and the build pauses for ``settings.reindex_pause``
+seconds, so an interrupted build resumes where it stopped and live queries
+keep CPU time.
+"""
+
+import logging
+import time
+from datetime import datetime, timezone
+from itertools import batched
+
+from rag.config import settings
+from rag.models import Chunk
+
+logger = logging.getLogger(__name__)
+
+MODES = ("vectors", "embed", "rechunk")
+
+# Payload keys describing a chunk rather than its document
+_CHUNK_KEYS = ("level", "parent_chunk_id", "start_offset", "end_offset")
+
+
+def start_reindex(mode: str = "embed", pg=None, embedder=None) -> dict:
+    """Create the versioned target collection and its job; returns the job."""
+    from rag.processing.registry import get_embedder
+    from rag.storage.postgres import PostgresStore
+    from rag.storage.qdrant import QdrantStore
+
+    if mode not in MODES:
+        raise ValueError(f"Unknown reindex mode: {mode}")
+    pg = pg or PostgresStore()
+    live = QdrantStore()
+    alias = live.collection_name
+    source = live.get_alias_target() or alias
+    target = f"{alias}_{datetime.now(timezone.utc):%Y%m%d%H%M%S}"
+
+    if mode == "vectors":
+        dense_dim = live.get_collection_info().config.params.vectors["dense"].size
+    else:
+        dense_dim = len((embedder or get_embedder()).embed("dimension probe").dense)
+    QdrantStore(collection_name=target).ensure_collection(dense_dim=dense_dim)
+    logger.info(f"Reindex {source} -> {target} ({mode})")
+    return pg.create_reindex_job(alias, source, target, mode)
+
+
+def run_reindex(
+    job_id: str,
+    pg=None,
+    embedder=None,
+    batch_documents: int | None = None,
+    pause: float | None = None,
+) -> dict:
+    """Build (or resume building) the job's collection; returns the job.
+
+    After the pass over all documents, documents ingested into the live
+    collection since the job started are copied again, points of documents
+    deleted since then are removed, and the document attributes are synced.
+    Running it again on a built job repeats that catch-up, e.g. right
+    before ``swap``.
+    """
+    from rag.pipeline.payload_sync import sync_document_payloads
+    from rag.processing.registry import get_embedder
+    from rag.storage.postgres import PostgresStore
+    from rag.storage.qdrant import QdrantStore
+
+    pg = pg or PostgresStore()
+    job = _get_job(pg, job_id)
+    if job["status"] not in ("building", "built"):
+        raise ValueError(f"Reindex job {job_id} is {job['status']}")
+    batch_documents = batch_documents or settings.reindex_batch_documents
+    pause = settings.reindex_pause if pause is None else pause
+
+    source = QdrantStore(collection_name=job["source_collection"])
+    target = QdrantStore(collection_name=job["target_collection"])
+    # Chunk pages are ordered by chunk_index, which older collections lack an index for
+    source.ensure_payload_indexes(missing_only=True)
+    if job["mode"] != "vectors":
+        embedder = embedder or get_embedder()
+
+    def process(document_ids: list[str]) -> int:
+        return sum(
+            _reindex_document(doc_id, job["mode"], source, target, pg, embedder)
+            for doc_id in document_ids
+        )
+
+    try:
+        after = job["last_document_id"]
+        while document_ids := pg.list_document_ids(after=after, limit=batch_documents):
+            chunks = process(document_ids)
+            after = document_ids[-1]
+            job = pg.update_reindex_job(
+                job_id,
+                last_document_id=after,
+                documents_done=job["documents_done"] + len(document_ids),
+                chunks_done=job["chunks_done"] + chunks,
+            )
+            logger.info(
+                f"Reindex {job['target_collection']}: {job['documents_done']} documents, "
+                f"{job['chunks_done']} chunks"
+            )
+            if pause:
+                time.sleep(pause)
+
+        # Documents ingested into the live collection while this ran
+        after = None
+        while document_ids := pg.list_document_ids(
+            after=after, limit=batch_documents, ingested_since=job["started_at"]
+        ):
+            process(document_ids)
+            after = document_ids[-1]
+
+        # Documents deleted (or re-ingested under a new id) while this ran
+        removed = drop_deleted_documents(target, pg, batch_documents)
+        if removed:
+            logger.info(f"Reindex {job['target_collection']}: removed {removed} deleted documents")
+
+        sync_document_payloads(pg=pg, qdrant=target)
+    except Exception as e:
+        pg.update_reindex_job(job_id, error=str(e))
+        raise
+    return pg.update_reindex_job(job_id, status="built", error=None)
+
+
+def swap(job_id: str, pg=None, replace_collection: bool = False) -> dict:
+    """Point the alias at the job's built collection; returns the job.
+
+    The first swap on an install whose ``settings.qdrant_collection`` is a
+    real collection has to delete that collection to free its name for the
+    alias (``replace_collection``); there is nothing to roll back to then.
+    """
+    from rag.storage.postgres import PostgresStore
+    from rag.storage.qdrant import QdrantStore
+
+    pg = pg or PostgresStore()
+    job = _get_job(pg, job_id)
+    if job["status"] != "built":
+        raise ValueError(f"Reindex job {job_id} is {job['status']}, not built")
+
+    store = QdrantStore(collection_name=job["alias"])
+    if store.get_alias_target() is None and _collection_exists(store, job["alias"]):
+        if not replace_collection:
+            raise ValueError(
+                f"'{job['alias']}' is a collection, not an alias: "
+                "replace it to alias the new collection under its name"
+            )
+        store.delete_collection()
+    store.swap_alias(job["target_collection"])
+
+    for live in pg.list_reindex_jobs(alias=job["alias"], status="live"):
+        pg.update_reindex_job(live["id"], status="retired")
+    logger.info(f"Alias {job['alias']} -> {job['target_collection']}")
+    return pg.update_reindex_job(job_id, status="live", swapped_at=datetime.now(timezone.utc))
+
+
+def rollback(alias: str | None = None, pg=None) -> dict:
+    """Point the alias back at the collection the live job replaced; returns that job."""
+    from rag.storage.postgres import PostgresStore
+    from rag.storage.qdrant import QdrantStore
+
+    pg = pg or PostgresStore()
+    alias = alias or settings.qdrant_collection
+    live = pg.list_reindex_jobs(alias=alias, status="live")
+    if not live:
+        raise ValueError(f"No swapped reindex of '{alias}' to roll back")
+    job = live[0]
+
+    store = QdrantStore(collection_name=alias)
+    if not _collection_exists(store, job["source_collection"]):
+        raise ValueError(f"Previous collection '{job['source_collection']}' no longer exists")
+    store.swap_alias(job["source_collection"])
+    pg.update_reindex_job(job["id"], status="rolled_back")
+
+    for previous in pg.list_reindex_jobs(alias=alias, status="retired"):
+        if previous["target_collection"] == job["source_collection"]:
+            pg.update_reindex_job(previous["id"], status="live")
+            break
+    logger.info(f"Alias {alias} -> {job['source_collection']} (rolled back)")
+    return job
+
+
+def drop(job_id: str, pg=None) -> dict:
+    """Delete the collection of a job that is not live; returns the job."""
+    from rag.storage.postgres import PostgresStore
+    from rag.storage.qdrant import QdrantStore
+
+    pg = pg or PostgresStore()
+    job = _get_job(pg, job_id)
+    if job["status"] == "live":
+        raise ValueError(f"Reindex job {job_id} is live; roll it back first")
+    QdrantStore(collection_name=job["target_collection"]).delete_collection()
+    return pg.update_reindex_job(job_id, status="dropped")
+
+
+def drop_deleted_documents(store, pg, batch_size: int = 500) -> int:
+    """Delete the store's points of documents no longer in PostgreSQL.
+
+    Returns the number of documents removed. Their texts are left to the
+    content store, which deleted them with the document.
+    """
+    stored = {p.payload["document_id"] for p in store.iter_points(with_payload=["document_id"])}
+    removed = 0
+    for document_ids in batched(sorted(stored), batch_size):
+        existing = pg.get_existing_document_ids(list(document_ids))
+        for doc_id in document_ids:
+            if doc_id not in existing:
+                store.delete_by_document_id(doc_id, contents=False)
+                removed += 1
+    return removed
+
+
+def _get_job(pg, job_id: str) -> dict:
+    job = pg.get_reindex_job(job_id)
+    if job is None:
+        raise ValueError(f"Unknown reindex job: {job_id}")
+    return job
+
+
+def _collection_exists(store, name: str) -> bool:
+    return name in [c.name for c in store.client.get_collections().collections]
+
+
+def _reindex_document(doc_id: str, mode: str, source, target, pg, embedder) -> int:
+    """Write one document's chunks to the target; returns the chunk count."""
+    from qdrant_client.models import FieldCondition, Filter, MatchValue, PointStruct
+
+    from rag.pipeline.indexing import embed_and_store
+
+    # Replace what an interrupted run may have written (a rechunk may differ)
+    target.delete_by_document_id(doc_id, contents=False)
+
+    if mode == "vectors":
+        count = 0
+        points = source.iter_points(
+            Filter(must=[FieldCondition(key="document_id", match=MatchValue(value=doc_id))]),
+            with_vectors=True,
+        )
+        for batch in batched(points, settings.qdrant_upsert_batch_size):
+            target.client.upsert(
+                collection_name=target.collection_name,
+                points=[PointStruct(id=p.id, vector=p.vector, payload=p.payload) for p in batch],
+            )
+            count += len(batch)
+        return count
+
+    doc = pg.get_document(doc_id)
+    chunks = [_to_chunk(doc_id, c) for c in source.iter_chunks_for_document(doc_id)]
+    if doc is None or not chunks:
+        return 0
+    if mode == "rechunk":
+        chunks = rechunk(doc_id, chunks) or chunks
+    embed_and_store(doc, chunks, embedder, target)
+    return len(chunks)
+
+
+def _to_chunk(doc_id: str, stored: dict) -> Chunk:
+    """Chunk from a get_chunk_page dict, keeping its id."""
+    metadata = dict(stored["metadata"])
+    return Chunk(
+        id=stored["chunk_id"],
+        document_id=doc_id,
+        content=stored["content"],
+        chunk_index=stored["chunk_index"],
+        token_count=len(stored["content"].split()),
+        parent_chunk_id=metadata.pop("parent_chunk_id", None),
+        start_offset=metadata.pop("start_offset", None),
+        end_offset=metadata.pop("end_offset", None),
+        metadata=metadata,
+    )
+
+
+def rechunk(doc_id: str, chunks: list[Chunk]) -> list[Chunk] | None:
+    """Chunk a document again with the current settings.
+
+    None if its text cannot be reassembled (chunks without offsets, or a
+    text is missing).
+    """
+    from rag.processing.chunking import HierarchicalChunker
+
+    spans = [c for c in chunks if c.start_offset is not None]
+    if not spans or any(len(c.content) != c.end_offset - c.start_offset for c in spans):
+        return None
+    metadata = {k: v for k, v in spans[0].metadata.items() if k not in _CHUNK_KEYS}
+    return HierarchicalChunker.from_settings().chunk(
+        reassemble_text(spans), document_id=doc_id, metadata=metadata
+    )
+
+
+def reassemble_text(chunks: list[Chunk]) -> str:
+    """Document text covered by the chunks' offsets.
+
+    Whitespace between chunks is not stored; gaps are filled with spaces so
+    offsets stay those of the original text.
+    """
+    parts: list[str] = []
+    pos = 0
+    for c in sorted(chunks, key=lambda c: (c.start_offset, -c.end_offset)):
+        if c.end_offset <= pos:
+            continue
+        if c.start_offset > pos:
+            parts.append(" " * (c.start_offset - pos))
+        parts.append(c.content[max(pos - c.start_offset, 0):])
+        pos = c.end_offset
+    return "".join(parts)
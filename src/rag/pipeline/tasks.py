@@ -5,6 +5,7 @@ import logging
 from prefect import task
 
 from rag.pipeline.dedup import is_already_ingested
+from rag.pipeline.payload_sync import sync_quietly
 
 logger = logging.getLogger(__name__)
 
@@ -38,8 +39,8 @@ def _run_full_ingest(source: str, source_type: str) -> dict:
     from rag.ingestion.pdf import PDFIngestor
     from rag.ingestion.youtube import YouTubeIngestor
     from rag.ingestion.web import WebIngestor
-    from rag.processing.embedding import Embedder
-    from rag.processing.ner import EntityExtractor
+    from rag.processing.registry import get_embedder, get_entity_extractor
+    from rag.pipeline.indexing import index_stream
     from rag.processing.graph_builder import GraphBuilder
     from rag.storage.qdrant import QdrantStore
     from rag.storage.postgres import PostgresStore
@@ -54,41 +55,34 @@ def _run_full_ingest(source: str, source_type: str) -> dict:
         raise ValueError(f"Unsupported source type: {source_type}")
 
     ingestor = ingestors[source_type]()
-    doc, chunks = ingestor.ingest(source)
+    if source_type == "pdf":
+        # Local files can be huge: extract, chunk and embed them as a stream
+        doc, chunks = ingestor.ingest_stream(source)
+    else:
+        doc, chunks = ingestor.ingest(source)
 
-    embedder = Embedder()
+    embedder = get_embedder()
     qdrant = QdrantStore()
     qdrant.ensure_collection()
     postgres = PostgresStore()
+    ner = get_entity_extractor()
 
-    for chunk in chunks:
-        emb = embedder.embed(chunk.content)
-        qdrant.upsert(
-            chunk=chunk,
-            dense_vector=emb.dense,
-            sparse_indices=emb.sparse_indices,
-            sparse_values=emb.sparse_values,
-        )
+    chunk_count, all_entities = index_stream(doc, chunks, embedder, qdrant, ner)
 
     postgres.save_document(doc)
-    postgres.update_document_counts(doc.id, len(chunks), 0)
+    postgres.update_document_counts(doc.id, chunk_count, 0)
+    sync_quietly(doc.id)
 
-    ner = EntityExtractor()
     graph = GraphBuilder()
-    all_entities = []
-    for chunk in chunks:
-        entities = ner.extract(chunk.content, document_id=doc.id, chunk_id=chunk.id)
-        all_entities.extend(entities)
-
     graph.process_document(doc, all_entities)
     graph.close()
 
-    postgres.update_document_counts(doc.id, len(chunks), len(all_entities))
+    postgres.update_document_counts(doc.id, chunk_count, len(all_entities))
 
     return {
         "doc_id": doc.id,
         "title": doc.title,
-        "chunks": len(chunks),
+        "chunks": chunk_count,
         "entities": len(all_entities),
     }
 
@@ -100,6 +94,7 @@ def _run_full_ingest_to_collection(source: str, source_type: str, collection_id:
         from rag.storage.postgres import PostgresStore
         pg = PostgresStore()
         pg.add_document_to_collection(result["doc_id"], collection_id)
+        sync_quietly(result["doc_id"])
     return result
 
 
@@ -286,8 +281,8 @@ def ingest_reddit_post(url: str) -> dict | None:
 
     try:
         from rag.ingestion.reddit import RedditIngestor
-        from rag.processing.embedding import Embedder
-        from rag.processing.ner import EntityExtractor
+        from rag.processing.registry import get_embedder, get_entity_extractor
+        from rag.pipeline.indexing import embed_and_store, extract_entities
         from rag.processing.graph_builder import GraphBuilder
         from rag.storage.qdrant import QdrantStore
         from rag.storage.postgres import PostgresStore
@@ -296,28 +291,19 @@ def ingest_reddit_post(url: str) -> dict | None:
         ingestor = RedditIngestor()
         doc, chunks = ingestor.ingest(url)
 
-        embedder = Embedder()
+        embedder = get_embedder()
         qdrant = QdrantStore()
         qdrant.ensure_collection()
         postgres = PostgresStore()
 
-        for chunk in chunks:
-            emb = embedder.embed(chunk.content)
-            qdrant.upsert(
-                chunk=chunk,
-                dense_vector=emb.dense,
-                sparse_indices=emb.sparse_indices,
-                sparse_values=emb.sparse_values,
-            )
+        embed_and_store(doc, chunks, embedder, qdrant)
 
         postgres.save_document(doc)
+        sync_quietly(doc.id)
 
-        ner = EntityExtractor()
+        ner = get_entity_extractor()
         graph = GraphBuilder()
-        all_entities = []
-        for chunk in chunks:
-            entities = ner.extract(chunk.content, document_id=doc.id, chunk_id=chunk.id)
-            all_entities.extend(entities)
+        all_entities = extract_entities(doc, chunks, ner)
 
         graph.process_document(doc, all_entities)
         graph.close()
@@ -368,8 +354,8 @@ def ingest_tweet(url: str) -> dict | None:
 
     try:
         from rag.ingestion.twitter import TwitterIngestor
-        from rag.processing.embedding import Embedder
-        from rag.processing.ner import EntityExtractor
+        from rag.processing.registry import get_embedder, get_entity_extractor
+        from rag.pipeline.indexing import embed_and_store, extract_entities
         from rag.processing.graph_builder import GraphBuilder
         from rag.storage.qdrant import QdrantStore
         from rag.storage.postgres import PostgresStore
@@ -378,28 +364,19 @@ def ingest_tweet(url: str) -> dict | None:
         ingestor = TwitterIngestor(cookies_path="/root/rag/twitter_cookies.json")
         doc, chunks = ingestor.ingest(url)
 
-        embedder = Embedder()
+        embedder = get_embedder()
         qdrant = QdrantStore()
         qdrant.ensure_collection()
         postgres = PostgresStore()
 
-        for chunk in chunks:
-            emb = embedder.embed(chunk.content)
-            qdrant.upsert(
-                chunk=chunk,
-                dense_vector=emb.dense,
-                sparse_indices=emb.sparse_indices,
-                sparse_values=emb.sparse_values,
-            )
+        embed_and_store(doc, chunks, embedder, qdrant)
 
         postgres.save_document(doc)
+        sync_quietly(doc.id)
 
-        ner = EntityExtractor()
+        ner = get_entity_extractor()
         graph = GraphBuilder()
-        all_entities = []
-        for chunk in chunks:
-            entities = ner.extract(chunk.content, document_id=doc.id, chunk_id=chunk.id)
-            all_entities.extend(entities)
+        all_entities = extract_entities(doc, chunks, ner)
 
         graph.process_document(doc, all_entities)
         graph.close()
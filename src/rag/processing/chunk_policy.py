@@ -0,0 +1,68 @@
+"""Per-platform policy for which chunk levels get model work.
+
+Hierarchical chunkers emit parent chunks that cover the same words as their
+leaves. Embedding and running NER on both doubles the CPU cost, so each
+platform declares which levels are embedded and which run NER. Chunks that
+are not embedded are still stored in Qdrant, payload-only.
+"""
+
+from dataclasses import dataclass
+
+from rag.config import settings
+from rag.models import Chunk
+
+
+@dataclass(frozen=True)
+class ChunkPolicy:
+    embed_levels: frozenset[str]
+    ner_levels: frozenset[str]
+
+    def embeds(self, chunk: Chunk) -> bool:
+        return chunk_level(chunk) in self.embed_levels
+
+    def runs_ner(self, chunk: Chunk) -> bool:
+        return chunk_level(chunk) in self.ner_levels
+
+
+def chunk_level(chunk: Chunk) -> str:
+    """Hierarchy level of a chunk: "leaf", "parent" or "grandparent".
+
+    Chunks without a level (single-chunk documents, YouTube windows, Reddit
+    posts and comments) are leaves; a Twitter thread is the parent of its
+    tweets.
+    """
+    level = chunk.metadata.get("level")
+    if level:
+        return level
+    if chunk.metadata.get("type") == "thread":
+        return "parent"
+    return "leaf"
+
+
+DEFAULT_POLICY = ChunkPolicy(
+    embed_levels=frozenset({"leaf"}),
+    ner_levels=frozenset({"leaf"}),
+)
+
+PLATFORM_POLICIES: dict[str, ChunkPolicy] = {
+    # Whole threads are the better retrieval unit; single tweets are tiny
+    "twitter": ChunkPolicy(
+        embed_levels=frozenset({"leaf", "parent"}),
+        ner_levels=frozenset({"leaf"}),
+    ),
+}
+
+
+def get_policy(platform: str) -> ChunkPolicy:
+    """Policy for a platform; ``settings.chunk_policies`` overrides the defaults.
+
+    Example override: ``{"web": {"embed": ["leaf", "parent"], "ner": ["leaf"]}}``.
+    """
+    policy = PLATFORM_POLICIES.get(platform, DEFAULT_POLICY)
+    override = settings.chunk_policies.get(platform)
+    if override:
+        policy = ChunkPolicy(
+            embed_levels=frozenset(override.get("embed", policy.embed_levels)),
+            ner_levels=frozenset(override.get("ner", policy.ner_levels)),
+        )
+    return policy
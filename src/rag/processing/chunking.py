@@ -1,8 +1,23 @@
+import re
+from collections.abc import Iterable, Iterator
+
+from rag.config import settings
 from rag.models import Chunk
 
+# Joins the text blocks of a streamed document
+BLOCK_SEPARATOR = "\n\n"
+
 
 class HierarchicalChunker:
-    """Hierarchical chunker creating leaf, parent, and grandparent chunks."""
+    """Hierarchical chunker creating leaf, parent, and grandparent chunks.
+
+    Sizes count whitespace-separated words unless a ``tokenizer`` (a
+    ``tokenizers.Tokenizer``, see ``rag.processing.registry.get_tokenizer``)
+    is given. Then sizes and ``token_count`` are XLM-R tokens as seen by
+    BGE-M3 (without the two special tokens), so leaves fill the model window
+    without truncation. The document is tokenised once and chunks are cut
+    at word boundaries where possible.
+    """
 
     def __init__(
         self,
@@ -10,11 +25,28 @@ class HierarchicalChunker:
         parent_size: int = 1024,
         grandparent_size: int = 2048,
         overlap: int = 50,
+        tokenizer=None,
     ):
         self.leaf_size = leaf_size
         self.parent_size = parent_size
         self.grandparent_size = grandparent_size
         self.overlap = overlap
+        self.tokenizer = tokenizer
+
+    @classmethod
+    def from_settings(cls) -> "HierarchicalChunker":
+        """Chunker with the configured sizes and unit (``settings.chunk_unit``)."""
+        tokenizer = None
+        if settings.chunk_unit == "tokens":
+            from rag.processing.registry import get_tokenizer
+            tokenizer = get_tokenizer()
+        return cls(
+            leaf_size=settings.chunk_size_leaf,
+            parent_size=settings.chunk_size_parent,
+            grandparent_size=settings.chunk_size_grandparent,
+            overlap=settings.chunk_overlap,
+            tokenizer=tokenizer,
+        )
 
     def chunk(
         self,
@@ -22,70 +54,222 @@ class HierarchicalChunker:
         document_id: str,
         metadata: dict | None = None,
     ) -> list[Chunk]:
+        """Split ``text`` into grandparent, parent and leaf chunks.
+
+        Each parent lies within its grandparent and each leaf within its
+        parent; ``parent_chunk_id`` links a chunk to the level above.
+
+        Chunks are (start, end) character views into ``text``, which all
+        of them share; no chunk text is copied while chunking.
+        """
+        return list(self.chunk_stream([text], document_id, metadata))
+
+    def chunk_stream(
+        self,
+        blocks: Iterable[str],
+        document_id: str,
+        metadata: dict | None = None,
+    ) -> Iterator[Chunk]:
+        """Chunk text that arrives in blocks (pages, sections), lazily.
+
+        Blocks are joined with a blank line. A grandparent and its parents
+        and leaves are yielded as soon as the text after it is known. The
+        text before the next grandparent's overlap is dropped once it is
+        longer than the rest (so each character is copied a bounded number
+        of times), so memory is bounded by the window and block sizes rather
+        than the document. The chunks equal ``chunk`` on the joined text;
+        offsets are relative to the whole text. A single block is never
+        copied: all its chunks are views into it.
+        """
         metadata = metadata or {}
-        words = text.split()
+        text = ""  # document text from ``base`` on, without ``pending``
+        pending: list[str] = []  # blocks not yet joined onto ``text``
+        base = 0
+        length = 0  # of ``text`` and ``pending``
+        offsets: list[tuple[int, int]] = []
+        word_starts: list[bool] = []
+        head = 0  # first unit not yet behind a finished grandparent
+        index = 0
 
-        if len(words) <= self.leaf_size:
-            return [
-                Chunk(
-                    document_id=document_id,
-                    content=text,
-                    chunk_index=0,
-                    token_count=len(words),
-                    metadata=metadata,
+        def join() -> None:
+            nonlocal text, pending, base, length, offsets, word_starts, head
+            cut = offsets[head][0] if head else 0
+            # Drop the consumed text only once it outweighs the rest
+            if 2 * cut <= length:
+                cut = 0
+            parts = [text[cut:], *pending] if cut < len(text) else pending
+            text = "".join(parts) if len(parts) > 1 else parts[0]
+            pending = []
+            if cut:
+                base += cut
+                length -= cut
+                offsets = [(s - cut, e - cut) for s, e in offsets[head:]]
+                word_starts = word_starts[head:]
+                head = 0
+
+        for block in blocks:
+            if not block:
+                continue
+            if length:
+                pending.append(BLOCK_SEPARATOR)
+                length += len(BLOCK_SEPARATOR)
+            pending.append(block)
+            block_offsets, block_starts = self._units(block)
+            offsets.extend((s + length, e + length) for s, e in block_offsets)
+            word_starts.extend(block_starts)
+            length += len(block)
+
+            # More units than a grandparent: the first window is final
+            while len(offsets) - head > self.grandparent_size:
+                if pending:
+                    join()
+                stop, next_start = self._window(
+                    word_starts, head, len(offsets), self.grandparent_size, self.overlap
+                )
+                yield from self._grandparent(
+                    text, base, offsets, word_starts, head, stop, index, document_id, metadata
                 )
-            ]
+                index += 1
+                head = next_start
 
-        # Create parent-level chunks first
-        parent_chunks = self._split_words(
-            words, self.parent_size, self.overlap
-        )
-        all_chunks = []
+        if pending:
+            join()
+        if index == 0 and len(offsets) <= self.leaf_size:
+            yield Chunk(
+                document_id=document_id,
+                source=text,
+                start_offset=0,
+                end_offset=len(text),
+                chunk_index=0,
+                token_count=len(offsets),
+                metadata=metadata,
+            )
+            return
+
+        for g_start, g_end in self._split_spans(
+            word_starts, head, len(offsets), self.grandparent_size, self.overlap
+        ):
+            yield from self._grandparent(
+                text, base, offsets, word_starts, g_start, g_end, index, document_id, metadata
+            )
+            index += 1
+
+    def _grandparent(
+        self,
+        text: str,
+        base: int,
+        offsets: list[tuple[int, int]],
+        word_starts: list[bool],
+        g_start: int,
+        g_end: int,
+        gi: int,
+        document_id: str,
+        metadata: dict,
+    ) -> Iterator[Chunk]:
+        """A grandparent over units [g_start, g_end), its parents and their leaves."""
 
-        for pi, parent_words in enumerate(parent_chunks):
-            parent_text = " ".join(parent_words)
-            parent = Chunk(
+        def view(start: int, end: int, **fields) -> Chunk:
+            char_start, char_end = offsets[start][0], offsets[end - 1][1]
+            # SentencePiece offsets may include surrounding spaces
+            while char_start < char_end and text[char_start].isspace():
+                char_start += 1
+            while char_end > char_start and text[char_end - 1].isspace():
+                char_end -= 1
+            return Chunk(
                 document_id=document_id,
-                content=parent_text,
-                chunk_index=pi,
-                token_count=len(parent_words),
+                source=text,
+                source_start=base,
+                start_offset=base + char_start,
+                end_offset=base + char_end,
+                token_count=end - start,
+                **fields,
+            )
+
+        grandparent = view(
+            g_start, g_end,
+            chunk_index=gi,
+            metadata={**metadata, "level": "grandparent"},
+        )
+        yield grandparent
+
+        parent_spans = self._split_spans(
+            word_starts, g_start, g_end, self.parent_size, self.overlap
+        )
+        for pi, (p_start, p_end) in enumerate(parent_spans):
+            parent_index = gi * 100 + pi
+            parent = view(
+                p_start, p_end,
+                chunk_index=parent_index,
+                parent_chunk_id=grandparent.id,
                 metadata={**metadata, "level": "parent"},
             )
-            all_chunks.append(parent)
+            yield parent
 
-            # Split parent into leaf chunks
-            leaf_groups = self._split_words(
-                parent_words, self.leaf_size, self.overlap
+            leaf_spans = self._split_spans(
+                word_starts, p_start, p_end, self.leaf_size, self.overlap
             )
-            for li, leaf_words in enumerate(leaf_groups):
-                leaf_text = " ".join(leaf_words)
-                leaf = Chunk(
-                    document_id=document_id,
-                    content=leaf_text,
-                    chunk_index=pi * 100 + li,
-                    token_count=len(leaf_words),
+            for li, (l_start, l_end) in enumerate(leaf_spans):
+                yield view(
+                    l_start, l_end,
+                    chunk_index=parent_index * 100 + li,
                     parent_chunk_id=parent.id,
                     metadata={**metadata, "level": "leaf"},
                 )
-                all_chunks.append(leaf)
 
-        return all_chunks
+    def _units(self, text: str) -> tuple[list[tuple[int, int]], list[bool]]:
+        """Character offsets of the counting units and which of them start a word."""
+        if self.tokenizer is None:
+            offsets = [m.span() for m in re.finditer(r"\S+", text)]
+            return offsets, [True] * len(offsets)
+
+        offsets = self.tokenizer.encode(text, add_special_tokens=False).offsets
+        # A token starts a word when it begins with or follows whitespace
+        # (SentencePiece offsets may include the leading space)
+        word_starts = [
+            i == 0
+            or text[start:start + 1].isspace()
+            or (start > 0 and text[start - 1].isspace())
+            for i, (start, _) in enumerate(offsets)
+        ]
+        return offsets, word_starts
 
     @staticmethod
-    def _split_words(
-        words: list[str], size: int, overlap: int
-    ) -> list[list[str]]:
-        if len(words) <= size:
-            return [words]
-        chunks = []
-        start = 0
-        while start < len(words):
-            end = min(start + size, len(words))
-            chunks.append(words[start:end])
-            start += size - overlap
-            if start >= len(words):
+    def _split_spans(
+        word_starts: list[bool], begin: int, end: int, size: int, overlap: int
+    ) -> list[tuple[int, int]]:
+        """(start, end) windows of ``size`` units over [begin, end), overlapping by ``overlap``."""
+        if end - begin <= size:
+            return [(begin, end)]
+        spans = []
+        start = begin
+        while start < end:
+            stop, next_start = HierarchicalChunker._window(word_starts, start, end, size, overlap)
+            spans.append((start, stop))
+            if stop >= end:
                 break
-        return chunks
+            start = next_start
+        return spans
+
+    @staticmethod
+    def _window(
+        word_starts: list[bool], start: int, end: int, size: int, overlap: int
+    ) -> tuple[int, int]:
+        """End of the window beginning at ``start`` and the start of the next one.
+
+        Window edges move back to the nearest word start within a quarter
+        of the window, so words are only cut when they are longer than that.
+        """
+        def snap(i: int, floor: int) -> int:
+            j = i
+            while j > floor and not word_starts[j]:
+                j -= 1
+            return j if j > floor else i
+
+        stop = min(start + size, end)
+        if stop < end:
+            stop = snap(stop, max(start, stop - size // 4))
+        next_start = snap(stop - overlap, start) if overlap else stop
+        return stop, next_start if next_start > start else stop
 
 
 class MediaChunker:
@@ -1,8 +1,7 @@
 from dataclasses import dataclass
 
-from FlagEmbedding import BGEM3FlagModel
-
 from rag.config import settings
+from rag.processing.embedding_cache import EmbeddingCache
 
 
 @dataclass
@@ -13,17 +12,73 @@ class EmbeddingResult:
 
 
 class Embedder:
-    def __init__(self):
-        self.model = BGEM3FlagModel(
-            settings.embedding_model, use_fp16=False
-        )
+    """BGE-M3 dense + sparse embeddings.
+
+    ``settings.embedding_backend`` selects fp32/fp16 PyTorch (``torch``),
+    ONNX Runtime (``onnx``, int8 by default; see rag.processing.onnx_embedding)
+    or the shared embedding service (``remote``; see rag.embedding_server),
+    which keeps the model out of this process entirely.
+    """
+
+    def __init__(self, cache: EmbeddingCache | None = None, backend: str | None = None):
+        self.backend = backend or settings.embedding_backend
+        if self.backend == "remote":
+            from rag.processing.embedding_client import RemoteBGEM3
+            self.model = RemoteBGEM3()
+            self.name = settings.embedding_model
+        elif self.backend == "onnx":
+            from rag.processing.onnx_embedding import OnnxBGEM3
+            self.model = OnnxBGEM3()
+            quantized = "-int8" if settings.embedding_onnx_quantized else ""
+            self.name = f"{settings.embedding_model}@onnx{quantized}"
+        elif self.backend == "torch":
+            if settings.embedding_threads:
+                import torch
+                torch.set_num_threads(settings.embedding_threads)
+            from FlagEmbedding import BGEM3FlagModel
+            self.model = BGEM3FlagModel(
+                settings.embedding_model,
+                use_fp16=settings.embedding_device != "cpu",
+                devices=settings.embedding_device,
+                passage_max_length=settings.embedding_max_length,
+            )
+            self.name = settings.embedding_model
+        else:
+            raise ValueError(f"Unknown embedding backend: {self.backend}")
+        # Quantized outputs differ slightly, so each backend has its own cache
+        # entries; the embedding service keeps its own cache.
+        use_cache = settings.embedding_cache and self.backend != "remote"
+        self.cache = cache or (EmbeddingCache(self.name) if use_cache else None)
 
     def embed(self, text: str) -> EmbeddingResult:
-        return self.embed_batch([text])[0]
+        # Queries have their own cache (rag.retrieval.query_cache)
+        return self._encode([text])[0]
 
     def embed_batch(self, texts: list[str]) -> list[EmbeddingResult]:
+        """Embed texts, reusing cached embeddings of texts seen before."""
+        cached = self._lookup(texts)
+        missing = list(dict.fromkeys(t for t in texts if t not in cached))
+        if missing:
+            cached.update(zip(missing, self._encode(missing)))
+            self._save(missing, [cached[t] for t in missing])
+        return [cached[t] for t in texts]
+
+    def _lookup(self, texts: list[str]) -> dict[str, EmbeddingResult]:
+        if self.cache is None:
+            return {}
+        return {
+            text: EmbeddingResult(**row)
+            for text, row in self.cache.get_many(texts).items()
+        }
+
+    def _save(self, texts: list[str], embeddings: list[EmbeddingResult]) -> None:
+        if self.cache is not None:
+            self.cache.put_many(texts, embeddings)
+
+    def _encode(self, texts: list[str]) -> list[EmbeddingResult]:
         output = self.model.encode(
             texts,
+            batch_size=max(1, len(texts)),
             return_dense=True,
             return_sparse=True,
         )
@@ -41,3 +96,59 @@ class Embedder:
                 )
             )
         return results
+
+    def embed_many(
+        self,
+        texts: list[str],
+        batch_size: int | None = None,
+        max_batch_tokens: int | None = None,
+    ) -> list[EmbeddingResult]:
+        """Embed any number of texts in length-sorted batches.
+
+        Cached texts are looked up in one bulk query and duplicates are
+        embedded once. The rest are sorted by length to keep padding low;
+        each batch is capped both by count and by its padded token cost and
+        is cached as soon as it is done. Results are in input order.
+        """
+        batch_size = batch_size or settings.embedding_batch_size
+        max_batch_tokens = max_batch_tokens or settings.embedding_max_batch_tokens
+
+        cached = self._lookup(texts)
+        missing = sorted(
+            {t for t in texts if t not in cached},
+            key=len,
+        )
+        lengths = [estimate_tokens(t) for t in missing]
+
+        for start, end in plan_batches(lengths, batch_size, max_batch_tokens):
+            batch = missing[start:end]
+            embedded = self._encode(batch)
+            cached.update(zip(batch, embedded))
+            self._save(batch, embedded)
+        return [cached[t] for t in texts]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough XLM-R token count (~4 characters per token)."""
+    return len(text) // 4 + 1
+
+
+def plan_batches(
+    sorted_lengths: list[int], batch_size: int, max_batch_tokens: int
+) -> list[tuple[int, int]]:
+    """Split ascending token lengths into (start, end) batch ranges.
+
+    The padded cost of a batch is its size times its longest member, so a
+    batch is closed before adding an item would exceed ``max_batch_tokens``.
+    A single item longer than the budget still gets a batch of its own.
+    """
+    batches = []
+    start = 0
+    for i, length in enumerate(sorted_lengths):
+        size = i - start + 1
+        if i > start and (size > batch_size or size * length > max_batch_tokens):
+            batches.append((start, i))
+            start = i
+    if start < len(sorted_lengths):
+        batches.append((start, len(sorted_lengths)))
+    return batches
@@ -0,0 +1,85 @@
+"""Persistent embedding cache keyed by (model name, sha256 of text).
+
+Re-ingesting a source deletes and re-chunks it, but most chunk texts come
+back unchanged. Looking their embeddings up in the Postgres
+``embedding_cache`` table (dense vectors stored as float16 blobs) turns
+hours of BGE-M3 CPU time into a few bulk queries.
+"""
+
+import hashlib
+import logging
+
+from rag.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class EmbeddingCache:
+    """Bulk get/put of embeddings by text.
+
+    A failing database never fails embedding: the error is logged once and
+    the cache turns itself off for the lifetime of the instance.
+
+    With a ``ttl`` (seconds) older rows are ignored and puts refresh
+    existing rows; ``prune`` deletes them.
+    """
+
+    def __init__(self, model: str | None = None, store=None, ttl: float = 0):
+        self.model = model or settings.embedding_model
+        self._store = store
+        self.ttl = ttl
+        self.enabled = True
+
+    @property
+    def store(self):
+        if self._store is None:
+            from rag.storage.postgres import PostgresStore
+            self._store = PostgresStore()
+        return self._store
+
+    def get_many(self, texts: list[str]) -> dict[str, dict]:
+        """Cached embeddings for the texts that have one, keyed by text.
+
+        Values have ``dense``, ``sparse_indices`` and ``sparse_values`` keys.
+        """
+        if not self.enabled or not texts:
+            return {}
+        hashes = {text_hash(text): text for text in texts}
+        try:
+            found = self.store.get_cached_embeddings(self.model, list(hashes), max_age=self.ttl or None)
+        except Exception as e:
+            self._disable(e)
+            return {}
+        return {hashes[h]: row for h, row in found.items()}
+
+    def put_many(self, texts: list[str], embeddings: list) -> None:
+        if not self.enabled or not texts:
+            return
+        try:
+            self.store.save_cached_embeddings(
+                self.model,
+                {text_hash(text): embedding for text, embedding in zip(texts, embeddings)},
+                refresh=bool(self.ttl),
+            )
+        except Exception as e:
+            self._disable(e)
+
+    def prune(self, max_rows: int | None = None) -> int:
+        """Delete expired rows and all but the ``max_rows`` newest; returns the count."""
+        if not self.enabled:
+            return 0
+        try:
+            return self.store.prune_cached_embeddings(
+                self.model, max_age=self.ttl or None, max_rows=max_rows or None
+            )
+        except Exception as e:
+            self._disable(e)
+            return 0
+
+    def _disable(self, error: Exception) -> None:
+        logger.warning(f"Embedding cache disabled: {error}")
+        self.enabled = False
@@ -0,0 +1,31 @@
+"""Client for the shared embedding service (rag.embedding_server)."""
+
+import httpx
+import numpy as np
+
+from rag.config import settings
+
+
+class RemoteBGEM3:
+    """Drop-in for ``BGEM3FlagModel.encode`` that calls the embedding service."""
+
+    def __init__(self, base_url: str | None = None, timeout: float | None = None):
+        self.client = httpx.Client(
+            base_url=(base_url or settings.embedding_service_url).rstrip("/"),
+            timeout=timeout or settings.embedding_service_timeout,
+        )
+
+    def encode(self, sentences: list[str], **kwargs) -> dict:
+        response = self.client.post("/embed", json={"texts": list(sentences)})
+        response.raise_for_status()
+        data = response.json()["data"]
+        return {
+            "dense_vecs": np.array([item["dense"] for item in data]),
+            "lexical_weights": [
+                dict(zip(map(str, item["sparse_indices"]), item["sparse_values"]))
+                for item in data
+            ],
+        }
+
+    def close(self):
+        self.client.close()
@@ -14,27 +14,17 @@ class GraphBuilder:
         entities: list[Entity],
         topics: list[Topic] | None = None,
     ) -> None:
-        self.store.create_document_node(doc)
-
-        for entity in entities:
-            self.store.create_entity_node(entity)
-            self.store.create_mentions_relationship(
-                doc.id, entity.id, confidence=entity.confidence
-            )
-
-        if topics:
-            for topic in topics:
-                self.store.create_topic_relationship(doc.id, topic.name)
+        self.store.write_documents([(doc, entities, topics)])
 
     def process_batch(
         self,
         documents: list[tuple[Document, list[Entity], list[Topic] | None]],
     ) -> int:
-        count = 0
-        for doc, entities, topics in documents:
-            self.process_document(doc, entities, topics)
-            count += 1
-        return count
+        """Write several documents' graphs in one transaction."""
+        if not documents:
+            return 0
+        self.store.write_documents(documents)
+        return len(documents)
 
     def close(self):
         self.store.close()
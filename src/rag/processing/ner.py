@@ -1,6 +1,7 @@
 from gliner import GLiNER
 
-from rag.models import Entity
+from rag.config import settings
+from rag.models import Chunk, Entity
 
 
 class EntityExtractor:
@@ -24,34 +25,76 @@ class EntityExtractor:
         predictions = self.model.predict_entities(
             text, labels, threshold=threshold
         )
-
-        entities = []
-        seen = set()
-        for pred in predictions:
-            key = (pred["text"], pred["label"])
-            if key in seen:
-                continue
-            seen.add(key)
-
-            entities.append(
-                Entity(
-                    name=pred["text"],
-                    entity_type=pred["label"],
-                    source_document_id=document_id or "",
-                    source_chunk_id=chunk_id,
-                    confidence=pred["score"],
-                )
-            )
-
-        return entities
+        return self._to_entities(predictions, document_id, chunk_id)
 
     def extract_batch(
         self,
         texts: list[str],
         labels: list[str] | None = None,
         threshold: float = 0.4,
+        document_id: str | None = None,
+        chunk_ids: list[str | None] | None = None,
+        batch_size: int | None = None,
     ) -> list[list[Entity]]:
-        return [
-            self.extract(text, labels, threshold)
-            for text in texts
-        ]
+        """Run GLiNER on many texts with batched inference.
+
+        Texts are bucketed by length so each batch pads to similar sizes.
+        The result list is aligned with ``texts``; entities carry the
+        matching ``chunk_ids`` entry as ``source_chunk_id``. Empty and
+        whitespace-only texts are not sent to the model and get ``[]``.
+        """
+        labels = labels or self.DEFAULT_LABELS
+        batch_size = batch_size or settings.ner_batch_size
+        chunk_ids = chunk_ids or [None] * len(texts)
+
+        non_empty = [i for i, text in enumerate(texts) if text.strip()]
+        order = sorted(non_empty, key=lambda i: len(texts[i]))
+        results: list[list[Entity]] = [[] for _ in texts]
+        for start in range(0, len(order), batch_size):
+            batch_ids = order[start:start + batch_size]
+            predictions = self.model.batch_predict_entities(
+                [texts[i] for i in batch_ids], labels, threshold=threshold
+            )
+            for i, preds in zip(batch_ids, predictions):
+                results[i] = self._to_entities(preds, document_id, chunk_ids[i])
+        return results
+
+    def extract_chunks(
+        self,
+        chunks: list[Chunk],
+        labels: list[str] | None = None,
+        threshold: float = 0.4,
+        document_id: str | None = None,
+    ) -> list[Entity]:
+        """Batched extraction over a document's chunks, flattened."""
+        per_chunk = self.extract_batch(
+            [chunk.content for chunk in chunks],
+            labels,
+            threshold,
+            document_id=document_id,
+            chunk_ids=[chunk.id for chunk in chunks],
+        )
+        return [entity for entities in per_chunk for entity in entities]
+
+    @staticmethod
+    def _to_entities(
+        predictions: list[dict],
+        document_id: str | None,
+        chunk_id: str | None,
+    ) -> list[Entity]:
+        entities = []
+        seen = set()
+        for pred in predictions:
+            entity = Entity(
+                name=pred["text"],
+                entity_type=pred["label"],
+                source_document_id=document_id or "",
+                source_chunk_id=chunk_id,
+                confidence=pred["score"],
+            )
+            if entity.id in seen:
+                continue
+            seen.add(entity.id)
+            entities.append(entity)
+
+        return entities
@@ -0,0 +1,173 @@
+"""BGE-M3 on ONNX Runtime with optional dynamic int8 quantization.
+
+The XLM-R backbone is exported once with ``export_onnx`` (``rag export-onnx``)
+and then served by ``OnnxBGEM3``, which reproduces ``BGEM3FlagModel.encode``
+for dense and sparse outputs: the dense vector is the normalised CLS hidden
+state and the sparse weights are ``relu(sparse_linear(hidden))`` max-pooled
+per token id, without special tokens. On CPU the int8 model is typically
+2-4x faster than fp32 PyTorch.
+"""
+
+import os
+from pathlib import Path
+
+import numpy as np
+
+from rag.config import settings
+
+FP32_FILE = "model.onnx"
+INT8_FILE = "model_int8.onnx"
+SPARSE_FILE = "sparse_linear.npz"
+
+
+def export_onnx(
+    output_dir: str | Path | None = None,
+    model_name: str | None = None,
+    quantize: bool = True,
+) -> Path:
+    """Export the BGE-M3 backbone, tokenizer and sparse head to ``output_dir``.
+
+    With ``quantize`` an int8 copy (dynamic quantization of the weights) is
+    written next to the fp32 model. Returns the output directory.
+    """
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from transformers import AutoModel, AutoTokenizer
+
+    model_name = model_name or settings.embedding_model
+    out = Path(output_dir or settings.embedding_onnx_dir)
+    out.mkdir(parents=True, exist_ok=True)
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    tokenizer.save_pretrained(out)
+    model = AutoModel.from_pretrained(model_name).eval()
+
+    inputs = tokenizer(["export"], return_tensors="pt")
+    axes = {0: "batch", 1: "sequence"}
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            (inputs["input_ids"], inputs["attention_mask"]),
+            str(out / FP32_FILE),
+            input_names=["input_ids", "attention_mask"],
+            output_names=["last_hidden_state"],
+            dynamic_axes={
+                "input_ids": axes,
+                "attention_mask": axes,
+                "last_hidden_state": axes,
+            },
+            opset_version=17,
+        )
+
+    sparse = torch.load(_sparse_linear_path(model_name), map_location="cpu")
+    np.savez(
+        out / SPARSE_FILE,
+        weight=sparse["weight"].numpy(),
+        bias=sparse["bias"].numpy(),
+    )
+
+    if quantize:
+        quantize_dynamic(
+            str(out / FP32_FILE),
+            str(out / INT8_FILE),
+            weight_type=QuantType.QInt8,
+        )
+    return out
+
+
+def _sparse_linear_path(model_name: str) -> str:
+    if os.path.isdir(model_name):
+        return os.path.join(model_name, "sparse_linear.pt")
+    from huggingface_hub import hf_hub_download
+    return hf_hub_download(model_name, "sparse_linear.pt")
+
+
+class OnnxBGEM3:
+    """Drop-in for ``BGEM3FlagModel.encode`` (dense + sparse) on ONNX Runtime."""
+
+    def __init__(
+        self,
+        model_dir: str | Path | None = None,
+        quantized: bool | None = None,
+        threads: int | None = None,
+        max_length: int | None = None,
+    ):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        model_dir = Path(model_dir or settings.embedding_onnx_dir)
+        quantized = settings.embedding_onnx_quantized if quantized is None else quantized
+        threads = settings.embedding_threads if threads is None else threads
+        self.max_length = max_length or settings.embedding_max_length
+
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(
+            str(model_dir / (INT8_FILE if quantized else FP32_FILE)),
+            sess_options=options,
+            providers=["CPUExecutionProvider"],
+        )
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        sparse = np.load(model_dir / SPARSE_FILE)
+        self.sparse_weight = sparse["weight"].reshape(-1)
+        self.sparse_bias = float(sparse["bias"].reshape(-1)[0])
+        self.unused_tokens = {
+            self.tokenizer.cls_token_id,
+            self.tokenizer.eos_token_id,
+            self.tokenizer.pad_token_id,
+            self.tokenizer.unk_token_id,
+        }
+
+    def encode(
+        self,
+        sentences: list[str],
+        batch_size: int = 32,
+        return_dense: bool = True,
+        return_sparse: bool = True,
+        **kwargs,
+    ) -> dict:
+        dense_vecs, lexical_weights = [], []
+        for start in range(0, len(sentences), max(1, batch_size)):
+            batch = sentences[start:start + batch_size]
+            inputs = self.tokenizer(
+                batch,
+                padding=True,
+                truncation=True,
+                max_length=self.max_length,
+                return_tensors="np",
+            )
+            input_ids = inputs["input_ids"].astype(np.int64)
+            (hidden,) = self.session.run(
+                None,
+                {
+                    "input_ids": input_ids,
+                    "attention_mask": inputs["attention_mask"].astype(np.int64),
+                },
+            )
+            if return_dense:
+                cls = hidden[:, 0]
+                dense_vecs.append(cls / np.linalg.norm(cls, axis=-1, keepdims=True))
+            if return_sparse:
+                weights = np.maximum(hidden @ self.sparse_weight + self.sparse_bias, 0)
+                lexical_weights.extend(
+                    self._token_weights(ids, w) for ids, w in zip(input_ids, weights)
+                )
+
+        output = {}
+        if return_dense:
+            output["dense_vecs"] = np.concatenate(dense_vecs) if dense_vecs else np.empty((0, 0))
+        if return_sparse:
+            output["lexical_weights"] = lexical_weights
+        return output
+
+    def _token_weights(self, input_ids, weights) -> dict[str, float]:
+        # Same pooling as BGEM3FlagModel: max weight per token id
+        result: dict[str, float] = {}
+        for token_id, weight in zip(input_ids.tolist(), weights.tolist()):
+            if token_id in self.unused_tokens or weight <= 0:
+                continue
+            key = str(token_id)
+            if weight > result.get(key, 0):
+                result[key] = weight
+        return result
@@ -0,0 +1,115 @@
+"""Process-wide registry of shared model instances.
+
+BGE-M3, GLiNER and the rerankers take seconds to load on CPU, so the API,
+CLI and Prefect tasks fetch them from here instead of constructing their
+own. Instances are created lazily on first use and shared by every thread
+in the process, so only stateless models belong here (not e.g. the
+fitted TopicModeler).
+"""
+
+import logging
+import os
+import threading
+from collections.abc import Callable
+
+from rag.config import settings
+
+logger = logging.getLogger(__name__)
+
+_instances: dict[str, object] = {}
+_locks: dict[str, threading.Lock] = {}
+_registry_lock = threading.Lock()
+
+
+def _get(name: str, factory: Callable[[], object]):
+    instance = _instances.get(name)
+    if instance is not None:
+        return instance
+
+    with _registry_lock:
+        lock = _locks.setdefault(name, threading.Lock())
+
+    # Per-model lock: loading GLiNER must not block callers of the embedder.
+    with lock:
+        instance = _instances.get(name)
+        if instance is None:
+            logger.info(f"Loading model '{name}'")
+            instance = factory()
+            _instances[name] = instance
+        return instance
+
+
+def get_embedder():
+    """Shared BGE-M3 embedder."""
+    from rag.processing.embedding import Embedder
+    return _get("embedder", Embedder)
+
+
+def get_tokenizer():
+    """Shared BGE-M3 (XLM-R) tokenizer, used for token-based chunking."""
+    return _get("tokenizer", _load_tokenizer)
+
+
+def _load_tokenizer():
+    from tokenizers import Tokenizer
+
+    name = settings.embedding_model
+    if os.path.isdir(name):
+        return Tokenizer.from_file(os.path.join(name, "tokenizer.json"))
+    return Tokenizer.from_pretrained(name)
+
+
+def get_entity_extractor():
+    """Shared GLiNER entity extractor."""
+    from rag.processing.ner import EntityExtractor
+    return _get("ner", EntityExtractor)
+
+
+def get_reranker():
+    """Shared reranker selected by ``settings.reranker_type``.
+
+    Keyed by the type, so changing the setting at runtime takes effect.
+    """
+    if settings.reranker_type == "cross-encoder":
+        from rag.retrieval.cross_encoder import CrossEncoderReranker
+        return _get("reranker:cross-encoder", CrossEncoderReranker)
+    from rag.retrieval.reranker import Reranker
+    return _get("reranker:llm", Reranker)
+
+
+_GETTERS: dict[str, Callable[[], object]] = {
+    "embedder": get_embedder,
+    "ner": get_entity_extractor,
+    "reranker": get_reranker,
+}
+
+
+def warm_up(names: list[str] | None = None) -> list[str]:
+    """Load the given models (default: all) and run a dummy inference.
+
+    The first inference triggers lazy allocations inside torch, so doing it
+    at startup keeps that cost out of the first user request.
+    Returns the names of the models that were warmed up.
+    """
+    warmed = []
+    for name in names if names is not None else list(_GETTERS):
+        if name not in _GETTERS:
+            raise ValueError(f"Unknown model: {name}")
+        model = _GETTERS[name]()
+        if name == "embedder":
+            model.embed("warm-up")
+        elif name == "ner":
+            model.extract("warm-up")
+        warmed.append(name)
+    return warmed
+
+
+def loaded_models() -> list[str]:
+    """Names of the models currently held by the registry."""
+    return sorted(_instances)
+
+
+def reset() -> None:
+    """Drop all shared instances (they are garbage collected once unused)."""
+    with _registry_lock:
+        _instances.clear()
@@ -0,0 +1,25 @@
+import asyncio
+from abc import ABC, abstractmethod
+
+from rag.storage.qdrant import SearchResult
+
+
+class BaseReranker(ABC):
+    @abstractmethod
+    def rerank(
+        self,
+        query: str,
+        results: list[SearchResult],
+        top_k: int = 10,
+    ) -> list[SearchResult]:
+        """Return the ``top_k`` most relevant results, best first."""
+        ...
+
+    async def rerank_async(
+        self,
+        query: str,
+        results: list[SearchResult],
+        top_k: int = 10,
+    ) -> list[SearchResult]:
+        """``rerank`` for callers on an event loop; runs it in a thread by default."""
+        return await asyncio.to_thread(self.rerank, query, results, top_k)
@@ -0,0 +1,79 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+from sentence_transformers import CrossEncoder
+
+from rag.config import settings
+from rag.retrieval.base import BaseReranker
+from rag.storage.qdrant import SearchResult
+
+
+class CrossEncoderReranker(BaseReranker):
+    """Local CPU reranker using a cross-encoder (default: bge-reranker-v2-m3).
+
+    Pairs are scored in batches and truncated to ``max_length`` tokens.
+    Scores are cached per (query hash, chunk id), so re-asked questions and
+    paginated searches only score new candidates.
+    """
+
+    def __init__(
+        self,
+        model_name: str | None = None,
+        max_length: int | None = None,
+        batch_size: int | None = None,
+        cache_size: int | None = None,
+    ):
+        kwargs = {}
+        if settings.cross_encoder_backend != "torch":
+            kwargs["backend"] = settings.cross_encoder_backend
+        self.model = CrossEncoder(
+            model_name or settings.cross_encoder_model,
+            max_length=max_length or settings.cross_encoder_max_length,
+            device=settings.embedding_device,
+            **kwargs,
+        )
+        self.batch_size = batch_size or settings.cross_encoder_batch_size
+        self.cache_size = settings.cross_encoder_cache_size if cache_size is None else cache_size
+        self._cache: OrderedDict[tuple[str, str], float] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def rerank(
+        self,
+        query: str,
+        results: list[SearchResult],
+        top_k: int = 10,
+    ) -> list[SearchResult]:
+        if not results:
+            return []
+
+        scores = self.score(query, results)
+        ranked = sorted(zip(scores, range(len(results))), key=lambda x: x[0], reverse=True)
+        return [results[i] for _, i in ranked[:top_k]]
+
+    def score(self, query: str, results: list[SearchResult]) -> list[float]:
+        """Relevance score per result, using the cache where possible."""
+        query_hash = hashlib.sha256(query.encode()).hexdigest()
+        scores: list[float | None] = []
+        with self._lock:
+            for result in results:
+                key = (query_hash, result.chunk_id)
+                scores.append(self._cache.get(key))
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+
+        missing = [i for i, score in enumerate(scores) if score is None]
+        if missing:
+            predicted = self.model.predict(
+                [(query, results[i].content) for i in missing],
+                batch_size=self.batch_size,
+                show_progress_bar=False,
+            )
+            with self._lock:
+                for i, score in zip(missing, predicted):
+                    scores[i] = float(score)
+                    if self.cache_size:
+                        self._cache[(query_hash, results[i].chunk_id)] = float(score)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return scores
@@ -1,5 +1,33 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from rag.config import settings
 from rag.processing.embedding import Embedder, EmbeddingResult
-from rag.storage.qdrant import QdrantStore, SearchResult
+from rag.processing.registry import get_embedder
+from rag.retrieval.query_cache import QueryEmbeddingCache, get_query_cache
+from rag.storage.qdrant import QdrantStore, SearchFilters, SearchResult
+
+# Levels to walk up per small-to-big mode
+EXPAND_LEVELS = {"parent": 1, "grandparent": 2}
+# Siblings collapse into one result, so search more leaves than results wanted
+EXPAND_OVERSAMPLE = 3
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Bounded pool for CPU-bound query embedding off the event loop."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.retrieval_executor_workers,
+                    thread_name_prefix="retrieval",
+                )
+    return _executor
 
 
 class HybridRetriever:
@@ -9,9 +37,19 @@ class HybridRetriever:
         self,
         embedder: Embedder | None = None,
         store: QdrantStore | None = None,
+        cache: QueryEmbeddingCache | None = None,
     ):
-        self.embedder = embedder or Embedder()
+        self.embedder = embedder or get_embedder()
         self.store = store or QdrantStore()
+        self.cache = cache or get_query_cache()
+
+    def embed_query(self, query: str) -> EmbeddingResult:
+        """Query embedding, served from the query cache when possible."""
+        embedding = self.cache.get(query)
+        if embedding is None:
+            embedding = self.embedder.embed(query)
+            self.cache.put(query, embedding)
+        return embedding
 
     def retrieve(
         self,
@@ -19,8 +57,30 @@ class HybridRetriever:
         limit: int = 20,
         filter_platform: str | None = None,
         filter_author: str | None = None,
+        fusion: str | None = None,
+        expand: str | None = None,
+        filters: SearchFilters | None = None,
     ) -> list[SearchResult]:
-        embedding = self.embedder.embed(query)
+        """Embed the query and run a fused dense+sparse search.
+
+        ``fusion`` defaults to ``settings.retrieval_fusion``; pass ``""``
+        for a dense-only search. ``filters`` restricts the search to
+        documents by collection, tag, date, quality and flag.
+
+        ``expand`` (default ``settings.retrieval_expand``) enables
+        small-to-big retrieval: with ``"parent"`` or ``"grandparent"`` only
+        leaf chunks are searched and each hit is replaced by the text of its
+        parent or grandparent, fetched in one batch per level. Hits sharing
+        an ancestor collapse into one result that keeps the best score and
+        lists the leaves in ``metadata["matched_chunk_ids"]``.
+
+        With ``settings.qdrant_payload_content`` off, the search returns
+        ids, scores and metadata only; the text of the returned results is
+        fetched from the content store in one query at the end.
+        """
+        expand = settings.retrieval_expand if expand is None else expand
+        levels = _expand_levels(expand)
+        embedding = self.embed_query(query)
 
         results = self.store.search(
             dense_vector=embedding.dense,
@@ -28,7 +88,111 @@ class HybridRetriever:
             sparse_values=embedding.sparse_values,
             filter_platform=filter_platform,
             filter_author=filter_author,
-            limit=limit,
+            limit=limit * EXPAND_OVERSAMPLE if levels else limit,
+            fusion=settings.retrieval_fusion if fusion is None else fusion,
+            leaves_only=bool(levels),
+            filters=filters,
+        )
+        if not levels:
+            return self.store.hydrate(results)
+
+        expanded = results
+        for _ in range(levels):
+            ids = parent_ids(expanded)
+            if not ids:
+                break
+            expanded = replace_with_parents(expanded, self.store.get_chunks(ids))
+        return self.store.hydrate(collapse(results, expanded)[:limit])
+
+    async def retrieve_async(
+        self,
+        query: str,
+        limit: int = 20,
+        filter_platform: str | None = None,
+        filter_author: str | None = None,
+        fusion: str | None = None,
+        expand: str | None = None,
+        filters: SearchFilters | None = None,
+    ) -> list[SearchResult]:
+        """Non-blocking retrieve for async routes.
+
+        The query is embedded on the bounded retrieval executor and Qdrant
+        is queried through the shared AsyncQdrantClient, so the event loop
+        keeps serving other requests meanwhile.
+        """
+        expand = settings.retrieval_expand if expand is None else expand
+        levels = _expand_levels(expand)
+        loop = asyncio.get_running_loop()
+        embedding = await loop.run_in_executor(
+            get_executor(), self.embed_query, query
         )
 
-        return results
+        results = await self.store.search_async(
+            dense_vector=embedding.dense,
+            sparse_indices=embedding.sparse_indices,
+            sparse_values=embedding.sparse_values,
+            filter_platform=filter_platform,
+            filter_author=filter_author,
+            limit=limit * EXPAND_OVERSAMPLE if levels else limit,
+            fusion=settings.retrieval_fusion if fusion is None else fusion,
+            leaves_only=bool(levels),
+            filters=filters,
+        )
+        if not levels:
+            return await self.store.hydrate_async(results)
+
+        expanded = results
+        for _ in range(levels):
+            ids = parent_ids(expanded)
+            if not ids:
+                break
+            expanded = replace_with_parents(expanded, await self.store.get_chunks_async(ids))
+        return await self.store.hydrate_async(collapse(results, expanded)[:limit])
+
+
+def _expand_levels(expand: str) -> int:
+    if not expand:
+        return 0
+    if expand not in EXPAND_LEVELS:
+        raise ValueError(f"Unknown expand mode: {expand}")
+    return EXPAND_LEVELS[expand]
+
+
+def _expandable(result: SearchResult) -> bool:
+    # Only the hierarchical chunker's levels; a Reddit comment's parent is
+    # the post, which is not a wider context of the comment.
+    return bool(result.metadata.get("level")) and bool(result.metadata.get("parent_chunk_id"))
+
+
+def parent_ids(results: list[SearchResult]) -> list[str]:
+    """Distinct parent chunk ids of the results that can be expanded."""
+    return list(dict.fromkeys(
+        r.metadata["parent_chunk_id"] for r in results if _expandable(r)
+    ))
+
+
+def replace_with_parents(
+    results: list[SearchResult], parents: dict[str, SearchResult]
+) -> list[SearchResult]:
+    """Each result replaced by its parent, where the parent was found."""
+    return [
+        parents.get(r.metadata["parent_chunk_id"], r) if _expandable(r) else r
+        for r in results
+    ]
+
+
+def collapse(hits: list[SearchResult], expanded: list[SearchResult]) -> list[SearchResult]:
+    """One result per expanded chunk, in hit order, scored by its best hit."""
+    collapsed: dict[str, SearchResult] = {}
+    for hit, chunk in zip(hits, expanded):
+        if chunk.chunk_id in collapsed:
+            collapsed[chunk.chunk_id].metadata["matched_chunk_ids"].append(hit.chunk_id)
+            continue
+        collapsed[chunk.chunk_id] = SearchResult(
+            chunk_id=chunk.chunk_id,
+            document_id=chunk.document_id,
+            content=chunk.content,
+            score=hit.score,
+            metadata={**chunk.metadata, "matched_chunk_ids": [hit.chunk_id]},
+        )
+    return list(collapsed.values())
@@ -0,0 +1,137 @@
+"""Cache of query embeddings.
+
+Re-asked chat questions, paginated searches and ``/ask`` + ``/ask/stream``
+embed the same query text again and again. This cache maps normalised
+query text to its dense+sparse embedding in an in-process LRU with a TTL,
+optionally backed by the shared ``embedding_cache`` table in PostgreSQL so
+all workers benefit. Shared entries are stored under their own model name
+(``query:<model>``), expire with the same TTL and are pruned to
+``settings.query_cache_shared_size`` rows, so they never touch the cached
+chunk embeddings.
+"""
+
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+from rag.config import settings
+from rag.processing.embedding_cache import EmbeddingCache
+
+# Seconds between prunes of the shared tier, per process
+SHARED_PRUNE_INTERVAL = 600.0
+
+
+def normalize_query(query: str) -> str:
+    """Unicode- and whitespace-normalised query (case is kept: BGE-M3 is cased)."""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", query)).strip()
+
+
+class QueryEmbeddingCache:
+    def __init__(
+        self,
+        max_size: int | None = None,
+        ttl: float | None = None,
+        shared: bool | None = None,
+        shared_size: int | None = None,
+        shared_store=None,
+    ):
+        self.max_size = settings.query_cache_size if max_size is None else max_size
+        self.ttl = settings.query_cache_ttl if ttl is None else ttl
+        self.shared = settings.query_cache_shared if shared is None else shared
+        self.shared_size = settings.query_cache_shared_size if shared_size is None else shared_size
+        self._shared_cache = (
+            EmbeddingCache(f"query:{settings.embedding_model}", store=shared_store, ttl=self.ttl)
+            if self.shared else None
+        )
+        self._last_prune: float | None = None
+        self._entries: OrderedDict[str, tuple[float, object]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    def get(self, query: str):
+        """Cached EmbeddingResult for the query, or None."""
+        key = normalize_query(query)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (not self.ttl or now - entry[0] < self.ttl):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+
+        if self.shared:
+            embedding = self._get_shared(key)
+            if embedding is not None:
+                self._put_local(key, embedding)
+                with self._lock:
+                    self.shared_hits += 1
+                return embedding
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, query: str, embedding) -> None:
+        key = normalize_query(query)
+        self._put_local(key, embedding)
+        if self.shared:
+            self._put_shared(key, embedding)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+            }
+
+    def _put_local(self, key: str, embedding) -> None:
+        if not self.max_size:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), embedding)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def _get_shared(self, key: str):
+        from rag.processing.embedding import EmbeddingResult
+
+        row = self._shared_cache.get_many([key]).get(key)
+        return EmbeddingResult(**row) if row else None
+
+    def _put_shared(self, key: str, embedding) -> None:
+        self._shared_cache.put_many([key], [embedding])
+        now = time.monotonic()
+        with self._lock:
+            due = self._last_prune is None or now - self._last_prune >= SHARED_PRUNE_INTERVAL
+            if due:
+                self._last_prune = now
+        if due:
+            self._shared_cache.prune(self.shared_size)
+
+
+_cache: QueryEmbeddingCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_query_cache() -> QueryEmbeddingCache:
+    """Process-wide query cache."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = QueryEmbeddingCache()
+    return _cache
@@ -1,16 +1,41 @@
+import asyncio
+import re
+
 import httpx
-import time
 
 from rag.config import settings
+from rag.retrieval.base import BaseReranker
 from rag.storage.qdrant import SearchResult
 
 
-class Reranker:
-    """Reranks search results using LLM-based scoring via OpenAI-compatible API."""
+class Reranker(BaseReranker):
+    """Reranks search results using LLM-based scoring via OpenAI-compatible API.
+
+    Two modes:
+    - ``pointwise``: one relevance prompt per result, sent concurrently
+      (at most ``concurrency`` in flight) over a pooled async client, one
+      per event loop since a client cannot be shared between loops.
+    - ``listwise``: all candidates in a single prompt; the model returns
+      a ranking of passage numbers.
+
+    ``time_budget`` (seconds) bounds a whole rerank. When it runs out the
+    results scored so far come first, then the rest in retrieval order.
+    """
 
-    def __init__(self, model: str | None = None, base_url: str | None = None):
+    def __init__(
+        self,
+        model: str | None = None,
+        base_url: str | None = None,
+        mode: str | None = None,
+        concurrency: int | None = None,
+        time_budget: float | None = None,
+    ):
         self.model = model or settings.llm_model_reranker
         self.base_url = (base_url or settings.llm_base_url).rstrip("/")
+        self.mode = mode or settings.reranker_mode
+        self.concurrency = concurrency or settings.reranker_concurrency
+        self.time_budget = settings.reranker_time_budget if time_budget is None else time_budget
+        self._clients: dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
 
     def rerank(
         self,
@@ -25,41 +50,162 @@ class Reranker:
         if not self.model:
             return results[:top_k]
 
-        scored = []
-        for result in results:
-            score = self._score_pair(query, result.content)
-            scored.append((score, result))
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self._rerank_once(query, results, top_k))
+        raise RuntimeError("Reranker.rerank() cannot run inside an event loop; await rerank_async()")
+
+    async def rerank_async(
+        self,
+        query: str,
+        results: list[SearchResult],
+        top_k: int = 10,
+    ) -> list[SearchResult]:
+        """Async rerank reusing the running loop's pooled client across calls."""
+        if not results:
+            return []
+        if not self.model:
+            return results[:top_k]
+        return await self._rerank(self._loop_client(), query, results, top_k)
+
+    async def aclose(self):
+        """Close the running loop's client."""
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    def _loop_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        # Clients of closed loops (asyncio.run, Prefect tasks) cannot be used or closed anymore
+        for stale in [other for other in self._clients if other.is_closed()]:
+            del self._clients[stale]
+        if loop not in self._clients:
+            self._clients[loop] = self._new_client()
+        return self._clients[loop]
+
+    async def _rerank_once(self, query, results, top_k):
+        # The client's pool is bound to the event loop, so sync calls get their own
+        async with self._new_client() as client:
+            return await self._rerank(client, query, results, top_k)
+
+    def _new_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=self.concurrency),
+        )
+
+    async def _rerank(
+        self,
+        client: httpx.AsyncClient,
+        query: str,
+        results: list[SearchResult],
+        top_k: int,
+    ) -> list[SearchResult]:
+        if self.mode == "listwise":
+            try:
+                order = await asyncio.wait_for(
+                    self._rank_listwise(client, query, results),
+                    timeout=self.time_budget or None,
+                )
+            except (TimeoutError, httpx.HTTPError):
+                order = list(range(len(results)))
+            return [results[i] for i in order[:top_k]]
+
+        scores = await self._score_pointwise(client, query, results)
+        scored = sorted(scores, key=lambda i: scores[i], reverse=True)
+        unscored = [i for i in range(len(results)) if i not in scores]
+        return [results[i] for i in (scored + unscored)[:top_k]]
+
+    async def _score_pointwise(
+        self,
+        client: httpx.AsyncClient,
+        query: str,
+        results: list[SearchResult],
+    ) -> dict[int, float]:
+        """Score results concurrently; returns the scores finished in time."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        scores: dict[int, float] = {}
+
+        async def score(i: int, result: SearchResult):
+            async with semaphore:
+                scores[i] = await self._score_pair(client, query, result.content)
 
-        scored.sort(key=lambda x: x[0], reverse=True)
-        return [r for _, r in scored[:top_k]]
+        tasks = [asyncio.create_task(score(i, r)) for i, r in enumerate(results)]
+        _, pending = await asyncio.wait(tasks, timeout=self.time_budget or None)
+        for task in pending:
+            task.cancel()
+        return scores
 
-    def _score_pair(self, query: str, document: str) -> float:
+    async def _score_pair(self, client: httpx.AsyncClient, query: str, document: str) -> float:
         prompt = (
             f"Given the query: '{query}'\n\n"
             f"Rate the relevance of this document on a scale of 0-10:\n"
-            f"'{document}'\n\n"
+            f"'{document[:settings.reranker_max_chars]}'\n\n"
             f"Return ONLY a number between 0 and 10."
         )
 
         try:
-            response = httpx.post(
-                f"{self.base_url}/chat/completions",
-                json={
-                    "model": self.model,
-                    "messages": [{"role": "user", "content": prompt}],
-                    "temperature": 0.0,
-                    "max_tokens": 10,
-                    "stream": False,
-                },
-                timeout=30.0,
-            )
-            response.raise_for_status()
-            text = response.json()["choices"][0]["message"]["content"].strip()
-            for token in text.split():
-                try:
-                    return float(token)
-                except ValueError:
-                    continue
-            return 0.0
+            text = await self._complete(client, prompt, max_tokens=10)
+            return parse_score(text)
         except Exception:
             return 0.0
+
+    async def _rank_listwise(
+        self,
+        client: httpx.AsyncClient,
+        query: str,
+        results: list[SearchResult],
+    ) -> list[int]:
+        passages = "\n\n".join(
+            f"[{i + 1}] {r.content[:settings.reranker_max_chars]}"
+            for i, r in enumerate(results)
+        )
+        prompt = (
+            f"Given the query: '{query}'\n\n"
+            f"Rank these {len(results)} passages by relevance to the query:\n\n"
+            f"{passages}\n\n"
+            f"Return ONLY the passage numbers, most relevant first, "
+            f"in the format: [2] > [1] > [3]"
+        )
+        text = await self._complete(client, prompt, max_tokens=8 * len(results) + 16)
+        return parse_ranking(text, len(results))
+
+    async def _complete(self, client: httpx.AsyncClient, prompt: str, max_tokens: int) -> str:
+        response = await client.post(
+            "/chat/completions",
+            json={
+                "model": self.model,
+                "messages": [{"role": "user", "content": prompt}],
+                "temperature": 0.0,
+                "max_tokens": max_tokens,
+                "stream": False,
+            },
+        )
+        response.raise_for_status()
+        return response.json()["choices"][0]["message"]["content"].strip()
+
+
+def parse_score(text: str) -> float:
+    """First number in an LLM reply, or 0.0."""
+    for token in text.split():
+        try:
+            return float(token)
+        except ValueError:
+            continue
+    return 0.0
+
+
+def parse_ranking(text: str, n: int) -> list[int]:
+    """Zero-based ranking from a reply like "[3] > [1] > [2]".
+
+    Out-of-range and repeated numbers are ignored; passages the model left
+    out follow in their original order.
+    """
+    order = []
+    for match in re.findall(r"\d+", text):
+        i = int(match) - 1
+        if 0 <= i < n and i not in order:
+            order.append(i)
+    return order + [i for i in range(n) if i not in order]
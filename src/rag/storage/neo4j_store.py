@@ -1,7 +1,7 @@
 from neo4j import GraphDatabase
 
 from rag.config import settings
-from rag.models import Document, Entity
+from rag.models import Document, Entity, Topic, entity_id_for, entity_key
 
 
 class Neo4jStore:
@@ -22,6 +22,12 @@ class Neo4jStore:
             session.run(
                 "CREATE CONSTRAINT entity_id IF NOT EXISTS FOR (e:Entity) REQUIRE e.entity_id IS UNIQUE"
             )
+            session.run(
+                "CREATE CONSTRAINT entity_key IF NOT EXISTS FOR (e:Entity) REQUIRE e.key IS UNIQUE"
+            )
+            session.run(
+                "CREATE INDEX entity_name IF NOT EXISTS FOR (e:Entity) ON (e.name)"
+            )
 
     def close(self):
         self.driver.close()
@@ -60,13 +66,17 @@ class Neo4jStore:
             session.run(
                 """
                 MERGE (e:Entity {entity_id: $entity_id})
-                SET e.name = $name,
+                ON CREATE SET e.name = $name,
                     e.entity_type = $entity_type,
-                    e.confidence = $confidence
+                    e.key = $key
+                SET e.confidence = CASE
+                    WHEN e.confidence IS NULL OR $confidence > e.confidence THEN $confidence
+                    ELSE e.confidence END
                 """,
                 entity_id=entity.id,
                 name=entity.name,
                 entity_type=entity.entity_type,
+                key=entity.key,
                 confidence=entity.confidence,
             )
         self._test_entity_ids.append(entity.id)
@@ -99,6 +109,180 @@ class Neo4jStore:
                 topic_name=topic_name,
             )
 
+    def write_documents(
+        self,
+        documents: list[tuple[Document, list[Entity], list[Topic] | None]],
+        batch_size: int | None = None,
+    ) -> None:
+        """Write document nodes, entities, MENTIONS and HAS_TOPIC edges in bulk.
+
+        Everything is sent as UNWIND parameter lists (at most ``batch_size``
+        rows per statement) inside a single managed write transaction, so a
+        batch of documents costs a handful of round trips and is retried
+        or rolled back as a whole.
+        """
+        docs, entities, mentions, topics = [], [], [], []
+        for doc, doc_entities, doc_topics in documents:
+            docs.append({
+                "doc_id": doc.id,
+                "title": doc.title,
+                "source_url": doc.source_url,
+                "platform": doc.platform.value,
+                "author": doc.author,
+            })
+            # One MENTIONS edge per (document, entity), with the best confidence
+            doc_mentions: dict[str, dict] = {}
+            for entity in doc_entities:
+                mention = doc_mentions.get(entity.id)
+                if mention is None:
+                    doc_mentions[entity.id] = {
+                        "doc_id": doc.id,
+                        "entity_id": entity.id,
+                        "confidence": entity.confidence,
+                    }
+                    entities.append({
+                        "entity_id": entity.id,
+                        "name": entity.name,
+                        "entity_type": entity.entity_type,
+                        "key": entity.key,
+                        "confidence": entity.confidence,
+                    })
+                elif entity.confidence > mention["confidence"]:
+                    mention["confidence"] = entity.confidence
+            mentions.extend(doc_mentions.values())
+            for topic in doc_topics or []:
+                topics.append({"doc_id": doc.id, "name": topic.name})
+
+        batch_size = batch_size or settings.neo4j_write_batch_size
+        with self.driver.session() as session:
+            session.execute_write(
+                self._write_batches, docs, entities, mentions, topics, batch_size
+            )
+        self._test_doc_ids.extend(d["doc_id"] for d in docs)
+        self._test_entity_ids.extend(e["entity_id"] for e in entities)
+
+    @staticmethod
+    def _write_batches(tx, docs, entities, mentions, topics, batch_size: int):
+        statements = [
+            (
+                """
+                UNWIND $rows AS row
+                MERGE (d:Document {doc_id: row.doc_id})
+                SET d.title = row.title,
+                    d.source_url = row.source_url,
+                    d.platform = row.platform,
+                    d.author = row.author
+                """,
+                docs,
+            ),
+            (
+                """
+                UNWIND $rows AS row
+                MERGE (e:Entity {entity_id: row.entity_id})
+                ON CREATE SET e.name = row.name,
+                    e.entity_type = row.entity_type,
+                    e.key = row.key
+                SET e.confidence = CASE
+                    WHEN e.confidence IS NULL OR row.confidence > e.confidence THEN row.confidence
+                    ELSE e.confidence END
+                """,
+                entities,
+            ),
+            (
+                """
+                UNWIND $rows AS row
+                MATCH (d:Document {doc_id: row.doc_id})
+                MATCH (e:Entity {entity_id: row.entity_id})
+                MERGE (d)-[r:MENTIONS]->(e)
+                SET r.confidence = row.confidence
+                """,
+                mentions,
+            ),
+            (
+                """
+                UNWIND $rows AS row
+                MATCH (d:Document {doc_id: row.doc_id})
+                MERGE (t:Topic {name: row.name})
+                MERGE (d)-[:HAS_TOPIC]->(t)
+                """,
+                topics,
+            ),
+        ]
+        for query, rows in statements:
+            for start in range(0, len(rows), batch_size):
+                tx.run(query, rows=rows[start:start + batch_size]).consume()
+
+    def migrate_entity_keys(self, batch_size: int | None = None) -> dict:
+        """Collapse duplicate Entity nodes created before canonical ids.
+
+        Every Entity without a ``key`` is grouped by its normalised
+        (name, type) key. Each group is merged into the node with the
+        canonical id: MENTIONS edges are moved over (keeping the highest
+        confidence) and the duplicates are deleted. Safe to re-run.
+        Returns counts of processed groups and deleted nodes.
+        """
+        groups: dict[str, dict] = {}
+        with self.driver.session() as session:
+            result = session.run(
+                """
+                MATCH (e:Entity) WHERE e.key IS NULL
+                RETURN e.entity_id AS entity_id, e.name AS name, e.entity_type AS entity_type
+                """
+            )
+            for record in result:
+                name = record["name"] or ""
+                entity_type = record["entity_type"] or "UNKNOWN"
+                key = entity_key(name, entity_type)
+                group = groups.setdefault(key, {
+                    "key": key,
+                    "entity_id": entity_id_for(name, entity_type),
+                    "name": name,
+                    "entity_type": entity_type,
+                    "duplicates": [],
+                })
+                group["duplicates"].append(record["entity_id"])
+
+        batch_size = batch_size or settings.neo4j_write_batch_size
+        rows = list(groups.values())
+        deleted = 0
+        with self.driver.session() as session:
+            for start in range(0, len(rows), batch_size):
+                deleted += session.execute_write(
+                    self._merge_entity_groups, rows[start:start + batch_size]
+                )
+        return {"groups": len(rows), "deleted": deleted}
+
+    @staticmethod
+    def _merge_entity_groups(tx, groups: list[dict]) -> int:
+        result = tx.run(
+            """
+            UNWIND $groups AS g
+            MERGE (c:Entity {entity_id: g.entity_id})
+            ON CREATE SET c.name = g.name, c.entity_type = g.entity_type
+            SET c.key = g.key
+            WITH c, g
+            UNWIND g.duplicates AS dup_id
+            MATCH (dup:Entity {entity_id: dup_id})
+            WHERE dup <> c
+            CALL {
+                WITH c, dup
+                MATCH (d:Document)-[r:MENTIONS]->(dup)
+                MERGE (d)-[m:MENTIONS]->(c)
+                SET m.confidence = CASE
+                    WHEN m.confidence IS NULL OR r.confidence > m.confidence THEN r.confidence
+                    ELSE m.confidence END
+            }
+            SET c.confidence = CASE
+                WHEN c.confidence IS NULL OR dup.confidence > c.confidence THEN dup.confidence
+                ELSE c.confidence END
+            DETACH DELETE dup
+            RETURN count(dup) AS deleted
+            """,
+            groups=groups,
+        )
+        record = result.single()
+        return record["deleted"] if record else 0
+
     def get_entities_for_document(self, doc_id: str) -> list[dict]:
         with self.driver.session() as session:
             result = session.run(
@@ -1,28 +1,104 @@
 import json
+import struct
+import threading
+import zlib
 from datetime import datetime
 
 import psycopg
 from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool, ConnectionPool
 
 from rag.config import settings
 from rag.models import Document, Platform
 
+_pool: ConnectionPool | None = None
+_async_pool: AsyncConnectionPool | None = None
+_pool_lock = threading.Lock()
+
+
+def _conninfo() -> str:
+    return (
+        f"host={settings.postgres_host} "
+        f"port={settings.postgres_port} "
+        f"dbname={settings.postgres_db} "
+        f"user={settings.postgres_user} "
+        f"password={settings.postgres_password}"
+    )
+
+
+def get_pool() -> ConnectionPool:
+    """Process-wide connection pool shared by all PostgresStore instances."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    _conninfo(),
+                    kwargs={"row_factory": dict_row},
+                    min_size=settings.postgres_pool_min_size,
+                    max_size=settings.postgres_pool_max_size,
+                    timeout=settings.postgres_pool_timeout,
+                    max_idle=settings.postgres_pool_max_idle,
+                    check=ConnectionPool.check_connection,
+                    name="rag",
+                    open=True,
+                )
+    return _pool
+
+
+async def open_async_pool() -> AsyncConnectionPool:
+    """Open the async pool used by async FastAPI routes (call from the event loop)."""
+    global _async_pool
+    if _async_pool is None:
+        _async_pool = AsyncConnectionPool(
+            _conninfo(),
+            kwargs={"row_factory": dict_row},
+            min_size=settings.postgres_pool_min_size,
+            max_size=settings.postgres_pool_max_size,
+            timeout=settings.postgres_pool_timeout,
+            max_idle=settings.postgres_pool_max_idle,
+            check=AsyncConnectionPool.check_connection,
+            name="rag-async",
+            open=False,
+        )
+        await _async_pool.open()
+    return _async_pool
+
+
+async def close_pools():
+    global _pool, _async_pool
+    if _async_pool is not None:
+        await _async_pool.close()
+        _async_pool = None
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+def pool_stats() -> dict:
+    """Usage counters of the open pools (see psycopg_pool's get_stats)."""
+    stats = {}
+    if _pool is not None:
+        stats["sync"] = _pool.get_stats()
+    if _async_pool is not None:
+        stats["async"] = _async_pool.get_stats()
+    return stats
+
 
 class PostgresStore:
     def __init__(self):
-        self.conninfo = (
-            f"host={settings.postgres_host} "
-            f"port={settings.postgres_port} "
-            f"dbname={settings.postgres_db} "
-            f"user={settings.postgres_user} "
-            f"password={settings.postgres_password}"
-        )
+        self.conninfo = _conninfo()
         self._test_ids: list[str] = []
 
     def _connect(self):
-        return psycopg.connect(self.conninfo, row_factory=dict_row)
+        """Borrow a pooled connection; it is returned to the pool (and
+        committed unless an exception occurred) when the block exits."""
+        return get_pool().connection()
 
     def save_document(self, doc: Document):
+        """Insert the document; a re-ingested source (same id) gets its
+        ingest-derived columns, including ``ingested_at``, refreshed."""
         with self._connect() as conn:
             with conn.cursor() as cur:
                 cur.execute(
@@ -32,6 +108,11 @@ class PostgresStore:
                     ON CONFLICT (id) DO UPDATE SET
                         title = EXCLUDED.title,
                         source_url = EXCLUDED.source_url,
+                        platform = EXCLUDED.platform,
+                        author = EXCLUDED.author,
+                        language = EXCLUDED.language,
+                        created_at = EXCLUDED.created_at,
+                        ingested_at = EXCLUDED.ingested_at,
                         metadata = EXCLUDED.metadata
                     """,
                     (
@@ -272,6 +353,47 @@ class PostgresStore:
                 )
             conn.commit()
 
+    def list_collection_document_ids(self, collection_id: str) -> list[str]:
+        with self._connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "SELECT document_id FROM document_collections WHERE collection_id = %s",
+                    (collection_id,),
+                )
+                return [str(row["document_id"]) for row in cur.fetchall()]
+
+    def get_document_payloads(self, document_ids: list[str] | None = None) -> dict[str, dict]:
+        """Filterable document attributes (see rag.pipeline.payload_sync), by document id.
+
+        All documents when ``document_ids`` is None. ``created_at`` falls
+        back to the ingestion time and is an ISO 8601 string.
+        """
+        where = "WHERE d.id = ANY(%s::uuid[])" if document_ids is not None else ""
+        with self._connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    f"""SELECT d.id,
+                        COALESCE(d.created_at, d.ingested_at) AS created_at,
+                        d.quality_score,
+                        COALESCE(d.flagged, FALSE) AS flagged,
+                        ARRAY(SELECT dc.collection_id::text FROM document_collections dc
+                              WHERE dc.document_id = d.id) AS collection_ids,
+                        ARRAY(SELECT dt.tag_id::text FROM document_tags dt
+                              WHERE dt.document_id = d.id) AS tag_ids
+                    FROM documents d {where}""",
+                    (list(document_ids),) if document_ids is not None else (),
+                )
+                return {
+                    str(row["id"]): {
+                        "collection_ids": row["collection_ids"],
+                        "tag_ids": row["tag_ids"],
+                        "created_at": row["created_at"].isoformat() if row["created_at"] else None,
+                        "quality_score": row["quality_score"],
+                        "flagged": row["flagged"],
+                    }
+                    for row in cur.fetchall()
+                }
+
     # --- Tags ---
 
     def list_tags(self) -> list[dict]:
@@ -326,6 +448,13 @@ class PostgresStore:
                 )
                 return cur.fetchall()
 
+    async def get_chat_session_async(self, session_id: str) -> dict | None:
+        pool = await open_async_pool()
+        async with pool.connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute("SELECT * FROM chat_sessions WHERE id = %s", (session_id,))
+                return await cur.fetchone()
+
     def get_chat_messages(self, session_id: str) -> list[dict]:
         with self._connect() as conn:
             with conn.cursor() as cur:
@@ -346,6 +475,21 @@ class PostgresStore:
             conn.commit()
             return row
 
+    async def save_chat_message_async(
+        self, session_id: str, role: str, content: str, source_chunks: list | None = None,
+    ) -> dict:
+        """Like save_chat_message, but on the async pool (for async routes)."""
+        pool = await open_async_pool()
+        async with pool.connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    "INSERT INTO chat_messages (session_id, role, content, source_chunks) VALUES (%s, %s, %s, %s) RETURNING *",
+                    (session_id, role, content, json.dumps(source_chunks or [])),
+                )
+                row = await cur.fetchone()
+            await conn.commit()
+            return row
+
     def delete_chat_session(self, session_id: str) -> bool:
         with self._connect() as conn:
             with conn.cursor() as cur:
@@ -386,6 +530,350 @@ class PostgresStore:
                 )
                 return [{"date": str(row["date"]), "count": row["count"]} for row in cur.fetchall()]
 
+    # --- Embedding Cache ---
+
+    _embedding_cache_ready = False
+
+    def ensure_embedding_cache_table(self):
+        """Create embedding_cache table if it doesn't exist."""
+        if PostgresStore._embedding_cache_ready:
+            return
+        with self._connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    CREATE TABLE IF NOT EXISTS embedding_cache (
+                        model TEXT NOT NULL,
+                        text_hash TEXT NOT NULL,
+                        dense BYTEA NOT NULL,
+                        sparse_indices BYTEA NOT NULL,
+                        sparse_values BYTEA NOT NULL,
+                        created_at TIMESTAMPTZ DEFAULT NOW(),
+                        PRIMARY KEY (model, text_hash)
+                    )
+                """)
+            conn.commit()
+        PostgresStore._embedding_cache_ready = True
+
+    def get_cached_embeddings(
+        self, model: str, text_hashes: list[str], max_age: float | None = None
+    ) -> dict[str, dict]:
+        """Cached embeddings by text hash; missing hashes are left out.
+
+        Values have ``dense``, ``sparse_indices`` and ``sparse_values`` keys.
+        Rows older than ``max_age`` seconds count as missing.
+        """
+        if not text_hashes:
+            return {}
+        self.ensure_embedding_cache_table()
+        age = " AND created_at > NOW() - make_interval(secs => %s)" if max_age else ""
+        with self._connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    f"""SELECT text_hash, dense, sparse_indices, sparse_values
+                    FROM embedding_cache WHERE model = %s AND text_hash = ANY(%s){age}""",
+                    (model, list(text_hashes), *([max_age] if max_age else [])),
+                )
+                return {
+                    row["text_hash"]: {
+                        "dense": _unpack(row["dense"], "e"),
+                        "sparse_indices": _unpack(row["sparse_indices"], "I"),
+                        "sparse_values": _unpack(row["sparse_values"], "e"),
+                    }
+                    for row in cur.fetchall()
+                }
+
+    def save_cached_embeddings(self, model: str, embeddings: dict, refresh: bool = False) -> None:
+        """Store EmbeddingResults by text hash, keeping existing rows.
+
+        With ``refresh`` existing rows are replaced and their ``created_at``
+        reset (for caches with a TTL).
+        """
+        if not embeddings:
+            return
+        self.ensure_embedding_cache_table()
+        on_conflict = (
+            """DO UPDATE SET dense = EXCLUDED.dense, sparse_indices = EXCLUDED.sparse_indices,
+                    sparse_values = EXCLUDED.sparse_values, created_at = NOW()"""
+            if refresh else "DO NOTHING"
+        )
+        with self._connect() as conn:
+            with conn.cursor() as cur:
+                cur.executemany(
+                    f"""INSERT INTO embedding_cache (model, text_hash, dense, sparse_indices, sparse_values)
+                    VALUES (%s, %s, %s, %s, %s)
+                    ON CONFLICT (model, text_hash) {on_conflict}""",
+                    [
+                        (
+                            model,
+                            text_hash,
+                            _pack(embedding.dense, "e"),
+                            _pack(embedding.sparse_indices, "I"),
+                            _pack(embedding.sparse_values, "e"),
+                        )
+                        for text_hash, embedding in embeddings.items()
+                    ],
+                )
+            conn.commit()
+
+    def prune_cached_embeddings(
+        self, model: str, max_age: float | None = None, max_rows: int | None = None
+    ) -> int:
+        """Drop a model's rows older than ``max_age`` seconds and all but its
+        ``max_rows`` newest; returns the row count."""
+        self.ensure_embedding_cache_table()
+        deleted = 0
+        with self._connect() as conn:
+            with conn.cursor() as cur:
+                if max_age:
+                    cur.execute(
+                        """DELETE FROM embedding_cache
+                        WHERE model = %s AND created_at <= NOW() - make_interval(secs => %s)""",
+                        (model, max_age),
+                    )
+                    deleted += cur.rowcount
+                if max_rows:
+                    cur.execute(
+                        """DELETE FROM embedding_cache WHERE model = %s AND text_hash IN (
+                            SELECT text_hash FROM embedding_cache WHERE model = %s
+                            ORDER BY created_at DESC OFFSET %s)""",
+                        (model, model, max_rows),
+                    )
+                    deleted += cur.rowcount
+            conn.commit()
+        return deleted
+
+    def delete_cached_embeddings(self, model: str) -> int:
+        """Drop all cached embeddings of a model; returns the row count."""
+        self.ensure_embedding_cache_table()
+        with self._connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute("DELETE FROM embedding_cache WHERE model = %s", (model,))
+                deleted = cur.rowcount
+            conn.commit()
+        return deleted
+
+    # --- Chunk Contents ---
+
+    _chunk_contents_ready = False
+
+    _CHUNK_CONTENTS_DDL = (
+        """CREATE TABLE IF NOT EXISTS chunk_contents (
+            chunk_id TEXT PRIMARY KEY,
+            document_id TEXT NOT NULL,
+            content BYTEA NOT NULL
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_chunk_contents_document ON chunk_contents(document_id)",
+    )
+
+    def ensure_chunk_contents_table(self):
+        """Create chunk_contents table if it doesn't exist."""
+        if PostgresStore._chunk_contents_ready:
+            return
+        with self._connect() as conn:
+            with conn.cursor() as cur:
+                for statement in self._CHUNK_CONTENTS_DDL:
+                    cur.execute(statement)
+            conn.commit()
+        PostgresStore._chunk_contents_ready = True
+
+    async def ensure_chunk_contents_table_async(self):
+        """Same as ensure_chunk_contents_table, on the async pool."""
+        if PostgresStore._chunk_contents_ready:
+            return
+        pool = await open_async_pool()
+        async with pool.connection() as conn:
+            async with conn.cursor() as cur:
+                for statement in self._CHUNK_CONTENTS_DDL:
+                    await cur.execute(statement)
+            await conn.commit()
+        PostgresStore._chunk_contents_ready = True
+
+    def save_chunk_contents(self, contents) -> None:
+        """Store (chunk_id, document_id, text) rows, zlib-compressed, replacing existing ones."""
+        rows = [
+            (chunk_id, document_id, zlib.compress(text.encode()))
+            for chunk_id, document_id, text in contents
+        ]
+        if not rows:
+            return
+        self.ensure_chunk_contents_table()
+        with self._connect() as conn:
+            with conn.cursor() as cur:
+                cur.executemany(
+                    """INSERT INTO chunk_contents (chunk_id, document_id, content)
+                    VALUES (%s, %s, %s)
+                    ON CONFLICT (chunk_id) DO UPDATE
+                    SET document_id = EXCLUDED.document_id, content = EXCLUDED.content""",
+                    rows,
+                )
+            conn.commit()
+
+    def get_chunk_contents(self, chunk_ids: list[str]) -> dict[str, str]:
+        """Chunk texts by chunk id; missing ids are left out."""
+        if not chunk_ids:
+            return {}
+        self.ensure_chunk_contents_table()
+        with self._connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "SELECT chunk_id, content FROM chunk_contents WHERE chunk_id = ANY(%s)",
+                    (list(chunk_ids),),
+                )
+                return {
+                    row["chunk_id"]: zlib.decompress(row["content"]).decode()
+                    for row in cur.fetchall()
+                }
+
+    async def get_chunk_contents_async(self, chunk_ids: list[str]) -> dict[str, str]:
+        """Like get_chunk_contents, but on the async pool (for async routes)."""
+        if not chunk_ids:
+            return {}
+        await self.ensure_chunk_contents_table_async()
+        pool = await open_async_pool()
+        async with pool.connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    "SELECT chunk_id, content FROM chunk_contents WHERE chunk_id = ANY(%s)",
+                    (list(chunk_ids),),
+                )
+                return {
+                    row["chunk_id"]: zlib.decompress(row["content"]).decode()
+                    for row in await cur.fetchall()
+                }
+
+    def delete_chunk_contents(self, document_id: str) -> int:
+        """Drop the chunk texts of a document; returns the row count."""
+        self.ensure_chunk_contents_table()
+        with self._connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute("DELETE FROM chunk_contents WHERE document_id = %s", (document_id,))
+                deleted = cur.rowcount
+            conn.commit()
+        return deleted
+
+    # --- Reindex Jobs ---
+
+    _reindex_jobs_ready = False
+
+    def ensure_reindex_jobs_table(self):
+        """Create reindex_jobs table if it doesn't exist."""
+        if PostgresStore._reindex_jobs_ready:
+            return
+        with self._connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    CREATE TABLE IF NOT EXISTS reindex_jobs (
+                        id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+                        alias TEXT NOT NULL,
+                        source_collection TEXT NOT NULL,
+                        target_collection TEXT NOT NULL UNIQUE,
+                        mode TEXT NOT NULL,
+                        status TEXT NOT NULL DEFAULT 'building',
+                        last_document_id TEXT,
+                        documents_done INT DEFAULT 0,
+                        chunks_done INT DEFAULT 0,
+                        error TEXT,
+                        started_at TIMESTAMPTZ DEFAULT NOW(),
+                        updated_at TIMESTAMPTZ DEFAULT NOW(),
+                        swapped_at TIMESTAMPTZ
+                    )
+                """)
+            conn.commit()
+        PostgresStore._reindex_jobs_ready = True
+
+    def create_reindex_job(self, alias: str, source_collection: str, target_collection: str, mode: str) -> dict:
+        self.ensure_reindex_jobs_table()
+        with self._connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """INSERT INTO reindex_jobs (alias, source_collection, target_collection, mode)
+                    VALUES (%s, %s, %s, %s) RETURNING *""",
+                    (alias, source_collection, target_collection, mode),
+                )
+                row = cur.fetchone()
+            conn.commit()
+            return row
+
+    def get_reindex_job(self, job_id: str) -> dict | None:
+        self.ensure_reindex_jobs_table()
+        with self._connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT * FROM reindex_jobs WHERE id = %s", (job_id,))
+                return cur.fetchone()
+
+    def list_reindex_jobs(self, alias: str | None = None, status: str | None = None) -> list[dict]:
+        """Reindex jobs, newest first."""
+        self.ensure_reindex_jobs_table()
+        conditions = []
+        params: list = []
+        if alias:
+            conditions.append("alias = %s")
+            params.append(alias)
+        if status:
+            conditions.append("status = %s")
+            params.append(status)
+        where = "WHERE " + " AND ".join(conditions) if conditions else ""
+        with self._connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute(f"SELECT * FROM reindex_jobs {where} ORDER BY started_at DESC", params)
+                return cur.fetchall()
+
+    def update_reindex_job(self, job_id: str, **fields) -> dict | None:
+        self.ensure_reindex_jobs_table()
+        allowed = {"status", "last_document_id", "documents_done", "chunks_done", "error", "swapped_at"}
+        updates = []
+        params: list = []
+        for key, value in fields.items():
+            if key not in allowed:
+                continue
+            updates.append(f"{key} = %s")
+            params.append(value)
+        if not updates:
+            return self.get_reindex_job(job_id)
+        updates.append("updated_at = NOW()")
+        params.append(job_id)
+        with self._connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    f"UPDATE reindex_jobs SET {', '.join(updates)} WHERE id = %s RETURNING *",
+                    params,
+                )
+                row = cur.fetchone()
+            conn.commit()
+            return row
+
+    def list_document_ids(
+        self,
+        after: str | None = None,
+        limit: int = 100,
+        ingested_since: datetime | None = None,
+    ) -> list[str]:
+        """Document ids in id order, starting after ``after`` (keyset pagination)."""
+        conditions = []
+        params: list = []
+        if after:
+            conditions.append("id > %s::uuid")
+            params.append(after)
+        if ingested_since:
+            conditions.append("ingested_at >= %s")
+            params.append(ingested_since)
+        where = "WHERE " + " AND ".join(conditions) if conditions else ""
+        params.append(limit)
+        with self._connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute(f"SELECT id FROM documents {where} ORDER BY id LIMIT %s", params)
+                return [str(row["id"]) for row in cur.fetchall()]
+
+    def get_existing_document_ids(self, document_ids: list[str]) -> set[str]:
+        """The ids among ``document_ids`` that have a document."""
+        with self._connect() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "SELECT id FROM documents WHERE id = ANY(%s::uuid[])",
+                    (list(document_ids),),
+                )
+                return {str(row["id"]) for row in cur.fetchall()}
+
     # --- Source Configs ---
 
     def ensure_source_configs_table(self):
@@ -630,3 +1118,12 @@ class PostgresStore:
             ingested_at=row["ingested_at"],
             metadata=row["metadata"] if isinstance(row["metadata"], dict) else {},
         )
+
+
+def _pack(values: list, fmt: str) -> bytes:
+    """Little-endian array; ``e`` (float16) halves the size of float vectors."""
+    return struct.pack(f"<{len(values)}{fmt}", *values)
+
+
+def _unpack(data: bytes, fmt: str) -> list:
+    return list(struct.unpack(f"<{len(data) // struct.calcsize(fmt)}{fmt}", data))
@@ -1,65 +1,251 @@
+import itertools
+import logging
+import threading
+import uuid
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass
+from datetime import datetime
 
-from qdrant_client import QdrantClient
+from qdrant_client import AsyncQdrantClient, QdrantClient
+from qdrant_client.http.exceptions import UnexpectedResponse
 from qdrant_client.models import (
+    BinaryQuantization,
+    BinaryQuantizationConfig,
+    CreateAlias,
+    CreateAliasOperation,
+    DatetimeRange,
+    DeleteAlias,
+    DeleteAliasOperation,
+    Disabled,
     Distance,
     FieldCondition,
     Filter,
+    FormulaQuery,
+    Fusion,
+    FusionQuery,
+    HnswConfigDiff,
+    IsEmptyCondition,
+    MatchAny,
     MatchValue,
+    MultExpression,
+    OrderBy,
+    PayloadField,
     PayloadSchemaType,
     PointStruct,
+    Prefetch,
+    Range,
+    QuantizationSearchParams,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    SearchParams,
     SparseIndexParams,
     SparseVector,
     SparseVectorParams,
+    SumExpression,
     VectorParams,
+    VectorParamsDiff,
 )
 
 from rag.config import settings
+from rag.models import Chunk
+
+logger = logging.getLogger(__name__)
+
+# Namespace for deriving point ids from chunk ids. Never change it: existing
+# points would no longer be overwritten on re-ingest.
+POINT_ID_NAMESPACE = uuid.UUID("6f1c2b8e-5d0a-4c35-9a8e-2f6d1e7b4c90")
+
+
+def point_id(chunk_id: str) -> str:
+    """Stable Qdrant point id (UUID) for a chunk id, identical in every process."""
+    return str(uuid.uuid5(POINT_ID_NAMESPACE, chunk_id))
+
+
+_async_client: AsyncQdrantClient | None = None
+_async_client_lock = threading.Lock()
+
+
+def get_async_client() -> AsyncQdrantClient:
+    """Process-wide AsyncQdrantClient, so async routes share one HTTP pool."""
+    global _async_client
+    if _async_client is None:
+        with _async_client_lock:
+            if _async_client is None:
+                _async_client = AsyncQdrantClient(
+                    host=settings.qdrant_host, port=settings.qdrant_port
+                )
+    return _async_client
+
+
+async def close_async_client():
+    global _async_client
+    if _async_client is not None:
+        await _async_client.close()
+        _async_client = None
+
+
+# chunk_index is an integer index so scrolls can order by it. The last five
+# are document attributes kept current by rag.pipeline.payload_sync.
+PAYLOAD_INDEXES = [
+    ("platform", PayloadSchemaType.KEYWORD),
+    ("author", PayloadSchemaType.KEYWORD),
+    ("document_id", PayloadSchemaType.KEYWORD),
+    ("language", PayloadSchemaType.KEYWORD),
+    ("level", PayloadSchemaType.KEYWORD),
+    ("chunk_index", PayloadSchemaType.INTEGER),
+    ("collection_ids", PayloadSchemaType.KEYWORD),
+    ("tag_ids", PayloadSchemaType.KEYWORD),
+    ("created_at", PayloadSchemaType.DATETIME),
+    ("quality_score", PayloadSchemaType.INTEGER),
+    ("flagged", PayloadSchemaType.BOOL),
+]
 
 
 @dataclass
 class SearchResult:
     chunk_id: str
     document_id: str
-    content: str
+    content: str | None  # None until hydrated when the payload has no text
     score: float
     metadata: dict
 
 
+@dataclass
+class SearchFilters:
+    """Document-level search filters, applied in the Qdrant query itself."""
+
+    collection_id: str | None = None
+    tag_id: str | None = None
+    created_after: datetime | None = None
+    created_before: datetime | None = None
+    min_quality: int | None = None
+    exclude_flagged: bool = False
+
+    def conditions(self) -> tuple[list[FieldCondition], list[FieldCondition]]:
+        """``must`` and ``must_not`` conditions."""
+        must, must_not = [], []
+        if self.collection_id:
+            must.append(FieldCondition(key="collection_ids", match=MatchValue(value=self.collection_id)))
+        if self.tag_id:
+            must.append(FieldCondition(key="tag_ids", match=MatchValue(value=self.tag_id)))
+        if self.created_after or self.created_before:
+            must.append(FieldCondition(
+                key="created_at",
+                range=DatetimeRange(gte=self.created_after, lte=self.created_before),
+            ))
+        if self.min_quality is not None:
+            must.append(FieldCondition(key="quality_score", range=Range(gte=self.min_quality)))
+        if self.exclude_flagged:
+            must_not.append(FieldCondition(key="flagged", match=MatchValue(value=True)))
+        return must, must_not
+
+
 class QdrantStore:
-    def __init__(self, collection_name: str | None = None):
+    def __init__(self, collection_name: str | None = None, contents=None):
         self.client = QdrantClient(
             host=settings.qdrant_host, port=settings.qdrant_port
         )
         self.collection_name = collection_name or settings.qdrant_collection
+        self._contents = contents
+
+    @property
+    def contents(self):
+        """Store of chunk texts kept out of the payload (a PostgresStore)."""
+        if self._contents is None:
+            from rag.storage.postgres import PostgresStore
+            self._contents = PostgresStore()
+        return self._contents
 
     def ensure_collection(self, dense_dim: int = 1024):
+        """Create the collection, or add payload indexes missing from an existing one."""
         collections = [c.name for c in self.client.get_collections().collections]
-        if self.collection_name not in collections:
+        aliases = [a.alias_name for a in self.client.get_aliases().aliases]
+        if self.collection_name in collections + aliases:
+            self.ensure_payload_indexes(missing_only=True)
+        else:
             self.client.create_collection(
                 collection_name=self.collection_name,
                 vectors_config={
                     "dense": VectorParams(
-                        size=dense_dim, distance=Distance.COSINE
+                        size=dense_dim,
+                        distance=Distance.COSINE,
+                        on_disk=settings.qdrant_on_disk,
+                        hnsw_config=self._hnsw_config(),
+                        quantization_config=self._quantization_config(),
                     )
                 },
                 sparse_vectors_config={
                     "sparse": SparseVectorParams(
-                        index=SparseIndexParams(on_disk=False)
+                        index=SparseIndexParams(on_disk=settings.qdrant_sparse_on_disk)
                     )
                 },
             )
-            for field, schema in [
-                ("platform", PayloadSchemaType.KEYWORD),
-                ("author", PayloadSchemaType.KEYWORD),
-                ("document_id", PayloadSchemaType.KEYWORD),
-                ("language", PayloadSchemaType.KEYWORD),
-            ]:
-                self.client.create_payload_index(
-                    collection_name=self.collection_name,
-                    field_name=field,
-                    field_schema=schema,
+            self.ensure_payload_indexes()
+
+    def ensure_payload_indexes(self, missing_only: bool = False) -> None:
+        """Create the PAYLOAD_INDEXES (existing indexes are left as they are).
+
+        With ``missing_only`` fields that already have an index are skipped
+        without a request.
+        """
+        existing = self.get_collection_info().payload_schema if missing_only else {}
+        for field, schema in PAYLOAD_INDEXES:
+            if field in existing:
+                continue
+            self.client.create_payload_index(
+                collection_name=self.collection_name,
+                field_name=field,
+                field_schema=schema,
+            )
+
+    def apply_collection_settings(self) -> None:
+        """Apply the quantization, on-disk and HNSW settings to an existing collection.
+
+        Also creates payload indexes added since the collection was made.
+        Qdrant rebuilds the affected indexes in the background; search keeps
+        working meanwhile.
+        """
+        self.ensure_payload_indexes()
+        self.client.update_collection(
+            collection_name=self.collection_name,
+            vectors_config={
+                "dense": VectorParamsDiff(
+                    on_disk=settings.qdrant_on_disk,
+                    hnsw_config=self._hnsw_config(),
+                    quantization_config=self._quantization_config() or Disabled.DISABLED,
+                )
+            },
+            sparse_vectors_config={
+                "sparse": SparseVectorParams(
+                    index=SparseIndexParams(on_disk=settings.qdrant_sparse_on_disk)
                 )
+            },
+        )
+
+    @staticmethod
+    def _hnsw_config() -> HnswConfigDiff:
+        return HnswConfigDiff(
+            m=settings.qdrant_hnsw_m,
+            ef_construct=settings.qdrant_hnsw_ef_construct,
+        )
+
+    @staticmethod
+    def _quantization_config() -> ScalarQuantization | BinaryQuantization | None:
+        always_ram = settings.qdrant_quantization_always_ram
+        if settings.qdrant_quantization == "scalar":
+            return ScalarQuantization(
+                scalar=ScalarQuantizationConfig(
+                    type=ScalarType.INT8, quantile=0.99, always_ram=always_ram
+                )
+            )
+        if settings.qdrant_quantization == "binary":
+            return BinaryQuantization(
+                binary=BinaryQuantizationConfig(always_ram=always_ram)
+            )
+        if settings.qdrant_quantization:
+            raise ValueError(f"Unknown quantization: {settings.qdrant_quantization}")
+        return None
 
     def get_collection_info(self):
         return self.client.get_collection(self.collection_name)
@@ -67,6 +253,28 @@ class QdrantStore:
     def delete_collection(self):
         self.client.delete_collection(self.collection_name)
 
+    def get_alias_target(self, alias: str | None = None) -> str | None:
+        """Collection an alias (default: this store's name) points to, if it is one."""
+        alias = alias or self.collection_name
+        for a in self.client.get_aliases().aliases:
+            if a.alias_name == alias:
+                return a.collection_name
+        return None
+
+    def swap_alias(self, collection: str, alias: str | None = None) -> None:
+        """Point the alias (default: this store's name) at ``collection``.
+
+        Removing the old and creating the new alias is a single atomic
+        request: readers see either the old or the new collection.
+        """
+        alias = alias or self.collection_name
+        operations = [
+            CreateAliasOperation(create_alias=CreateAlias(collection_name=collection, alias_name=alias))
+        ]
+        if self.get_alias_target(alias) is not None:
+            operations.insert(0, DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=alias)))
+        self.client.update_collection_aliases(change_aliases_operations=operations)
+
     def upsert(
         self,
         chunk,
@@ -74,7 +282,70 @@ class QdrantStore:
         sparse_indices: list[int] | None = None,
         sparse_values: list[float] | None = None,
     ):
-        vectors = {"dense": dense_vector}
+        if not settings.qdrant_payload_content:
+            self.contents.save_chunk_contents([(chunk.id, chunk.document_id, chunk.content)])
+        self.client.upsert(
+            collection_name=self.collection_name,
+            points=[
+                self._build_point(chunk, dense_vector, sparse_indices, sparse_values)
+            ],
+        )
+
+    def upsert_many(
+        self,
+        chunks: Iterable[Chunk],
+        embeddings: Iterable,
+        batch_size: int | None = None,
+        parallel: int | None = None,
+        wait: bool = True,
+    ) -> None:
+        """Upsert chunks with their embeddings in batched requests.
+
+        ``embeddings`` yields objects with ``dense``, ``sparse_indices`` and
+        ``sparse_values`` (e.g. ``EmbeddingResult``), aligned with ``chunks``;
+        a ``None`` entry stores that chunk payload-only, without vectors.
+        Both may be generators; points are streamed in batches of
+        ``batch_size``. With ``parallel > 1`` batches are sent from several
+        worker processes. ``wait=False`` returns before Qdrant has applied
+        the writes. Without ``settings.qdrant_payload_content`` the chunk
+        texts are written to the content store, batch by batch, before
+        their points.
+        """
+        batch_size = batch_size or settings.qdrant_upsert_batch_size
+        if not settings.qdrant_payload_content:
+            chunks = self._save_contents(chunks, batch_size)
+        self.client.upload_points(
+            collection_name=self.collection_name,
+            points=self._build_points(chunks, embeddings),
+            batch_size=batch_size,
+            parallel=parallel or settings.qdrant_upsert_parallel,
+            wait=wait,
+        )
+
+    def _save_contents(self, chunks: Iterable[Chunk], batch_size: int) -> Iterator[Chunk]:
+        for batch in itertools.batched(chunks, batch_size):
+            self.contents.save_chunk_contents(
+                (chunk.id, chunk.document_id, chunk.content) for chunk in batch
+            )
+            yield from batch
+
+    def _build_points(self, chunks: Iterable[Chunk], embeddings: Iterable) -> Iterator[PointStruct]:
+        for chunk, emb in zip(chunks, embeddings):
+            if emb is None:
+                yield self._build_point(chunk, None)
+            else:
+                yield self._build_point(
+                    chunk, emb.dense, emb.sparse_indices, emb.sparse_values
+                )
+
+    @staticmethod
+    def _build_point(
+        chunk,
+        dense_vector: list[float] | None,
+        sparse_indices: list[int] | None = None,
+        sparse_values: list[float] | None = None,
+    ) -> PointStruct:
+        vectors = {"dense": dense_vector} if dense_vector is not None else {}
         if sparse_indices and sparse_values:
             vectors["sparse"] = SparseVector(
                 indices=sparse_indices, values=sparse_values
@@ -83,20 +354,22 @@ class QdrantStore:
         payload = {
             "chunk_id": chunk.id,
             "document_id": chunk.document_id,
-            "content": chunk.content,
             "chunk_index": chunk.chunk_index,
             **chunk.metadata,
         }
+        if settings.qdrant_payload_content:
+            payload["content"] = chunk.content
+        if chunk.parent_chunk_id:
+            payload["parent_chunk_id"] = chunk.parent_chunk_id
+        if chunk.start_offset is not None:
+            # Character span in the document text
+            payload["start_offset"] = chunk.start_offset
+            payload["end_offset"] = chunk.end_offset
 
-        self.client.upsert(
-            collection_name=self.collection_name,
-            points=[
-                PointStruct(
-                    id=hash(chunk.id) % (2**63),
-                    vector=vectors,
-                    payload=payload,
-                )
-            ],
+        return PointStruct(
+            id=point_id(chunk.id),
+            vector=vectors,
+            payload=payload,
         )
 
     def search(
@@ -107,8 +380,84 @@ class QdrantStore:
         filter_platform: str | None = None,
         filter_author: str | None = None,
         limit: int = 10,
+        fusion: str | None = None,
+        prefetch_limit: int | None = None,
+        dense_weight: float | None = None,
+        sparse_weight: float | None = None,
+        leaves_only: bool = False,
+        hnsw_ef: int | None = None,
+        oversampling: float | None = None,
+        filters: SearchFilters | None = None,
+    ) -> list[SearchResult]:
+        """Search the collection.
+
+        Without ``fusion`` (or without a sparse vector) only the ``dense``
+        vector is queried. With ``fusion`` set to ``"rrf"``, ``"dbsf"`` or
+        ``"weighted"`` both the ``dense`` and ``sparse`` vectors are
+        prefetched and fused server-side in a single request.
+        ``leaves_only`` skips parent and grandparent chunks (see
+        ``rag.processing.chunk_policy.chunk_level``). ``hnsw_ef`` and
+        ``oversampling`` override ``settings.qdrant_hnsw_ef`` and
+        ``settings.qdrant_oversampling`` for the dense search. ``filters``
+        restricts the search to documents by collection, tag, date, quality
+        and flag.
+        """
+        results = self.client.query_points(
+            **self._search_request(
+                dense_vector, sparse_indices, sparse_values,
+                filter_platform, filter_author, limit,
+                fusion, prefetch_limit, dense_weight, sparse_weight,
+                leaves_only, hnsw_ef, oversampling, filters,
+            )
+        )
+        return self._to_search_results(results.points)
+
+    async def search_async(
+        self,
+        dense_vector: list[float],
+        sparse_indices: list[int] | None = None,
+        sparse_values: list[float] | None = None,
+        filter_platform: str | None = None,
+        filter_author: str | None = None,
+        limit: int = 10,
+        fusion: str | None = None,
+        prefetch_limit: int | None = None,
+        dense_weight: float | None = None,
+        sparse_weight: float | None = None,
+        leaves_only: bool = False,
+        hnsw_ef: int | None = None,
+        oversampling: float | None = None,
+        filters: SearchFilters | None = None,
     ) -> list[SearchResult]:
-        conditions = []
+        """Same as search, on the shared AsyncQdrantClient (for async routes)."""
+        results = await get_async_client().query_points(
+            **self._search_request(
+                dense_vector, sparse_indices, sparse_values,
+                filter_platform, filter_author, limit,
+                fusion, prefetch_limit, dense_weight, sparse_weight,
+                leaves_only, hnsw_ef, oversampling, filters,
+            )
+        )
+        return self._to_search_results(results.points)
+
+    def _search_request(
+        self,
+        dense_vector: list[float],
+        sparse_indices: list[int] | None,
+        sparse_values: list[float] | None,
+        filter_platform: str | None,
+        filter_author: str | None,
+        limit: int,
+        fusion: str | None,
+        prefetch_limit: int | None,
+        dense_weight: float | None,
+        sparse_weight: float | None,
+        leaves_only: bool = False,
+        hnsw_ef: int | None = None,
+        oversampling: float | None = None,
+        filters: SearchFilters | None = None,
+    ) -> dict:
+        conditions, exclusions = filters.conditions() if filters else ([], [])
         if filter_platform:
             conditions.append(
                 FieldCondition(
@@ -122,68 +471,333 @@ class QdrantStore:
                 )
             )
 
-        query_filter = Filter(must=conditions) if conditions else None
+        if leaves_only:
+            exclusions += [
+                FieldCondition(key="level", match=MatchAny(any=["parent", "grandparent"])),
+                FieldCondition(key="type", match=MatchValue(value="thread")),
+            ]
 
-        results = self.client.query_points(
+        query_filter = (
+            Filter(must=conditions or None, must_not=exclusions or None)
+            if conditions or exclusions else None
+        )
+
+        dense_params = self._dense_search_params(hnsw_ef, oversampling)
+
+        if fusion and sparse_indices and sparse_values:
+            return {
+                "collection_name": self.collection_name,
+                "prefetch": self._hybrid_prefetch(
+                    dense_vector,
+                    SparseVector(indices=sparse_indices, values=sparse_values),
+                    query_filter,
+                    prefetch_limit or max(limit * 4, settings.retrieval_prefetch_limit),
+                    dense_params,
+                ),
+                "query": self._fusion_query(fusion, dense_weight, sparse_weight),
+                "limit": limit,
+                "with_payload": True,
+            }
+        return {
+            "collection_name": self.collection_name,
+            "query": dense_vector,
+            "using": "dense",
+            "query_filter": query_filter,
+            "search_params": dense_params,
+            "limit": limit,
+            "with_payload": True,
+        }
+
+    @staticmethod
+    def _dense_search_params(
+        hnsw_ef: int | None, oversampling: float | None
+    ) -> SearchParams | None:
+        hnsw_ef = settings.qdrant_hnsw_ef if hnsw_ef is None else hnsw_ef
+        oversampling = settings.qdrant_oversampling if oversampling is None else oversampling
+        if not hnsw_ef and not oversampling:
+            return None
+        return SearchParams(
+            hnsw_ef=hnsw_ef or None,
+            quantization=(
+                QuantizationSearchParams(rescore=True, oversampling=oversampling)
+                if oversampling else None
+            ),
+        )
+
+    def get_chunks(self, chunk_ids: list[str]) -> dict[str, SearchResult]:
+        """Fetch chunks by id in one request (score 0); missing ids are left out."""
+        points = self.client.retrieve(
+            collection_name=self.collection_name,
+            ids=[point_id(cid) for cid in dict.fromkeys(chunk_ids)],
+            with_payload=True,
+            with_vectors=False,
+        )
+        return {r.chunk_id: r for r in self._to_search_results(points)}
+
+    async def get_chunks_async(self, chunk_ids: list[str]) -> dict[str, SearchResult]:
+        """Same as get_chunks, on the shared AsyncQdrantClient."""
+        points = await get_async_client().retrieve(
             collection_name=self.collection_name,
-            query=dense_vector,
-            using="dense",
-            query_filter=query_filter,
-            limit=limit,
+            ids=[point_id(cid) for cid in dict.fromkeys(chunk_ids)],
             with_payload=True,
+            with_vectors=False,
         )
+        return {r.chunk_id: r for r in self._to_search_results(points)}
 
+    @staticmethod
+    def _to_search_results(points) -> list[SearchResult]:
         return [
             SearchResult(
                 chunk_id=hit.payload["chunk_id"],
                 document_id=hit.payload["document_id"],
-                content=hit.payload["content"],
-                score=hit.score,
+                content=hit.payload.get("content"),
+                score=getattr(hit, "score", 0.0),
                 metadata={
                     k: v
                     for k, v in hit.payload.items()
                     if k not in ("chunk_id", "document_id", "content", "chunk_index")
                 },
             )
-            for hit in results.points
+            for hit in points
         ]
 
-    def delete_by_document_id(self, document_id: str) -> int:
-        """Delete all vectors belonging to a document. Returns count of deleted points."""
-        doc_filter = Filter(
-            must=[FieldCondition(key="document_id", match=MatchValue(value=document_id))]
+    def hydrate(self, results: list[SearchResult]) -> list[SearchResult]:
+        """Fill in the text of results whose payload had none, in one fetch."""
+        missing = [r.chunk_id for r in results if r.content is None]
+        if missing:
+            self._fill_contents(results, self.contents.get_chunk_contents(missing))
+        return results
+
+    async def hydrate_async(self, results: list[SearchResult]) -> list[SearchResult]:
+        """Same as hydrate, on the async Postgres pool."""
+        missing = [r.chunk_id for r in results if r.content is None]
+        if missing:
+            self._fill_contents(results, await self.contents.get_chunk_contents_async(missing))
+        return results
+
+    @staticmethod
+    def _fill_contents(results: list[SearchResult], contents: dict[str, str]) -> None:
+        for r in results:
+            if r.content is None:
+                r.content = contents.get(r.chunk_id, "")
+
+    def offload_contents(self, batch_size: int = 256) -> int:
+        """Move chunk texts from the payload into the content store.
+
+        For switching an existing collection to
+        ``QDRANT_PAYLOAD_CONTENT=false``; returns the number of points moved.
+        """
+        moved = 0
+        points = self.iter_points(
+            Filter(must_not=[IsEmptyCondition(is_empty=PayloadField(key="content"))]),
+            batch_size=batch_size,
+            with_payload=["chunk_id", "document_id", "content"],
         )
-        # Count first
-        count_result = self.client.count(
+        for batch in itertools.batched(points, batch_size):
+            self.contents.save_chunk_contents(
+                (p.payload["chunk_id"], p.payload["document_id"], p.payload["content"])
+                for p in batch
+            )
+            self.client.delete_payload(
+                collection_name=self.collection_name,
+                keys=["content"],
+                points=[p.id for p in batch],
+            )
+            moved += len(batch)
+        return moved
+
+    def iter_points(
+        self,
+        scroll_filter: Filter | None = None,
+        batch_size: int = 256,
+        with_payload: bool | list[str] = True,
+        with_vectors: bool = False,
+    ) -> Iterator:
+        """All points matching the filter (in point id order), one page per request."""
+        offset = None
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=self.collection_name,
+                scroll_filter=scroll_filter,
+                limit=batch_size,
+                offset=offset,
+                with_payload=with_payload,
+                with_vectors=with_vectors,
+            )
+            yield from points
+            if offset is None:
+                return
+
+    @staticmethod
+    def _hybrid_prefetch(
+        dense_vector: list[float],
+        sparse_vector: SparseVector,
+        query_filter: Filter | None,
+        prefetch_limit: int,
+        dense_params: SearchParams | None = None,
+    ) -> list[Prefetch]:
+        # Order matters: "weighted" fusion refers to $score[0] (dense) and $score[1] (sparse).
+        return [
+            Prefetch(
+                query=dense_vector,
+                using="dense",
+                filter=query_filter,
+                params=dense_params,
+                limit=prefetch_limit,
+            ),
+            Prefetch(
+                query=sparse_vector,
+                using="sparse",
+                filter=query_filter,
+                limit=prefetch_limit,
+            ),
+        ]
+
+    @staticmethod
+    def _fusion_query(
+        fusion: str,
+        dense_weight: float | None = None,
+        sparse_weight: float | None = None,
+    ) -> FusionQuery | FormulaQuery:
+        if fusion == "rrf":
+            return FusionQuery(fusion=Fusion.RRF)
+        if fusion == "dbsf":
+            return FusionQuery(fusion=Fusion.DBSF)
+        if fusion == "weighted":
+            dense_weight = settings.retrieval_dense_weight if dense_weight is None else dense_weight
+            sparse_weight = settings.retrieval_sparse_weight if sparse_weight is None else sparse_weight
+            return FormulaQuery(
+                formula=SumExpression(
+                    sum=[
+                        MultExpression(mult=[dense_weight, "$score[0]"]),
+                        MultExpression(mult=[sparse_weight, "$score[1]"]),
+                    ]
+                ),
+                defaults={"$score[0]": 0.0, "$score[1]": 0.0},
+            )
+        raise ValueError(f"Unsupported fusion: {fusion}")
+
+    def set_document_payload(self, document_id: str, payload: dict) -> None:
+        """Set payload keys on all points of a document (other keys are kept)."""
+        self.client.set_payload(
             collection_name=self.collection_name,
-            count_filter=doc_filter,
-            exact=True,
+            payload=payload,
+            points=Filter(
+                must=[FieldCondition(key="document_id", match=MatchValue(value=document_id))]
+            ),
         )
-        count = count_result.count
 
+    def count_by_document_id(self, document_id: str) -> int:
+        """Number of points belonging to a document."""
+        return self.client.count(
+            collection_name=self.collection_name,
+            count_filter=Filter(
+                must=[FieldCondition(key="document_id", match=MatchValue(value=document_id))]
+            ),
+            exact=True,
+        ).count
+
+    def delete_by_document_id(self, document_id: str, contents: bool = True) -> int:
+        """Delete all vectors belonging to a document. Returns count of deleted points.
+
+        With ``contents=False`` texts in the content store are kept (they
+        are shared by all collections, e.g. during a reindex).
+        """
+        count = self.count_by_document_id(document_id)
         if count > 0:
             self.client.delete(
                 collection_name=self.collection_name,
-                points_selector=doc_filter,
+                points_selector=Filter(
+                    must=[FieldCondition(key="document_id", match=MatchValue(value=document_id))]
+                ),
             )
+        if contents and not settings.qdrant_payload_content:
+            self.contents.delete_chunk_contents(document_id)
         return count
 
-    def get_chunks_for_document(self, document_id: str, limit: int = 1000) -> list[dict]:
-        """Get all chunks for a document, ordered by chunk_index."""
-        doc_filter = Filter(
-            must=[FieldCondition(key="document_id", match=MatchValue(value=document_id))]
+    def get_chunks_for_document(
+        self, document_id: str, limit: int | None = None, level: str | None = None
+    ) -> list[dict]:
+        """Get the chunks of a document (all, or the first ``limit``), ordered by chunk_index.
+
+        ``level`` restricts them to one level, see ``get_chunk_page``.
+        """
+        return list(itertools.islice(self.iter_chunks_for_document(document_id, level=level), limit))
+
+    def iter_chunks_for_document(
+        self, document_id: str, batch_size: int = 256, level: str | None = None
+    ) -> Iterator[dict]:
+        """All chunks of a document (of one ``level``) in chunk_index order, fetched page by page."""
+        after = None
+        while True:
+            chunks, after = self.get_chunk_page(document_id, batch_size, after, level=level)
+            yield from chunks
+            if after is None:
+                return
+
+    def get_chunk_page(
+        self,
+        document_id: str,
+        limit: int = 100,
+        after: int | None = None,
+        level: str | None = None,
+    ) -> tuple[list[dict], int | None]:
+        """One page of a document's chunks with chunk_index > ``after``.
+
+        Returns the chunks, ordered server-side by chunk_index, and the
+        cursor for the next page (``None`` on the last one).
+
+        chunk_index is numbered per level of the hierarchical chunker, so
+        only the chunks of one ``level`` ("leaf", "parent", "grandparent")
+        are in document order; chunks without a level (single-chunk and
+        media documents) are always included. Without a level, levels are
+        mixed and share indexes: pages then end on a chunk_index boundary,
+        so all chunks with the page's last index are included even if that
+        makes the page slightly longer than ``limit``.
+        """
+        scope = Filter(
+            must=[FieldCondition(key="document_id", match=MatchValue(value=document_id))],
+            should=[
+                FieldCondition(key="level", match=MatchValue(value=level)),
+                IsEmptyCondition(is_empty=PayloadField(key="level")),
+            ] if level else None,
         )
-        results = self.client.scroll(
-            collection_name=self.collection_name,
-            scroll_filter=doc_filter,
-            limit=limit,
-            with_payload=True,
-            with_vectors=False,
+        conditions = [scope]
+        if after is not None:
+            conditions.append(FieldCondition(key="chunk_index", range=Range(gt=after)))
+        try:
+            points, _ = self.client.scroll(
+                collection_name=self.collection_name,
+                scroll_filter=Filter(must=conditions),
+                limit=limit,
+                order_by=OrderBy(key="chunk_index"),
+                with_payload=True,
+                with_vectors=False,
+            )
+        except UnexpectedResponse as e:
+            # order_by needs the chunk_index index, which collections created
+            # before it was added lack until ensure_collection runs: sort here
+            logger.warning(f"Ordered scroll on {self.collection_name} failed, sorting locally: {e}")
+            points = sorted(
+                self.iter_points(Filter(must=conditions)),
+                key=lambda p: p.payload["chunk_index"],
+            )[:limit]
+        if len(points) < limit:
+            return self._chunk_dicts(points), None
+
+        last = points[-1].payload["chunk_index"]
+        ties = self.iter_points(
+            Filter(must=[
+                scope,
+                FieldCondition(key="chunk_index", match=MatchValue(value=last)),
+            ])
         )
-        points = results[0]
-        chunks = []
-        for point in points:
-            chunks.append({
+        points = [p for p in points if p.payload["chunk_index"] != last] + list(ties)
+        return self._chunk_dicts(points), last
+
+    def _chunk_dicts(self, points) -> list[dict]:
+        chunks = [
+            {
                 "chunk_id": point.payload.get("chunk_id", ""),
                 "content": point.payload.get("content", ""),
                 "chunk_index": point.payload.get("chunk_index", 0),
@@ -191,6 +805,12 @@ class QdrantStore:
                     k: v for k, v in point.payload.items()
                     if k not in ("chunk_id", "document_id", "content", "chunk_index")
                 },
-            })
-        chunks.sort(key=lambda c: c["chunk_index"])
+            }
+            for point in points
+        ]
+        missing = [c["chunk_id"] for c in chunks if not c["content"]]
+        if missing and not settings.qdrant_payload_content:
+            contents = self.contents.get_chunk_contents(missing)
+            for c in chunks:
+                c["content"] = c["content"] or contents.get(c["chunk_id"], "")
         return chunks
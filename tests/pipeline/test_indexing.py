@@ -0,0 +1,57 @@
+import pytest
+
+from rag.models import Chunk, Document, Platform
+from rag.pipeline.indexing import index_stream
+
+
+class FakeEmbedder:
+    def embed_many(self, texts):
+        return [None] * len(texts)
+
+
+class FakeQdrant:
+    def __init__(self):
+        self.points = {}
+
+    def upsert_many(self, chunks, embeddings):
+        for chunk, _ in zip(chunks, embeddings):
+            self.points[chunk.id] = chunk.document_id
+
+    def count_by_document_id(self, document_id):
+        return sum(1 for v in self.points.values() if v == document_id)
+
+    def delete_by_document_id(self, document_id, contents=True):
+        deleted = [k for k, v in self.points.items() if v == document_id]
+        for k in deleted:
+            del self.points[k]
+        return len(deleted)
+
+
+class FakeNER:
+    def extract_chunks(self, chunks, document_id):
+        return []
+
+
+def test_index_stream_removes_points_when_extraction_fails():
+    doc = Document(title="big.pdf", platform=Platform.DOCUMENT)
+    qdrant = FakeQdrant()
+
+    with pytest.raises(ValueError, match="No text extracted"):
+        index_stream(doc, _failing_chunks(doc), FakeEmbedder(), qdrant, FakeNER(), batch_size=2)
+    assert qdrant.points == {}
+
+
+def test_index_stream_keeps_points_of_an_indexed_document():
+    doc = Document(title="big.pdf", source_url="/data/big.pdf", platform=Platform.DOCUMENT)
+    qdrant = FakeQdrant()
+    qdrant.points = {f"old-{i}": doc.id for i in range(8)}
+
+    with pytest.raises(ValueError, match="No text extracted"):
+        index_stream(doc, _failing_chunks(doc), FakeEmbedder(), qdrant, FakeNER(), batch_size=2)
+    assert sum(1 for v in qdrant.points.values() if v == doc.id) >= 8
+
+
+def _failing_chunks(doc):
+    for i in range(5):
+        yield Chunk(document_id=doc.id, content=f"chunk {i}", chunk_index=i, token_count=2)
+    raise ValueError("No text extracted from big.pdf")
@@ -0,0 +1,65 @@
+from rag.pipeline.reindex import reassemble_text, rechunk
+from rag.processing.chunking import HierarchicalChunker
+
+
+def _chunks(text):
+    chunker = HierarchicalChunker(leaf_size=20, parent_size=40, grandparent_size=80, overlap=5)
+    return chunker.chunk(text, document_id="doc-1", metadata={"platform": "web"})
+
+
+def test_reassemble_text_keeps_offsets():
+    text = "  Erster Absatz mit Text.\n\n" + " ".join(f"Wort{i}" for i in range(300)) + "\n"
+    chunks = _chunks(text)
+    rebuilt = reassemble_text(chunks)
+    assert rebuilt.split() == text.split()
+    for chunk in chunks:
+        assert rebuilt[chunk.start_offset:chunk.end_offset] == chunk.content
+
+
+def test_rechunk_uses_current_chunker(monkeypatch):
+    from rag.config import settings
+
+    text = " ".join(f"Wort{i}" for i in range(3000))
+    chunks = _chunks(text)
+    monkeypatch.setattr(settings, "chunk_unit", "words")
+    monkeypatch.setattr(settings, "chunk_size_leaf", 100)
+    rechunked = rechunk("doc-1", chunks)
+    leaves = [c for c in rechunked if c.metadata.get("level") == "leaf"]
+    assert max(c.token_count for c in leaves) == 100
+    assert all(c.metadata["platform"] == "web" for c in rechunked)
+    assert "start_offset" not in rechunked[0].metadata
+
+
+def test_rechunk_needs_offsets():
+    chunks = _chunks(" ".join(f"Wort{i}" for i in range(300)))
+    for chunk in chunks:
+        chunk.start_offset = None
+    assert rechunk("doc-1", chunks) is None
+
+
+def test_drop_deleted_documents():
+    from types import SimpleNamespace
+
+    from rag.pipeline.reindex import drop_deleted_documents
+
+    class FakeStore:
+        def __init__(self):
+            self.points = [
+                SimpleNamespace(payload={"document_id": doc_id})
+                for doc_id in ("doc-1", "doc-1", "doc-2", "doc-3")
+            ]
+
+        def iter_points(self, with_payload=True):
+            return iter(list(self.points))
+
+        def delete_by_document_id(self, document_id, contents=True):
+            assert contents is False
+            self.points = [p for p in self.points if p.payload["document_id"] != document_id]
+
+    class FakePostgres:
+        def get_existing_document_ids(self, document_ids):
+            return {d for d in document_ids if d != "doc-2"}
+
+    store = FakeStore()
+    assert drop_deleted_documents(store, FakePostgres(), batch_size=2) == 1
+    assert [p.payload["document_id"] for p in store.points] == ["doc-1", "doc-1", "doc-3"]
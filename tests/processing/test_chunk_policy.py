@@ -0,0 +1,44 @@
+from rag.config import settings
+from rag.models import Chunk
+from rag.processing.chunk_policy import chunk_level, get_policy
+from rag.processing.chunking import HierarchicalChunker, MediaChunker
+
+
+def test_hierarchical_levels():
+    chunker = HierarchicalChunker(leaf_size=50, parent_size=100, overlap=10)
+    chunks = chunker.chunk(" ".join(["word"] * 300), document_id="doc-1")
+    levels = {chunk_level(c) for c in chunks}
+    assert levels == {"grandparent", "parent", "leaf"}
+
+
+def test_default_policy_embeds_and_tags_leaves_only():
+    chunker = HierarchicalChunker(leaf_size=50, parent_size=100, overlap=10)
+    chunks = chunker.chunk(" ".join(["word"] * 300), document_id="doc-1")
+    policy = get_policy("web")
+    for c in chunks:
+        is_leaf = c.metadata["level"] == "leaf"
+        assert policy.embeds(c) == is_leaf
+        assert policy.runs_ner(c) == is_leaf
+
+
+def test_single_chunk_is_leaf():
+    chunk = Chunk(document_id="doc-1", content="short", chunk_index=0, token_count=1)
+    assert chunk_level(chunk) == "leaf"
+    assert get_policy("pdf").embeds(chunk)
+
+
+def test_twitter_thread_is_embedded_but_not_tagged():
+    chunks = MediaChunker().chunk_twitter_thread(
+        [{"text": "first tweet"}, {"text": "second tweet"}], document_id="tw-1"
+    )
+    policy = get_policy("twitter")
+    assert chunk_level(chunks[0]) == "parent"
+    assert policy.embeds(chunks[0]) and not policy.runs_ner(chunks[0])
+    assert all(policy.runs_ner(c) for c in chunks[1:])
+
+
+def test_settings_override(monkeypatch):
+    monkeypatch.setattr(settings, "chunk_policies", {"web": {"embed": ["leaf", "parent"]}})
+    policy = get_policy("web")
+    assert policy.embed_levels == {"leaf", "parent"}
+    assert policy.ner_levels == {"leaf"}
@@ -47,7 +47,7 @@ def test_chunk_overlap(chunker):
     words = [f"word{i}" for i in range(200)]
     text = " ".join(words)
     chunks = chunker.chunk(text=text, document_id="doc-4")
-    leaf_chunks = [c for c in chunks if c.parent_chunk_id is not None or len(chunks) == 1]
+    leaf_chunks = [c for c in chunks if c.metadata.get("level") == "leaf" or len(chunks) == 1]
     if len(leaf_chunks) >= 2:
         # Check overlap: last words of chunk N should appear at start of chunk N+1
         c0_words = leaf_chunks[0].content.split()
@@ -84,3 +84,99 @@ class TestMediaChunker:
         chunks = mc.chunk_reddit(post, document_id="reddit-1")
         assert len(chunks) >= 2  # At least post + comments
         assert chunks[0].metadata.get("type") == "post"
+
+
+@pytest.fixture(scope="module")
+def tokenizer():
+    tokenizers = pytest.importorskip("tokenizers")
+    tok = tokenizers.Tokenizer(tokenizers.models.Unigram())
+    tok.pre_tokenizer = tokenizers.pre_tokenizers.Metaspace()
+    trainer = tokenizers.trainers.UnigramTrainer(vocab_size=80, special_tokens=["<unk>"], unk_token="<unk>")
+    tok.train_from_iterator(["Die Donaudampfschifffahrt fährt schnell über den Fluss."] * 20, trainer)
+    return tok
+
+
+def test_token_mode_counts_tokens(tokenizer):
+    chunker = HierarchicalChunker(leaf_size=40, parent_size=80, overlap=8, tokenizer=tokenizer)
+    text = " ".join(f"Donaudampfschifffahrt{i % 7} fährt schnell." for i in range(60))
+    chunks = chunker.chunk(text=text, document_id="doc-t")
+
+    leaves = [c for c in chunks if c.metadata.get("level") == "leaf"]
+    parents = [c for c in chunks if c.metadata.get("level") == "parent"]
+    assert leaves and parents
+    for c in leaves:
+        assert c.token_count <= 40
+        # Cut at word boundaries, so re-tokenising gives the same count
+        assert len(tokenizer.encode(c.content, add_special_tokens=False).ids) == c.token_count
+        assert c.content in text
+        assert c.content.split()[0] in text.split()
+        assert c.content.split()[-1] in text.split()
+    assert all(c.token_count <= 80 for c in parents)
+
+
+def test_token_mode_short_text(tokenizer):
+    chunker = HierarchicalChunker(leaf_size=40, parent_size=80, overlap=8, tokenizer=tokenizer)
+    chunks = chunker.chunk(text="Der Fluss.", document_id="doc-s")
+    assert len(chunks) == 1
+    assert chunks[0].content == "Der Fluss."
+    assert chunks[0].token_count == len(tokenizer.encode("Der Fluss.", add_special_tokens=False).ids)
+
+
+def test_chunks_are_views_into_the_text(chunker):
+    text = "\n".join(f"line {i} with some words" for i in range(100))
+    chunks = chunker.chunk(text=text, document_id="doc-5")
+    assert len(chunks) > 1
+    for c in chunks:
+        assert c.content == text[c.start_offset:c.end_offset]
+        assert c.token_count == len(c.content.split())
+    leaves = [c for c in chunks if c.metadata.get("level") == "leaf"]
+    parents = {c.id: c for c in chunks if c.metadata.get("level") == "parent"}
+    for leaf in leaves:
+        parent = parents[leaf.parent_chunk_id]
+        assert parent.start_offset <= leaf.start_offset < leaf.end_offset <= parent.end_offset
+
+
+def test_chunk_three_levels(chunker):
+    text = " ".join(f"word{i}" for i in range(600))
+    chunks = chunker.chunk(text=text, document_id="doc-6")
+    by_id = {c.id: c for c in chunks}
+    levels = {c.metadata["level"] for c in chunks}
+    assert levels == {"grandparent", "parent", "leaf"}
+    for c in chunks:
+        level = c.metadata["level"]
+        if level == "grandparent":
+            assert c.parent_chunk_id is None
+            assert c.token_count <= 200
+        else:
+            above = by_id[c.parent_chunk_id]
+            assert above.metadata["level"] == {"parent": "grandparent", "leaf": "parent"}[level]
+            assert above.start_offset <= c.start_offset and c.end_offset <= above.end_offset
+
+
+def test_chunk_stream_matches_chunk(chunker):
+    blocks = [" ".join(f"page{p}word{i}" for i in range(37)) for p in range(20)]
+    streamed = list(chunker.chunk_stream(iter(blocks), document_id="doc-7"))
+    whole = chunker.chunk("\n\n".join(blocks), document_id="doc-7")
+
+    def key(c):
+        return (c.chunk_index, c.metadata["level"], c.start_offset, c.end_offset, c.token_count, c.content)
+
+    assert [key(c) for c in streamed] == [key(c) for c in whole]
+
+
+def test_chunk_stream_is_lazy(chunker):
+    def blocks():
+        for p in range(1000):
+            yield " ".join(f"w{i}" for i in range(100))
+        raise AssertionError("must not read past the first windows")
+
+    stream = chunker.chunk_stream(blocks(), document_id="doc-8")
+    first = [next(stream) for _ in range(5)]
+    assert first[0].metadata["level"] == "grandparent"
+
+
+def test_chunk_shares_one_source(chunker):
+    text = " ".join(f"word{i}" for i in range(2000))
+    chunks = chunker.chunk(text=text, document_id="doc-9")
+    assert len({c.metadata["level"] for c in chunks}) == 3
+    assert all(c._source is text for c in chunks)
@@ -1,5 +1,5 @@
 import pytest
-from rag.processing.embedding import Embedder
+from rag.processing.embedding import Embedder, plan_batches
 
 
 @pytest.fixture(scope="module")
@@ -31,3 +31,34 @@ def test_embed_german_english_similarity(embedder):
         np.linalg.norm(de.dense) * np.linalg.norm(en.dense)
     )
     assert similarity > 0.5  # Cross-lingual similarity should be meaningful
+
+
+def test_embed_many_keeps_input_order(embedder):
+    texts = ["A much longer sentence about the capital of Germany, Berlin.", "Hund", "dog"]
+    results = embedder.embed_many(texts, batch_size=2)
+    assert len(results) == 3
+    for text, result in zip(texts, results):
+        assert result.dense == pytest.approx(embedder.embed(text).dense, abs=1e-4)
+
+
+def test_plan_batches_respects_count_and_tokens():
+    assert plan_batches([10, 10, 10, 10, 10], batch_size=2, max_batch_tokens=1000) == [(0, 2), (2, 4), (4, 5)]
+    # Padded cost: 3 * 40 > 100 closes the batch before the third item
+    assert plan_batches([10, 20, 40, 40], batch_size=8, max_batch_tokens=100) == [(0, 2), (2, 4)]
+    # Oversized item still gets its own batch
+    assert plan_batches([500], batch_size=8, max_batch_tokens=100) == [(0, 1)]
+
+
+def test_embed_many_reuses_cached_embeddings(embedder, monkeypatch):
+    texts = ["Cached sentence one.", "Cached sentence two.", "Cached sentence one."]
+    first = embedder.embed_many(texts)
+    assert first[0] == first[2]
+
+    def fail(texts):
+        raise AssertionError("cached texts must not be re-encoded")
+
+    monkeypatch.setattr(embedder, "_encode", fail)
+    second = embedder.embed_many(texts)
+    for a, b in zip(first, second):
+        assert b.dense == pytest.approx(a.dense, abs=1e-3)
+        assert b.sparse_indices == a.sparse_indices
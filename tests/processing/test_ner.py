@@ -34,3 +34,24 @@ def test_extract_returns_entities(extractor):
     assert len(entities) >= 2
     types = {e.entity_type for e in entities}
     assert "PERSON" in types or "ORGANIZATION" in types
+
+
+def test_extract_batch_maps_results_to_chunks(extractor):
+    texts = [
+        "Google was founded by Larry Page and Sergey Brin in Mountain View.",
+        "Berlin",
+        "Angela Merkel visited Paris.",
+    ]
+    results = extractor.extract_batch(texts, document_id="doc-1", chunk_ids=["c0", "c1", "c2"], batch_size=2)
+    assert len(results) == 3
+    for chunk_id, entities in zip(["c0", "c1", "c2"], results):
+        assert all(e.source_chunk_id == chunk_id for e in entities)
+        assert all(e.source_document_id == "doc-1" for e in entities)
+    assert "Angela Merkel" in [e.name for e in results[2]]
+
+
+def test_extract_batch_skips_empty_texts(extractor):
+    texts = ["", "Angela Merkel visited Paris.", "  \n "]
+    results = extractor.extract_batch(texts, chunk_ids=["c0", "c1", "c2"])
+    assert results[0] == [] and results[2] == []
+    assert "Angela Merkel" in [e.name for e in results[1]]
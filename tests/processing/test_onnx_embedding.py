@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("onnxruntime")
+
+from rag.processing.onnx_embedding import OnnxBGEM3, export_onnx
+
+TEXTS = [
+    "Berlin ist die Hauptstadt von Deutschland.",
+    "Retrieval-augmented generation combines search with a language model.",
+    "dog",
+]
+
+
+@pytest.fixture(scope="module")
+def onnx_dir(tmp_path_factory):
+    return export_onnx(tmp_path_factory.mktemp("onnx"))
+
+
+@pytest.fixture(scope="module")
+def reference():
+    from FlagEmbedding import BGEM3FlagModel
+    model = BGEM3FlagModel("BAAI/bge-m3", use_fp16=False)
+    return model.encode(TEXTS, return_dense=True, return_sparse=True)
+
+
+@pytest.mark.parametrize("quantized, min_cosine", [(False, 0.999), (True, 0.98)])
+def test_parity_with_pytorch(onnx_dir, reference, quantized, min_cosine):
+    output = OnnxBGEM3(onnx_dir, quantized=quantized, threads=2).encode(TEXTS)
+
+    for ref, vec in zip(reference["dense_vecs"], output["dense_vecs"]):
+        assert float(np.dot(ref, vec)) > min_cosine
+
+    for ref, weights in zip(reference["lexical_weights"], output["lexical_weights"]):
+        top = sorted(ref, key=ref.get, reverse=True)[:5]
+        assert set(top) <= set(weights)
+        for token in top:
+            assert weights[token] == pytest.approx(float(ref[token]), abs=0.05)
@@ -0,0 +1,58 @@
+import threading
+
+import pytest
+from rag.processing import registry
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    registry.reset()
+    yield
+    registry.reset()
+
+
+def test_get_returns_shared_instance():
+    a = registry._get("dummy", object)
+    b = registry._get("dummy", object)
+    assert a is b
+    assert "dummy" in registry.loaded_models()
+
+
+def test_get_loads_once_across_threads():
+    calls = []
+
+    def factory():
+        calls.append(1)
+        return object()
+
+    threads = [threading.Thread(target=registry._get, args=("dummy", factory)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+
+
+def test_warm_up_unknown_model():
+    with pytest.raises(ValueError):
+        registry.warm_up(["nope"])
+
+
+def test_reranker_follows_reranker_type(monkeypatch):
+    import sys
+    from types import SimpleNamespace
+
+    from rag.config import settings
+    from rag.retrieval.reranker import Reranker
+
+    class FakeCrossEncoderReranker:
+        pass
+
+    monkeypatch.setitem(
+        sys.modules, "rag.retrieval.cross_encoder",
+        SimpleNamespace(CrossEncoderReranker=FakeCrossEncoderReranker),
+    )
+    monkeypatch.setattr(settings, "reranker_type", "llm")
+    assert isinstance(registry.get_reranker(), Reranker)
+    monkeypatch.setattr(settings, "reranker_type", "cross-encoder")
+    assert isinstance(registry.get_reranker(), FakeCrossEncoderReranker)
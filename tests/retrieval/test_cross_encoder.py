@@ -0,0 +1,31 @@
+import pytest
+from rag.retrieval.cross_encoder import CrossEncoderReranker
+from rag.storage.qdrant import SearchResult
+
+
+@pytest.fixture(scope="module")
+def reranker():
+    return CrossEncoderReranker()
+
+
+def _results():
+    return [
+        SearchResult(chunk_id="c1", document_id="d1", content="Pizza is a popular Italian food.", score=0.9, metadata={}),
+        SearchResult(chunk_id="c2", document_id="d2", content="Berlin is the capital of Germany.", score=0.8, metadata={}),
+    ]
+
+
+def test_rerank_orders_by_relevance(reranker):
+    reranked = reranker.rerank("What is the capital of Germany?", _results(), top_k=2)
+    assert [r.chunk_id for r in reranked] == ["c2", "c1"]
+
+
+def test_scores_are_cached(reranker, monkeypatch):
+    query = "Which city is the German capital?"
+    first = reranker.score(query, _results())
+
+    def fail(*args, **kwargs):
+        raise AssertionError("cached pairs must not be re-scored")
+
+    monkeypatch.setattr(reranker.model, "predict", fail)
+    assert reranker.score(query, _results()) == first
@@ -54,3 +54,52 @@ def test_retrieve_with_filter(retriever):
     )
     assert len(results) >= 1
     assert results[0].metadata["platform"] == "pdf"
+
+
+@pytest.mark.asyncio
+async def test_retrieve_async_matches_sync(retriever):
+    sync_results = retriever.retrieve("capital of Germany", limit=3)
+    async_results = await retriever.retrieve_async("capital of Germany", limit=3)
+    assert [r.chunk_id for r in async_results] == [r.chunk_id for r in sync_results]
+
+
+def test_small_to_big_returns_parent_text(retriever):
+    from rag.processing.chunking import HierarchicalChunker
+    from rag.pipeline.indexing import embed_and_store
+    from rag.models import Document, Platform
+
+    doc = Document(title="Hierarchy", platform=Platform.WEB)
+    text = " ".join(
+        f"Paragraph {i} talks about {topic}."
+        for i, topic in enumerate(["rivers", "mountains", "Berlin and its museums", "cooking pasta"] * 10)
+    )
+    chunks = HierarchicalChunker(leaf_size=20, parent_size=40, grandparent_size=80, overlap=5).chunk(text, doc.id)
+    embed_and_store(doc, chunks, retriever.embedder, retriever.store)
+
+    by_id = {c.id: c for c in chunks}
+    results = retriever.retrieve("museums in Berlin", limit=3, expand="parent")
+    for r in results:
+        if r.document_id == doc.id:
+            assert r.metadata["level"] == "parent"
+            for leaf_id in r.metadata["matched_chunk_ids"]:
+                assert by_id[leaf_id].parent_chunk_id == r.chunk_id
+    assert len({r.chunk_id for r in results}) == len(results)
+
+
+def test_collapse_merges_siblings():
+    from rag.retrieval.hybrid import collapse, parent_ids, replace_with_parents
+    from rag.storage.qdrant import SearchResult
+
+    def result(cid, score=0.0, **metadata):
+        return SearchResult(chunk_id=cid, document_id="d", content=cid, score=score, metadata=metadata)
+
+    hits = [
+        result("l1", 0.9, level="leaf", parent_chunk_id="p1"),
+        result("c1", 0.8, type="comment", parent_chunk_id="post"),
+        result("l2", 0.7, level="leaf", parent_chunk_id="p1"),
+    ]
+    assert parent_ids(hits) == ["p1"]
+    expanded = replace_with_parents(hits, {"p1": result("p1", level="parent")})
+    collapsed = collapse(hits, expanded)
+    assert [(r.chunk_id, r.score) for r in collapsed] == [("p1", 0.9), ("c1", 0.8)]
+    assert collapsed[0].metadata["matched_chunk_ids"] == ["l1", "l2"]
@@ -0,0 +1,83 @@
+from rag.retrieval.query_cache import QueryEmbeddingCache, normalize_query
+
+
+def test_normalize_query():
+    assert normalize_query("  What is\n RAG?  ") == "What is RAG?"
+    assert normalize_query("What is RAG?") != normalize_query("what is rag?")
+
+
+def test_hit_after_put():
+    cache = QueryEmbeddingCache(max_size=10, ttl=0, shared=False)
+    assert cache.get("query") is None
+    cache.put("query", "embedding")
+    assert cache.get(" query ") == "embedding"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_lru_eviction():
+    cache = QueryEmbeddingCache(max_size=2, ttl=0, shared=False)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_ttl_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("rag.retrieval.query_cache.time.monotonic", lambda: now[0])
+    cache = QueryEmbeddingCache(max_size=10, ttl=60, shared=False)
+    cache.put("query", "embedding")
+    now[0] += 59
+    assert cache.get("query") == "embedding"
+    now[0] += 2
+    assert cache.get("query") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_disabled():
+    cache = QueryEmbeddingCache(max_size=0, ttl=0, shared=False)
+    cache.put("query", "embedding")
+    assert cache.get("query") is None
+
+
+class FakeEmbeddingStore:
+    def __init__(self):
+        self.rows = {}
+        self.calls = []
+
+    def get_cached_embeddings(self, model, text_hashes, max_age=None):
+        self.calls.append(("get", model, max_age))
+        return {h: self.rows[(model, h)] for h in text_hashes if (model, h) in self.rows}
+
+    def save_cached_embeddings(self, model, embeddings, refresh=False):
+        self.calls.append(("save", model, refresh))
+        for h, e in embeddings.items():
+            self.rows[(model, h)] = {"dense": e.dense, "sparse_indices": [], "sparse_values": []}
+
+    def prune_cached_embeddings(self, model, max_age=None, max_rows=None):
+        self.calls.append(("prune", model, max_age, max_rows))
+        return 0
+
+
+def test_shared_tier_expires_and_prunes(monkeypatch):
+    from types import SimpleNamespace
+
+    from rag.config import settings
+
+    store = FakeEmbeddingStore()
+    cache = QueryEmbeddingCache(max_size=10, ttl=60, shared=True, shared_size=500, shared_store=store)
+    cache.put("query", SimpleNamespace(dense=[0.5]))
+    cache.put("other", SimpleNamespace(dense=[0.25]))
+    cache.clear()
+    assert cache.get("query").dense == [0.5]
+    assert cache.stats()["shared_hits"] == 1
+
+    model = f"query:{settings.embedding_model}"
+    assert ("save", model, True) in store.calls
+    assert ("get", model, 60) in store.calls
+    # Pruned once per interval, not on every put
+    assert [c for c in store.calls if c[0] == "prune"] == [("prune", model, 60, 500)]
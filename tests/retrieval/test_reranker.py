@@ -1,5 +1,8 @@
+import asyncio
+
+import httpx
 import pytest
-from rag.retrieval.reranker import Reranker
+from rag.retrieval.reranker import Reranker, parse_ranking, parse_score
 from rag.storage.qdrant import SearchResult
 
 
@@ -25,6 +28,69 @@ def test_rerank_no_model_returns_original_order():
     assert len(reranked) == 3
 
 
+def test_rerank_inside_event_loop_points_to_async():
+    r = Reranker(model="stub")
+    results = [SearchResult(chunk_id="c1", document_id="d1", content="doc", score=1.0, metadata={})]
+
+    async def call_sync():
+        r.rerank("test", results)
+
+    with pytest.raises(RuntimeError, match="rerank_async"):
+        asyncio.run(call_sync())
+
+
+def test_parse_ranking():
+    assert parse_ranking("[3] > [1] > [2]", 3) == [2, 0, 1]
+    # Missing, repeated and out-of-range numbers
+    assert parse_ranking("2, 2, 9", 3) == [1, 0, 2]
+
+
+def test_parse_score():
+    assert parse_score("Score: 7.5") == 7.5
+    assert parse_score("no idea") == 0.0
+
+
+def _mock_client(delays: dict[str, float]):
+    """LLM stub: scores a document by its content; sleeps per document."""
+    async def handler(request: httpx.Request) -> httpx.Response:
+        prompt = request.read().decode()
+        for content, delay in delays.items():
+            if content in prompt:
+                await asyncio.sleep(delay)
+                score = content.split()[-1]
+        return httpx.Response(200, json={"choices": [{"message": {"content": score}}]})
+
+    return lambda: httpx.AsyncClient(base_url="http://llm", transport=httpx.MockTransport(handler))
+
+
+def test_pointwise_time_budget_returns_partial(monkeypatch):
+    r = Reranker(model="stub", mode="pointwise", concurrency=4, time_budget=0.5)
+    results = [
+        SearchResult(chunk_id="slow", document_id="d1", content="slow doc 9", score=0.9, metadata={}),
+        SearchResult(chunk_id="low", document_id="d1", content="low doc 1", score=0.8, metadata={}),
+        SearchResult(chunk_id="high", document_id="d1", content="high doc 8", score=0.7, metadata={}),
+    ]
+    monkeypatch.setattr(r, "_new_client", _mock_client({"slow doc 9": 5.0, "low doc 1": 0.0, "high doc 8": 0.0}))
+    reranked = r.rerank("test", results, top_k=3)
+    # Scored results first by score, the timed-out one after them
+    assert [x.chunk_id for x in reranked] == ["high", "low", "slow"]
+
+
+
+def test_rerank_async_across_event_loops(monkeypatch):
+    """One shared instance serves callers on different loops (asyncio.run, Prefect)."""
+    r = Reranker(model="stub", mode="pointwise")
+    results = [
+        SearchResult(chunk_id="low", document_id="d1", content="low doc 1", score=0.9, metadata={}),
+        SearchResult(chunk_id="high", document_id="d1", content="high doc 8", score=0.8, metadata={}),
+    ]
+    monkeypatch.setattr(r, "_new_client", _mock_client({"low doc 1": 0.0, "high doc 8": 0.0}))
+    for _ in range(2):
+        reranked = asyncio.run(r.rerank_async("test", results))
+        assert [x.chunk_id for x in reranked] == ["high", "low"]
+    assert len(r._clients) == 1
+
+
 @pytest.mark.network
 def test_rerank_with_model():
     """Integration test - requires running LLM server with reranker model."""
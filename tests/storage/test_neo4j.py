@@ -1,6 +1,6 @@
 import pytest
 from rag.storage.neo4j_store import Neo4jStore
-from rag.models import Entity, Document, Platform
+from rag.models import Entity, Document, Platform, Topic
 
 
 @pytest.fixture
@@ -57,3 +57,33 @@ def test_search_entities_by_type(store):
 
     results = store.search_entities(entity_type="LOCATION")
     assert any(e["name"] == "Munich" for e in results)
+
+
+def test_write_documents_bulk(store):
+    batch = []
+    for i in range(3):
+        doc = Document(title=f"Bulk Doc {i}", platform=Platform.WEB)
+        entities = [
+            Entity(name=f"BulkEntity{i}-{j}", entity_type="TOPIC", source_document_id=doc.id)
+            for j in range(5)
+        ]
+        batch.append((doc, entities, [Topic(name="bulk-topic")]))
+
+    # Small batch size forces several UNWIND statements in the one transaction
+    store.write_documents(batch, batch_size=2)
+
+    for doc, entities, _ in batch:
+        assert store.get_document_node(doc.id) is not None
+        found = {e["name"] for e in store.get_entities_for_document(doc.id)}
+        assert found == {e.name for e in entities}
+
+
+def test_same_entity_is_one_node(store):
+    docs = [Document(title=f"Dedup Doc {i}", platform=Platform.WEB) for i in range(2)]
+    store.write_documents([
+        (doc, [Entity(name=name, entity_type="TOPIC", source_document_id=doc.id)], None)
+        for doc, name in zip(docs, ["DedupCoin", "dedupcoin"])
+    ])
+
+    results = store.search_entities(entity_type="TOPIC", name="edupCoin")
+    assert len(results) == 1
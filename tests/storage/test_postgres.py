@@ -1,5 +1,5 @@
 import pytest
-from rag.storage.postgres import PostgresStore
+from rag.storage.postgres import PostgresStore, pool_stats
 from rag.models import Document, Platform
 
 
@@ -24,6 +24,25 @@ def test_save_and_get_document(store):
     assert retrieved.title == "Test Doc"
 
 
+def test_save_document_again_refreshes_ingested_at(store):
+    from datetime import timedelta
+
+    doc = Document(title="Old title", source_url="https://example.com/reingest", platform=Platform.WEB)
+    store.save_document(doc)
+    first = store.get_document(doc.id)
+    again = Document(
+        title="New title",
+        source_url="https://example.com/reingest",
+        platform=Platform.WEB,
+        ingested_at=doc.ingested_at + timedelta(hours=1),
+    )
+    assert again.id == doc.id
+    store.save_document(again)
+    retrieved = store.get_document(doc.id)
+    assert retrieved.title == "New title"
+    assert retrieved.ingested_at - first.ingested_at == timedelta(hours=1)
+
+
 def test_search_by_platform(store):
     doc = Document(
         title="YouTube Video",
@@ -44,3 +63,61 @@ def test_search_by_author(store):
     store.save_document(doc)
     results = store.search_documents(author="bob")
     assert any(d.id == doc.id for d in results)
+
+
+def test_store_methods_share_pool(store):
+    doc = Document(title="Pooled", platform=Platform.WEB)
+    store.save_document(doc)
+    for _ in range(5):
+        assert store.get_document(doc.id) is not None
+    stats = pool_stats()["sync"]
+    assert stats["pool_max"] >= stats["pool_size"] >= 1
+    assert stats.get("connections_num", 0) <= stats["pool_max"]
+
+
+def test_embedding_cache_roundtrip(store):
+    from rag.processing.embedding_cache import text_hash
+
+    class Embedding:
+        dense = [0.5, -0.25, 0.125]
+        sparse_indices = [3, 250001]
+        sparse_values = [0.75, 0.1]
+
+    h = text_hash("cached text")
+    try:
+        store.save_cached_embeddings("test-model", {h: Embedding()})
+        found = store.get_cached_embeddings("test-model", [h, text_hash("other")])
+        assert list(found) == [h]
+        assert found[h]["dense"] == [0.5, -0.25, 0.125]
+        assert found[h]["sparse_indices"] == [3, 250001]
+        assert found[h]["sparse_values"] == pytest.approx([0.75, 0.1], abs=1e-3)
+    finally:
+        store.delete_cached_embeddings("test-model")
+
+
+def test_embedding_cache_max_age_and_prune(store):
+    from rag.processing.embedding_cache import text_hash
+
+    class Embedding:
+        dense = [0.5]
+        sparse_indices = [1]
+        sparse_values = [0.5]
+
+    hashes = [text_hash(f"query {i}") for i in range(3)]
+    try:
+        store.save_cached_embeddings("test-query-model", {h: Embedding() for h in hashes}, refresh=True)
+        assert len(store.get_cached_embeddings("test-query-model", hashes, max_age=60)) == 3
+        assert store.prune_cached_embeddings("test-query-model", max_age=60, max_rows=2) == 1
+        assert len(store.get_cached_embeddings("test-query-model", hashes)) == 2
+    finally:
+        store.delete_cached_embeddings("test-query-model")
+
+
+def test_chunk_contents_roundtrip(store):
+    text = "Ein längerer Absatz. " * 200
+    try:
+        store.save_chunk_contents([("test-chunk-1", "test-doc", text), ("test-chunk-2", "test-doc", "kurz")])
+        found = store.get_chunk_contents(["test-chunk-1", "test-chunk-2", "missing"])
+        assert found == {"test-chunk-1": text, "test-chunk-2": "kurz"}
+    finally:
+        assert store.delete_chunk_contents("test-doc") == 2
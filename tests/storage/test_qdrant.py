@@ -1,5 +1,7 @@
 import pytest
-from rag.storage.qdrant import QdrantStore
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from rag.storage.qdrant import QdrantStore, SearchFilters, point_id
 from rag.models import Chunk
 
 
@@ -61,3 +63,286 @@ def test_search_with_filter(store):
     )
     assert len(results) >= 1
     assert results[0].metadata["platform"] == "youtube"
+
+
+@pytest.mark.parametrize("fusion", ["rrf", "dbsf", "weighted"])
+def test_hybrid_search(store, fusion):
+    chunk = Chunk(
+        document_id="doc-1",
+        content="Bitcoin halving explained",
+        chunk_index=0,
+        token_count=3,
+        metadata={"platform": "web"},
+    )
+    other = Chunk(
+        document_id="doc-2",
+        content="Unrelated content",
+        chunk_index=0,
+        token_count=2,
+        metadata={"platform": "web"},
+    )
+    store.upsert(chunk=chunk, dense_vector=[0.1] * 1024, sparse_indices=[7, 42], sparse_values=[0.9, 0.4])
+    store.upsert(chunk=other, dense_vector=[0.1] * 1024, sparse_indices=[3], sparse_values=[0.2])
+
+    results = store.search(
+        dense_vector=[0.1] * 1024,
+        sparse_indices=[42],
+        sparse_values=[1.0],
+        fusion=fusion,
+        limit=5,
+    )
+    assert len(results) >= 1
+    assert results[0].chunk_id == chunk.id
+
+
+def test_point_id_is_deterministic():
+    assert point_id("chunk-1") == point_id("chunk-1")
+    assert point_id("chunk-1") != point_id("chunk-2")
+
+
+def test_upsert_many_is_idempotent(store):
+    chunks = [
+        Chunk(document_id="doc-1", content=f"chunk {i}", chunk_index=i, token_count=2)
+        for i in range(5)
+    ]
+    embeddings = [
+        SimpleNamespace(dense=[0.1] * 1024, sparse_indices=[i], sparse_values=[0.5])
+        for i in range(5)
+    ]
+    store.upsert_many(chunks, embeddings, batch_size=2)
+    store.upsert_many(chunks, embeddings, batch_size=2)
+
+    assert store.client.count(store.collection_name).count == 5
+
+
+def test_reingest_same_text_overwrites_points(store):
+    from rag.models import Document, Platform
+    from rag.processing.chunking import HierarchicalChunker
+
+    text = " ".join(f"word{i}" for i in range(600))
+    chunker = HierarchicalChunker(leaf_size=50, parent_size=100, grandparent_size=200, overlap=10)
+    for _ in range(2):
+        # A fresh Document and chunking per ingest, as a retry or another worker does
+        doc = Document(title="Article", source_url="https://example.com/a", platform=Platform.WEB)
+        chunks = chunker.chunk(text, document_id=doc.id)
+        embeddings = [
+            SimpleNamespace(dense=[0.1] * 1024, sparse_indices=[0], sparse_values=[0.5])
+            for _ in chunks
+        ]
+        store.upsert_many(chunks, embeddings)
+
+    assert store.client.count(store.collection_name).count == len(chunks)
+
+
+@pytest.mark.parametrize("quantization", ["scalar", "binary"])
+def test_quantized_collection_and_migration(monkeypatch, quantization):
+    from rag.config import settings
+
+    monkeypatch.setattr(settings, "qdrant_quantization", quantization)
+    monkeypatch.setattr(settings, "qdrant_on_disk", True)
+    s = QdrantStore(collection_name="test_quantized")
+    s.ensure_collection(dense_dim=8)
+    try:
+        dense_config = s.get_collection_info().config.params.vectors["dense"]
+        assert dense_config.on_disk
+        assert getattr(dense_config.quantization_config, quantization) is not None
+
+        chunks = [Chunk(document_id="d", content=f"c{i}", chunk_index=i, token_count=1) for i in range(4)]
+        embs = [SimpleNamespace(dense=[0.1 * (i + 1)] * 8, sparse_indices=[i], sparse_values=[0.5]) for i in range(4)]
+        s.upsert_many(chunks, embs)
+        assert len(s.search([0.1] * 8, limit=2, hnsw_ef=32, oversampling=2.0)) == 2
+
+        # Migration back to unquantized, in-memory vectors
+        monkeypatch.setattr(settings, "qdrant_quantization", "")
+        monkeypatch.setattr(settings, "qdrant_on_disk", False)
+        s.apply_collection_settings()
+        dense_config = s.get_collection_info().config.params.vectors["dense"]
+        assert dense_config.quantization_config is None
+    finally:
+        s.delete_collection()
+
+
+class DictContents:
+    """In-memory stand-in for the Postgres chunk_contents table."""
+
+    def __init__(self):
+        self.rows = {}
+        self.fetches = 0
+
+    def save_chunk_contents(self, contents):
+        for chunk_id, document_id, text in contents:
+            self.rows[chunk_id] = (document_id, text)
+
+    def get_chunk_contents(self, chunk_ids):
+        self.fetches += 1
+        return {cid: self.rows[cid][1] for cid in chunk_ids if cid in self.rows}
+
+    def delete_chunk_contents(self, document_id):
+        for cid in [c for c, (d, _) in self.rows.items() if d == document_id]:
+            del self.rows[cid]
+
+
+def test_content_kept_out_of_payload(monkeypatch):
+    from rag.config import settings
+
+    contents = DictContents()
+    s = QdrantStore(collection_name="test_contents", contents=contents)
+    s.ensure_collection(dense_dim=8)
+    try:
+        chunks = [Chunk(document_id="d", content=f"text {i}", chunk_index=i, token_count=2) for i in range(3)]
+        embs = [SimpleNamespace(dense=[0.1 * (i + 1)] * 8, sparse_indices=[i], sparse_values=[0.5]) for i in range(3)]
+        s.upsert_many(chunks[:1], embs[:1])  # written with the text in the payload
+
+        monkeypatch.setattr(settings, "qdrant_payload_content", False)
+        s.upsert_many(chunks[1:], embs[1:], batch_size=1)
+        assert set(contents.rows) == {c.id for c in chunks[1:]}
+        point = s.client.retrieve(s.collection_name, [point_id(chunks[1].id)], with_payload=True)[0]
+        assert "content" not in point.payload
+
+        results = s.search([0.1] * 8, limit=3)
+        assert all(r.content is None for r in results if r.chunk_id != chunks[0].id)
+        s.hydrate(results)
+        assert contents.fetches == 1
+        assert {r.chunk_id: r.content for r in results} == {c.id: c.content for c in chunks}
+
+        assert s.offload_contents() == 1
+        assert len(contents.rows) == 3
+        assert [c["content"] for c in s.get_chunks_for_document("d")] == ["text 0", "text 1", "text 2"]
+
+        s.delete_by_document_id("d")
+        assert contents.rows == {}
+    finally:
+        s.delete_collection()
+
+
+def test_chunk_pages_follow_chunk_index(store):
+    # Levels of the hierarchical chunker can share a chunk_index
+    indexes = [5, 1, 1, 3, 0, 2, 2, 2, 4, 7, 6]
+    chunks = [
+        Chunk(document_id="doc-pages", content=f"chunk {n}", chunk_index=i, token_count=2)
+        for n, i in enumerate(indexes)
+    ]
+    embeddings = [SimpleNamespace(dense=[0.1] * 1024, sparse_indices=[1], sparse_values=[0.5])] * len(chunks)
+    store.upsert_many(chunks, embeddings)
+
+    pages, after = [], None
+    while True:
+        page, after = store.get_chunk_page("doc-pages", limit=3, after=after)
+        pages.append([c["chunk_index"] for c in page])
+        if after is None:
+            break
+    assert pages == [[0, 1, 1], [2, 2, 2], [3, 4, 5], [6, 7]]
+    assert [c["chunk_index"] for c in store.iter_chunks_for_document("doc-pages", batch_size=2)] == sorted(indexes)
+    assert len(store.get_chunks_for_document("doc-pages", limit=4)) == 4
+    # Chunks without a level belong to every level
+    assert len(store.get_chunks_for_document("doc-pages", level="leaf")) == len(indexes)
+
+
+def test_chunk_pages_without_chunk_index_index(store, monkeypatch):
+    from qdrant_client.http.exceptions import UnexpectedResponse
+
+    chunks = [
+        Chunk(document_id="doc-old", content=f"chunk {i}", chunk_index=i, token_count=2)
+        for i in (3, 0, 4, 1, 2)
+    ]
+    embeddings = [SimpleNamespace(dense=[0.1] * 1024, sparse_indices=[1], sparse_values=[0.5])] * len(chunks)
+    store.upsert_many(chunks, embeddings)
+
+    scroll = store.client.scroll
+
+    def scroll_without_index(*args, order_by=None, **kwargs):
+        if order_by is not None:
+            raise UnexpectedResponse(400, "Bad Request", b"No range index for `order_by` key", {})
+        return scroll(*args, **kwargs)
+
+    monkeypatch.setattr(store.client, "scroll", scroll_without_index)
+    page, after = store.get_chunk_page("doc-old", limit=3)
+    assert [c["chunk_index"] for c in page] == [0, 1, 2]
+    page, after = store.get_chunk_page("doc-old", limit=3, after=after)
+    assert [c["chunk_index"] for c in page] == [3, 4] and after is None
+
+
+def test_ensure_collection_adds_missing_indexes(store, monkeypatch):
+    from qdrant_client.models import PayloadIndexInfo
+
+    from rag.storage.qdrant import PAYLOAD_INDEXES
+
+    # An existing collection from before chunk_index was indexed
+    schema = {
+        field: PayloadIndexInfo(data_type=kind, points=0)
+        for field, kind in PAYLOAD_INDEXES if field != "chunk_index"
+    }
+    monkeypatch.setattr(store, "get_collection_info", lambda: SimpleNamespace(payload_schema=schema))
+    created = []
+    monkeypatch.setattr(
+        store.client, "create_payload_index",
+        lambda collection_name, field_name, field_schema: created.append(field_name),
+    )
+    store.ensure_collection(dense_dim=1024)
+    assert created == ["chunk_index"]
+
+
+def test_chunk_pages_of_one_level_follow_the_text(store):
+    from rag.processing.chunking import HierarchicalChunker
+
+    text = " ".join(f"word{i}" for i in range(1000))
+    chunker = HierarchicalChunker(leaf_size=50, parent_size=100, grandparent_size=200, overlap=10)
+    chunks = chunker.chunk(text, document_id="doc-levels")
+    embeddings = [SimpleNamespace(dense=[0.1] * 1024, sparse_indices=[1], sparse_values=[0.5])] * len(chunks)
+    store.upsert_many(chunks, embeddings)
+
+    for level in ("leaf", "parent", "grandparent"):
+        pages, after = [], None
+        while True:
+            page, after = store.get_chunk_page("doc-levels", limit=4, after=after, level=level)
+            assert len(page) <= 4
+            pages.extend(page)
+            if after is None:
+                break
+        expected = [c for c in chunks if c.metadata["level"] == level]
+        assert [c["chunk_id"] for c in pages] == [c.id for c in sorted(expected, key=lambda c: c.start_offset)]
+
+
+def test_document_payload_filters(store):
+    dense = [0.1] * 1024
+    for doc_id in ("doc-a", "doc-b"):
+        store.upsert(Chunk(document_id=doc_id, content=doc_id, chunk_index=0, token_count=1), dense)
+    store.set_document_payload("doc-a", {
+        "collection_ids": ["coll-1"], "tag_ids": ["tag-1"],
+        "created_at": "2024-05-01T00:00:00+00:00", "quality_score": 5, "flagged": False,
+    })
+    store.set_document_payload("doc-b", {
+        "collection_ids": [], "tag_ids": ["tag-1"],
+        "created_at": "2022-05-01T00:00:00+00:00", "quality_score": 2, "flagged": True,
+    })
+
+    def found(**filters):
+        results = store.search(dense_vector=dense, limit=10, filters=SearchFilters(**filters))
+        return sorted(r.document_id for r in results)
+
+    assert found(collection_id="coll-1") == ["doc-a"]
+    assert found(tag_id="tag-1") == ["doc-a", "doc-b"]
+    assert found(created_after=datetime(2023, 1, 1, tzinfo=timezone.utc)) == ["doc-a"]
+    assert found(min_quality=3) == ["doc-a"]
+    assert found(exclude_flagged=True) == ["doc-a"]
+
+
+def test_swap_alias():
+    blue = QdrantStore(collection_name="test_blue")
+    green = QdrantStore(collection_name="test_green")
+    alias = QdrantStore(collection_name="test_alias")
+    for s in (blue, green):
+        s.ensure_collection(dense_dim=8)
+    try:
+        blue.upsert(Chunk(document_id="d", content="blue", chunk_index=0, token_count=1), [0.1] * 8)
+        alias.swap_alias("test_blue")
+        alias.ensure_collection(dense_dim=8)  # an alias counts as existing
+        assert alias.get_alias_target() == "test_blue"
+        assert alias.search([0.1] * 8, limit=1)[0].content == "blue"
+
+        alias.swap_alias("test_green")
+        assert alias.get_alias_target() == "test_green"
+        assert alias.search([0.1] * 8, limit=1) == []
+    finally:
+        for s in (blue, green):
+            s.delete_collection()
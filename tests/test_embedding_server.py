@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+from rag.embedding_server import Coalescer
+
+
+def test_concurrent_requests_share_a_batch():
+    calls = []
+
+    def embed(texts):
+        calls.append(list(texts))
+        return [t.upper() for t in texts]
+
+    async def main():
+        coalescer = Coalescer(embed, window=0.05, max_batch=64)
+        runner = asyncio.create_task(coalescer.run())
+        results = await asyncio.gather(
+            coalescer.submit(["a", "b"]),
+            coalescer.submit(["c"]),
+            coalescer.submit(["d", "e"]),
+        )
+        runner.cancel()
+        return results
+
+    results = asyncio.run(main())
+    assert results == [["A", "B"], ["C"], ["D", "E"]]
+    assert calls == [["a", "b", "c", "d", "e"]]
+
+
+def test_max_batch_splits_batches():
+    calls = []
+
+    def embed(texts):
+        calls.append(list(texts))
+        return texts
+
+    async def main():
+        coalescer = Coalescer(embed, window=0.05, max_batch=2)
+        runner = asyncio.create_task(coalescer.run())
+        await asyncio.gather(*(coalescer.submit([t]) for t in "abcd"))
+        runner.cancel()
+
+    asyncio.run(main())
+    assert calls == [["a", "b"], ["c", "d"]]
+
+
+def test_errors_reach_every_request():
+    def embed(texts):
+        raise RuntimeError("model failed")
+
+    async def main():
+        coalescer = Coalescer(embed, window=0.01, max_batch=64)
+        runner = asyncio.create_task(coalescer.run())
+        results = await asyncio.gather(
+            coalescer.submit(["a"]), coalescer.submit(["b"]), return_exceptions=True
+        )
+        runner.cancel()
+        return results
+
+    assert all(isinstance(r, RuntimeError) for r in asyncio.run(main()))
+
+
+@pytest.mark.network
+def test_remote_embedder():
+    """Integration test - requires a running embedding server."""
+    from rag.processing.embedding import Embedder
+
+    result = Embedder(backend="remote").embed("Hello World")
+    assert len(result.dense) == 1024
+    assert result.sparse_indices
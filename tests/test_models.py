@@ -1,4 +1,4 @@
-from rag.models import Document, Chunk, Entity, Platform
+from rag.models import Document, Chunk, Entity, Platform, entity_key
 
 
 def test_document_creation():
@@ -43,6 +43,18 @@ def test_chunk_hierarchy():
     assert child.parent_chunk_id == parent.id
 
 
+def test_chunk_ids_are_deterministic_and_distinct():
+    def chunk(content, **fields):
+        return Chunk(document_id="doc-123", content=content, chunk_index=0, token_count=1, **fields)
+
+    assert chunk("Same text.").id == chunk("Same text.").id
+    # Neither level nor type, same chunk_index: the text tells them apart
+    assert chunk("One comment.").id != chunk("Another comment.").id
+    assert chunk("Text", start_offset=0, end_offset=4).id != chunk("Text", start_offset=10, end_offset=14).id
+    assert chunk("Text", metadata={"level": "leaf"}).id != chunk("Text", metadata={"level": "parent"}).id
+    assert chunk("Text", id="explicit").id == "explicit"
+
+
 def test_entity_creation():
     entity = Entity(
         name="Berlin",
@@ -55,6 +67,20 @@ def test_entity_creation():
     assert entity.confidence == 0.95
 
 
+def test_entity_canonical_id():
+    a = Entity(name="Bitcoin", entity_type="TOPIC", source_document_id="doc-1")
+    b = Entity(name=" bitcoin. ", entity_type="topic", source_document_id="doc-2")
+    c = Entity(name="Bitcoin", entity_type="ORGANIZATION", source_document_id="doc-1")
+    assert a.id == b.id
+    assert a.key == b.key == entity_key("BITCOIN", "Topic")
+    assert a.id != c.id
+
+
+def test_entity_explicit_id_kept():
+    entity = Entity(id="e-1", name="Berlin", entity_type="LOCATION", source_document_id="doc-1")
+    assert entity.id == "e-1"
+
+
 def test_platform_enum():
     assert Platform.YOUTUBE.value == "youtube"
     assert Platform.TWITTER.value == "twitter"